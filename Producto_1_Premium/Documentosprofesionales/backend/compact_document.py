@@ -0,0 +1,296 @@
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Union, get_args
+
+try:
+    from .schemas import ColumnarTableBlock, DocumentMetadata, FullDocumentSchema, ParagraphBlock, TableBlock, TableRow
+except ImportError:
+    from schemas import ColumnarTableBlock, DocumentMetadata, FullDocumentSchema, ParagraphBlock, TableBlock, TableRow
+
+# Roles en el mismo orden del Literal de ParagraphBlock; se guardan como índice (1 byte)
+ROLES = get_args(ParagraphBlock.model_fields["role"].annotation)
+ROLE_CODES = {r: i for i, r in enumerate(ROLES)}
+TABLA = ROLE_CODES["tabla"]
+
+# Id reservado para celdas inexistentes en filas más cortas que la tabla
+SIN_CELDA = 0xFFFFFFFF
+
+
+class StringPool:
+    """
+    Textos en un único buffer UTF-8 con offsets. Mientras se construye, un dict deduplica
+    textos repetidos (celdas, ítems); `freeze()` lo libera para dejar solo buffer + offsets.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._offsets = array("Q", [0])
+        self._ids: Optional[dict] = {}
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def add(self, text: str) -> int:
+        if self._ids is None:
+            self._ids = {self.get(i): i for i in range(len(self))}
+            self._buf = bytearray(self._buf)
+        i = self._ids.get(text)
+        if i is None:
+            self._buf += text.encode("utf-8")
+            self._offsets.append(len(self._buf))
+            i = len(self._offsets) - 2
+            self._ids[text] = i
+        return i
+
+    def get(self, i: int) -> str:
+        return self._buf[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def freeze(self):
+        self._ids = None
+        self._buf = bytes(self._buf)
+
+
+class CompactTable:
+    """Tabla guardada por columnas: un array de ids de texto por columna."""
+
+    __slots__ = ("pool", "headers_ids", "columns", "n_rows", "row_lengths")
+
+    def __init__(self, pool: StringPool, headers: Sequence[str], rows: Iterable[Sequence[str]]):
+        self.pool = pool
+        self.headers_ids = array("I", (pool.add(str(h)) for h in headers))
+        rows = [list(r) for r in rows]
+        self.n_rows = len(rows)
+        n_cols = max([len(self.headers_ids)] + [len(r) for r in rows])
+        self.columns = [array("I", (pool.add(str(r[j])) if j < len(r) else SIN_CELDA for r in rows))
+                        for j in range(n_cols)]
+        # Largo de cada fila solo si la tabla es irregular (para reconstrucción sin pérdida)
+        largos = [len(r) for r in rows]
+        self.row_lengths = None if all(n == n_cols for n in largos) else array("I", largos)
+
+    def row_cells(self, i: int) -> List[str]:
+        n = self.row_lengths[i] if self.row_lengths is not None else len(self.columns)
+        get = self.pool.get
+        return [get(self.columns[j][i]) for j in range(n)]
+
+
+class RowView:
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: CompactTable, i: int):
+        self._table = table
+        self._i = i
+
+    @property
+    def cells(self) -> List[str]:
+        return self._table.row_cells(self._i)
+
+
+class TableView:
+    """Vista de solo lectura con la interfaz de TableBlock (headers, rows[i].cells)."""
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: CompactTable):
+        self._table = table
+
+    @property
+    def headers(self) -> List[str]:
+        return [self._table.pool.get(i) for i in self._table.headers_ids]
+
+    @property
+    def rows(self) -> List[RowView]:
+        return [RowView(self._table, i) for i in range(self._table.n_rows)]
+
+    def column(self, j: int) -> List[str]:
+        """Columna completa (las celdas inexistentes quedan como '')."""
+        get = self._table.pool.get
+        return [get(i) if i != SIN_CELDA else "" for i in self._table.columns[j]]
+
+    def to_table_block(self) -> TableBlock:
+        return TableBlock(headers=self.headers, rows=[TableRow(cells=r.cells) for r in self.rows])
+
+
+class BlockView:
+    """Vista liviana de un bloque con la interfaz de ParagraphBlock (role, content)."""
+
+    __slots__ = ("_doc", "_i")
+
+    def __init__(self, doc: "CompactDocument", i: int):
+        self._doc = doc
+        self._i = i
+
+    @property
+    def role(self) -> str:
+        return ROLES[self._doc._roles[self._i]]
+
+    @property
+    def content(self) -> Union[str, TableView, ColumnarTableBlock]:
+        code, ref = self._doc._roles[self._i], self._doc._refs[self._i]
+        if code == TABLA:
+            table = self._doc._tables[ref]
+            # Las tablas columnares ya son compactas: se guardan tal cual
+            return TableView(table) if isinstance(table, CompactTable) else table
+        return self._doc.pool.get(ref)
+
+    def model_dump(self) -> dict:
+        content = self.content
+        if isinstance(content, TableView):
+            content = {"headers": content.headers, "rows": [{"cells": r.cells} for r in content.rows]}
+        elif isinstance(content, ColumnarTableBlock):
+            content = content.model_dump()
+        return {"role": self.role, "content": content}
+
+    def to_block(self) -> ParagraphBlock:
+        content = self.content
+        if isinstance(content, TableView):
+            content = content.to_table_block()
+        return ParagraphBlock(role=self.role, content=content)
+
+
+class CompactDocument:
+    """
+    Contenedor compacto equivalente a FullDocumentSchema para documentos muy grandes.
+    Roles en array('B'), textos en un StringPool y tablas por columnas; la iteración
+    entrega vistas (BlockView) con la misma interfaz que consumen los builders
+    (`metadata`, `content`, `references`).
+    """
+
+    def __init__(self, metadata: DocumentMetadata, references: Sequence[str] = ()):
+        self.metadata = metadata
+        self.pool = StringPool()
+        self._roles = array("B")
+        self._refs = array("I")
+        self._tables: List[Union[CompactTable, ColumnarTableBlock]] = []
+        self._references = array("I", (self.pool.add(r) for r in references))
+
+    def __len__(self):
+        return len(self._roles)
+
+    def __iter__(self) -> Iterator[BlockView]:
+        for i in range(len(self._roles)):
+            yield BlockView(self, i)
+
+    def __getitem__(self, i: int) -> BlockView:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return BlockView(self, i)
+
+    @property
+    def content(self) -> "CompactDocument":
+        """Los builders iteran `schema.content`; el propio documento es la secuencia."""
+        return self
+
+    @property
+    def references(self) -> List[str]:
+        return [self.pool.get(i) for i in self._references]
+
+    # --- Construcción ---
+    def add_text(self, role: str, text: str):
+        if role not in ROLE_CODES or role == "tabla":
+            raise ValueError(f"Rol de texto no válido: {role}")
+        self._roles.append(ROLE_CODES[role])
+        self._refs.append(self.pool.add(text))
+
+    def add_table(self, headers: Sequence[str], rows: Iterable[Sequence[str]]):
+        self._roles.append(TABLA)
+        self._refs.append(len(self._tables))
+        self._tables.append(CompactTable(self.pool, headers, rows))
+
+    def add_columnar_table(self, table: ColumnarTableBlock):
+        self._roles.append(TABLA)
+        self._refs.append(len(self._tables))
+        self._tables.append(table)
+
+    def add_reference(self, text: str):
+        self._references.append(self.pool.add(text))
+
+    def freeze(self) -> "CompactDocument":
+        """Libera el índice de deduplicación (se reconstruye solo si se vuelve a agregar)."""
+        self.pool.freeze()
+        return self
+
+    # --- Conversión ---
+    @classmethod
+    def from_schema(cls, schema: FullDocumentSchema) -> "CompactDocument":
+        doc = cls(schema.metadata, schema.references)
+        for block in schema.content:
+            if block.role == "tabla" and isinstance(block.content, ColumnarTableBlock):
+                doc.add_columnar_table(block.content)
+            elif block.role == "tabla":
+                table = block.content
+                doc.add_table(table.headers, (row.cells for row in table.rows))
+            else:
+                doc.add_text(block.role, block.content)
+        return doc.freeze()
+
+    def to_schema(self) -> FullDocumentSchema:
+        return FullDocumentSchema(metadata=self.metadata, content=[b.to_block() for b in self],
+                                  references=self.references)
+
+
+if __name__ == "__main__":
+    # Benchmark de memoria: el mismo documento como FullDocumentSchema y como CompactDocument
+    import gc
+    import time
+    import tracemalloc
+
+    N_BLOQUES = 100_000
+
+    def bloques_crudos():
+        for i in range(N_BLOQUES):
+            if i % 500 == 0:
+                yield "titulo1", f"Capítulo {i // 500}: Componente de inversión"
+            elif i % 50 == 0:
+                yield "titulo2", f"Sección {i}"
+            elif i % 20 == 0:
+                yield "tabla", (["Ítem", "Unidad", "Cantidad", "Valor"],
+                                [[f"Insumo {j % 40}", "Global", str(j % 7 + 1), f"${(j * 1000) % 97000:,}"] for j in range(12)])
+            elif i % 5 == 0:
+                yield "lista_item", f"Actividad de seguimiento número {i % 300}"
+            else:
+                yield "cuerpo", (f"Párrafo {i}: el proyecto contempla acciones de mitigación y monitoreo "
+                                 f"en el territorio priorizado, con indicadores verificables por año.")
+
+    meta = DocumentMetadata(title="Anexo compilado de prueba", author="MGA", institution="CITES")
+
+    def medir(constructor):
+        gc.collect()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        obj = constructor()
+        elapsed = time.perf_counter() - t0
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return obj, current, peak, elapsed
+
+    def construir_schema():
+        content = [
+            ParagraphBlock(role=r, content=TableBlock(headers=c[0], rows=[TableRow(cells=row) for row in c[1]]))
+            if r == "tabla" else ParagraphBlock(role=r, content=c)
+            for r, c in bloques_crudos()
+        ]
+        return FullDocumentSchema(metadata=meta, content=content, references=[])
+
+    def construir_compacto():
+        doc = CompactDocument(meta)
+        for r, c in bloques_crudos():
+            if r == "tabla":
+                doc.add_table(*c)
+            else:
+                doc.add_text(r, c)
+        return doc.freeze()
+
+    schema, mem_s, peak_s, t_s = medir(construir_schema)
+    compacto, mem_c, peak_c, t_c = medir(construir_compacto)
+
+    t0 = time.perf_counter()
+    sin_perdida = compacto.to_schema() == schema
+    t_conv = time.perf_counter() - t0
+
+    print(f"Bloques: {N_BLOQUES:,}")
+    print(f"FullDocumentSchema: {mem_s / 1e6:8.1f} MB retenidos (pico {peak_s / 1e6:.1f} MB, {t_s:.2f} s)")
+    print(f"CompactDocument:    {mem_c / 1e6:8.1f} MB retenidos (pico {peak_c / 1e6:.1f} MB, {t_c:.2f} s)")
+    print(f"Reducción:          {mem_s / max(mem_c, 1):8.1f}x")
+    print(f"Conversión sin pérdida: {'OK' if sin_perdida else 'FALLÓ'} ({t_conv:.2f} s)")
@@ -0,0 +1,264 @@
+import os
+import sys
+import mmap
+import glob
+import struct
+import argparse
+from typing import Iterator, List, Optional, Sequence, Union
+
+try:
+    from .schemas import DocumentMetadata, FullDocumentSchema, ParagraphBlock
+    from .document_ir import IR_SUFFIX, _dumps, _loads, bloque_desde_ir, dump_ir, load_ir
+except ImportError:
+    from schemas import DocumentMetadata, FullDocumentSchema, ParagraphBlock
+    from document_ir import IR_SUFFIX, _dumps, _loads, bloque_desde_ir, dump_ir, load_ir
+
+# Formato del corpus:
+#   cabecera fija | blobs JSON (metadata, referencias y una sección por titulo1) | índice JSON
+# La cabecera guarda dónde está el índice; el índice guarda (offset, largo) de cada blob,
+# así que leer un documento o una sección solo toca sus propios bytes del mmap.
+MAGIC = b"MGACORP\0"
+CORPUS_VERSION = 1
+_CABECERA = struct.Struct("<8sIIQQ") # magic, versión, documentos, offset índice, largo índice
+CORPUS_SUFFIX = ".mgacorp"
+
+
+class CorpusError(ValueError):
+    """Archivo que no es un corpus válido o de otra versión del formato."""
+
+
+def dividir_secciones(content) -> List[tuple]:
+    """Parte el contenido en secciones que empiezan en cada titulo1: [(titulo, [bloques])]."""
+    secciones = []
+    titulo, actual = "", []
+    for block in content:
+        if block.role == "titulo1" and actual:
+            secciones.append((titulo, actual))
+            actual = []
+        if block.role == "titulo1":
+            titulo = block.content
+        actual.append(block)
+    if actual or not secciones:
+        secciones.append((titulo, actual))
+    return secciones
+
+
+class CorpusWriter:
+    """
+    Escritura secuencial de muchos documentos en un solo archivo.
+    Se escribe a un temporal y se publica con os.replace al cerrar.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp = f"{path}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(self._tmp, "wb")
+        self._f.write(_CABECERA.pack(MAGIC, CORPUS_VERSION, 0, 0, 0))
+        self._indice: List[dict] = []
+        self._ids = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.cerrar()
+        else:
+            self._f.close()
+            os.remove(self._tmp)
+
+    def __len__(self):
+        return len(self._indice)
+
+    def _blob(self, obj) -> List[int]:
+        raw = _dumps(obj)
+        offset = self._f.tell()
+        self._f.write(raw)
+        return [offset, len(raw)]
+
+    def agregar(self, schema, doc_id: Optional[str] = None) -> str:
+        """Agrega un FullDocumentSchema (o contenedor equivalente). Retorna su id en el corpus."""
+        doc_id = doc_id or f"doc{len(self._indice):06d}"
+        if doc_id in self._ids:
+            raise ValueError(f"Id de documento duplicado en el corpus: {doc_id}")
+        self._ids.add(doc_id)
+        self._indice.append({
+            "id": doc_id,
+            "title": schema.metadata.title,
+            "metadata": self._blob(schema.metadata.model_dump()),
+            "references": self._blob(list(schema.references)),
+            "sections": [[titulo, *self._blob([b.model_dump() for b in bloques])]
+                         for titulo, bloques in dividir_secciones(schema.content)],
+        })
+        return doc_id
+
+    def agregar_ir(self, ir_path: str, doc_id: Optional[str] = None) -> str:
+        if doc_id is None:
+            nombre = os.path.basename(ir_path)
+            doc_id = nombre[:-len(IR_SUFFIX)] if nombre.endswith(IR_SUFFIX) else os.path.splitext(nombre)[0]
+        return self.agregar(load_ir(ir_path), doc_id)
+
+    def cerrar(self):
+        if self._f.closed:
+            return
+        offset, largo = self._blob(self._indice)
+        self._f.seek(0)
+        self._f.write(_CABECERA.pack(MAGIC, CORPUS_VERSION, len(self._indice), offset, largo))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+
+class CorpusReader:
+    """
+    Acceso aleatorio a un corpus vía mmap: solo el índice se decodifica al abrir;
+    cada documento o sección se decodifica a demanda desde su rango de bytes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise CorpusError(f"{path}: archivo vacío.")
+        self._buf = memoryview(self._mm)
+        if len(self._mm) < _CABECERA.size:
+            self.cerrar()
+            raise CorpusError(f"{path} no es un corpus de documentos.")
+        magic, version, n, offset, largo = _CABECERA.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.cerrar()
+            raise CorpusError(f"{path} no es un corpus de documentos.")
+        if version != CORPUS_VERSION:
+            self.cerrar()
+            raise CorpusError(f"{path}: versión de corpus {version} (se esperaba {CORPUS_VERSION}).")
+        self._indice: List[dict] = self._leer([offset, largo])
+        self._posicion = {e["id"]: i for i, e in enumerate(self._indice)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return len(self._indice)
+
+    def __contains__(self, doc_id: str):
+        return doc_id in self._posicion
+
+    def _leer(self, rango: Sequence[int]):
+        offset, largo = rango[-2], rango[-1]
+        return _loads(self._buf[offset:offset + largo])
+
+    def _entrada(self, doc: Union[int, str]) -> dict:
+        if isinstance(doc, str):
+            if doc not in self._posicion:
+                raise KeyError(f"Documento no encontrado en el corpus: {doc}")
+            doc = self._posicion[doc]
+        return self._indice[doc]
+
+    # --- Índice (sin tocar los blobs) ---
+    def ids(self) -> List[str]:
+        return [e["id"] for e in self._indice]
+
+    def titulos(self) -> List[str]:
+        return [e["title"] for e in self._indice]
+
+    def secciones(self, doc: Union[int, str]) -> List[str]:
+        """Títulos de las secciones (titulo1) de un documento; '' para el bloque inicial sin título."""
+        return [s[0] for s in self._entrada(doc)["sections"]]
+
+    # --- Lectura parcial ---
+    def metadata(self, doc: Union[int, str]) -> DocumentMetadata:
+        return DocumentMetadata.model_construct(**self._leer(self._entrada(doc)["metadata"]))
+
+    def referencias(self, doc: Union[int, str]) -> List[str]:
+        return self._leer(self._entrada(doc)["references"])
+
+    def seccion(self, doc: Union[int, str], seccion: Union[int, str]) -> List[ParagraphBlock]:
+        """Bloques de una sección, por posición o por título."""
+        secciones = self._entrada(doc)["sections"]
+        if isinstance(seccion, str):
+            coincidencias = [s for s in secciones if s[0] == seccion]
+            if not coincidencias:
+                raise KeyError(f"Sección no encontrada: {seccion}")
+            rango = coincidencias[0]
+        else:
+            rango = secciones[seccion]
+        return [bloque_desde_ir(b) for b in self._leer(rango)]
+
+    def documento(self, doc: Union[int, str], validar: bool = False) -> FullDocumentSchema:
+        entrada = self._entrada(doc)
+        metadata = self._leer(entrada["metadata"])
+        references = self._leer(entrada["references"])
+        if validar:
+            content = [b for s in entrada["sections"] for b in self._leer(s)]
+            return FullDocumentSchema(metadata=metadata, content=content, references=references)
+        content = [bloque_desde_ir(b) for s in entrada["sections"] for b in self._leer(s)]
+        return FullDocumentSchema.model_construct(metadata=DocumentMetadata.model_construct(**metadata),
+                                                  content=content, references=references)
+
+    def __iter__(self) -> Iterator[FullDocumentSchema]:
+        for i in range(len(self._indice)):
+            yield self.documento(i)
+
+    def cerrar(self):
+        if getattr(self, "_buf", None) is not None:
+            self._buf.release()
+            self._buf = None
+        if not self._mm.closed:
+            self._mm.close()
+        self._f.close()
+
+
+def construir_corpus(rutas: Sequence[str], destino: str) -> int:
+    """Empaqueta IRs (.ir.json) —archivos o carpetas— en un corpus. Retorna el número de documentos."""
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            archivos.extend(sorted(glob.glob(os.path.join(ruta, "**", f"*{IR_SUFFIX}"), recursive=True)))
+        else:
+            archivos.append(ruta)
+    with CorpusWriter(destino) as writer:
+        for archivo in archivos:
+            writer.agregar_ir(archivo)
+        return len(writer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corpus binario de documentos (acceso aleatorio vía mmap)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_build = sub.add_parser("build", help="Empaqueta IRs (.ir.json) en un corpus")
+    p_build.add_argument("destino", help=f"Archivo de salida ({CORPUS_SUFFIX})")
+    p_build.add_argument("rutas", nargs="+", help="Archivos .ir.json o carpetas que los contienen")
+    p_info = sub.add_parser("info", help="Lista los documentos y secciones del corpus")
+    p_info.add_argument("corpus")
+    p_extract = sub.add_parser("extract", help="Extrae un documento del corpus como IR")
+    p_extract.add_argument("corpus")
+    p_extract.add_argument("id")
+    p_extract.add_argument("--output", "-o", help="Ruta del IR de salida (por defecto <id>.ir.json)")
+    args = parser.parse_args()
+
+    try:
+        if args.comando == "build":
+            n = construir_corpus(args.rutas, args.destino)
+            print(f"✅ Corpus con {n} documentos: {os.path.abspath(args.destino)}")
+        elif args.comando == "info":
+            with CorpusReader(args.corpus) as corpus:
+                print(f"📚 {len(corpus)} documentos en {args.corpus}")
+                for i, (doc_id, titulo) in enumerate(zip(corpus.ids(), corpus.titulos())):
+                    print(f"  {doc_id}: {titulo} ({len(corpus.secciones(i))} secciones)")
+        else:
+            with CorpusReader(args.corpus) as corpus:
+                destino = dump_ir(corpus.documento(args.id), args.output or f"{args.id}{IR_SUFFIX}")
+            print(f"✅ Documento extraído: {os.path.abspath(destino)}")
+    except (CorpusError, KeyError, OSError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import hashlib
+from typing import Callable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # Fallback: json estándar (más lento, mismo formato en disco)
+    import json
+    orjson = None
+
+try:
+    from .schemas import ColumnarTableBlock, DocumentMetadata, FullDocumentSchema, ParagraphBlock, TableBlock, TableRow
+except ImportError:
+    from schemas import ColumnarTableBlock, DocumentMetadata, FullDocumentSchema, ParagraphBlock, TableBlock, TableRow
+
+# Representación intermedia (IR) en disco de FullDocumentSchema.
+# Subir IR_VERSION cuando cambie la forma del documento: los IR viejos se descartan y se regeneran.
+IR_FORMAT = "mga-document-ir"
+IR_VERSION = 1
+IR_SUFFIX = ".ir.json"
+
+
+class IRVersionError(ValueError):
+    """El archivo no es un IR reconocido o fue escrito con otra versión del formato."""
+
+
+def _dumps(obj, ordenar: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if ordenar else None)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=ordenar).encode("utf-8")
+
+
+def digest(obj, digest_size: int = 16) -> str:
+    """
+    Digest blake2b de `obj` serializado como en el IR, con claves ordenadas: no depende del
+    orden de inserción de los dicts (para comparar contenido entre corridas).
+    """
+    return hashlib.blake2b(_dumps(obj, ordenar=True), digest_size=digest_size).hexdigest()
+
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(str(raw, "utf-8")) # bytes o memoryview (corpus mmap)
+
+
+def ir_path_for(input_path: str) -> str:
+    """Ruta del IR junto a su entrada: 'informe.md' -> 'informe.ir.json'."""
+    return os.path.splitext(input_path)[0] + IR_SUFFIX
+
+
+def _huella_archivo(path: str) -> dict:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _dependencias_vigentes(dependencias) -> bool:
+    """Cada archivo leído al parsear (p.ej. un CSV referenciado) sigue con la misma ruta, mtime y tamaño."""
+    try:
+        return all(_huella_archivo(d["path"]) == d for d in dependencias)
+    except OSError:
+        return False
+
+
+def fuente_archivo(input_path: str, parser: Optional[Callable] = None, parser_id: Optional[str] = None) -> dict:
+    """
+    Huella de un archivo de entrada (ruta, mtime, tamaño y parser) para decidir si el IR sigue vigente.
+    parser_id identifica el parser cuando no basta su nombre (lambdas, formatos o versiones de reglas).
+    """
+    fuente = _huella_archivo(input_path)
+    if parser_id is not None:
+        fuente["parser"] = parser_id
+    elif parser is not None:
+        fuente["parser"] = f"{parser.__module__}.{parser.__qualname__}"
+    return fuente
+
+
+def fuente_texto(*partes: str, **extra) -> dict:
+    """Huella de una entrada en memoria (p.ej. instrucción + contenido enviados al modelo)."""
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte.encode("utf-8"))
+        h.update(b"\0")
+    return {"sha256": h.hexdigest(), **extra}
+
+
+def schema_to_ir(schema, fuente: Optional[dict] = None) -> dict:
+    """Acepta FullDocumentSchema o cualquier contenedor equivalente (p.ej. CompactDocument)."""
+    return {
+        "format": IR_FORMAT,
+        "version": IR_VERSION,
+        "source": fuente,
+        "metadata": schema.metadata.model_dump(),
+        "content": [block.model_dump() for block in schema.content],
+        "references": list(schema.references),
+    }
+
+
+def dump_ir(schema, path: str, fuente: Optional[dict] = None) -> str:
+    """Escribe el IR de forma atómica (archivo temporal + os.replace)."""
+    raw = _dumps(schema_to_ir(schema, fuente))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, path)
+    return path
+
+
+def _read_ir(path: str) -> dict:
+    with open(path, "rb") as f:
+        data = _loads(f.read())
+    if not isinstance(data, dict) or data.get("format") != IR_FORMAT:
+        raise IRVersionError(f"{path} no es un IR de documento.")
+    if data.get("version") != IR_VERSION:
+        raise IRVersionError(f"{path}: versión de IR {data.get('version')} (se esperaba {IR_VERSION}).")
+    return data
+
+
+def bloque_desde_ir(block: dict) -> ParagraphBlock:
+    """
+    Bloque del IR -> ParagraphBlock sin validación Pydantic. Las tablas columnares sí pasan
+    por su validador (una vez por columna) para reconstruir los arreglos tipados.
+    """
+    c = block["content"]
+    if isinstance(c, dict) and c.get("kind") == "columnar":
+        c = ColumnarTableBlock(**c)
+    elif isinstance(c, dict):
+        # model_construct respeta el orden declarado de los campos: model_dump() queda igual
+        # que el de un documento recién parseado (y su digest también)
+        c = TableBlock.model_construct(rows=[TableRow.model_construct(cells=r["cells"]) for r in c["rows"]],
+                                       headers=c["headers"])
+    return ParagraphBlock.model_construct(role=block["role"], content=c)
+
+
+def _construir(data: dict) -> FullDocumentSchema:
+    """Reconstruye el esquema sin validación Pydantic (el IR ya fue validado al escribirse)."""
+    return FullDocumentSchema.model_construct(metadata=DocumentMetadata.model_construct(**data["metadata"]),
+                                              content=[bloque_desde_ir(b) for b in data["content"]],
+                                              references=data["references"])
+
+
+def load_ir(path: str, validar: bool = False) -> FullDocumentSchema:
+    """
+    Lee un IR. Por defecto no re-valida (camino rápido para renderizar);
+    con validar=True pasa por Pydantic, útil para IR editados a mano.
+    """
+    data = _read_ir(path)
+    if validar:
+        return FullDocumentSchema(metadata=data["metadata"], content=data["content"], references=data["references"])
+    return _construir(data)
+
+
+def cargar_si_vigente(path: str, fuente: dict) -> Optional[FullDocumentSchema]:
+    """
+    El documento del IR si existe, es de la versión actual y proviene de la misma fuente
+    (incluidos los archivos de los que dependió el parse); si no, None.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        data = _read_ir(path)
+    except (IRVersionError, OSError, ValueError):
+        return None # IR corrupto o de otra versión: se regenera
+    guardada = data.get("source")
+    if not isinstance(guardada, dict):
+        return None
+    dependencias = guardada.get("dependencias", [])
+    if {k: v for k, v in guardada.items() if k != "dependencias"} != fuente or not _dependencias_vigentes(dependencias):
+        return None
+    schema = _construir(data)
+    schema._dependencias = [d["path"] for d in dependencias]
+    return schema
+
+
+def cargar_o_parsear(input_path: str, parser: Callable[[str], FullDocumentSchema],
+                     ir_path: Optional[str] = None, usar_cache: bool = True,
+                     parser_id: Optional[str] = None) -> Tuple[FullDocumentSchema, bool]:
+    """
+    Devuelve (documento, desde_cache). Si el IR junto a la entrada está vigente lo reutiliza;
+    si no, ejecuta el parser y persiste el IR para la próxima corrida, con la huella de los
+    archivos que el parser reporte en `documento.dependencias`.
+    """
+    ir_path = ir_path or ir_path_for(input_path)
+    fuente = fuente_archivo(input_path, parser, parser_id)
+    if usar_cache:
+        schema = cargar_si_vigente(ir_path, fuente)
+        if schema is not None:
+            return schema, True
+    schema = parser(input_path)
+    dependencias = getattr(schema, "dependencias", None)
+    if dependencias:
+        fuente = {**fuente, "dependencias": [_huella_archivo(p) for p in dependencias]}
+    dump_ir(schema, ir_path, fuente)
+    return schema, False
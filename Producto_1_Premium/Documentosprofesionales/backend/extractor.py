@@ -7,9 +7,11 @@ from pydantic import ValidationError
 
 try:
     from .schemas import APACitationData, FullDocumentSchema
+    from .document_ir import cargar_si_vigente, dump_ir, fuente_texto
 except ImportError:
     # Fallback para ejecución directa
     from schemas import APACitationData, FullDocumentSchema
+    from document_ir import cargar_si_vigente, dump_ir, fuente_texto
 
 # Configuración optimizada para ahorro de tokens (Flash)
 DEFAULT_MODEL = 'gemini-1.5-flash'
@@ -186,10 +188,19 @@ class GeminiExtractor:
             raise
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def extract_full_document(self, user_instruction: str, raw_content: str) -> FullDocumentSchema:
+    def extract_full_document(self, user_instruction: str, raw_content: str,
+                              ir_path: Optional[str] = None) -> FullDocumentSchema:
         """
         PROMPT MAESTRO: Convierte contenido crudo en estructura documental APA completa.
+        Con ir_path, el resultado se persiste como IR y se reutiliza mientras la
+        instrucción, el contenido y el modelo no cambien (sin volver a llamar a la API).
         """
+        fuente = fuente_texto(user_instruction, raw_content, modelo=DEFAULT_MODEL)
+        if ir_path:
+            cacheado = cargar_si_vigente(ir_path, fuente)
+            if cacheado is not None:
+                return cacheado
+
         if not self.api_key:
              raise ValueError("API Key faltante.")
 
@@ -236,7 +247,10 @@ class GeminiExtractor:
             data_dict = json.loads(clean_text)
             
             # Validación Pydantic del documento completo
-            return FullDocumentSchema(**data_dict)
+            documento = FullDocumentSchema(**data_dict)
+            if ir_path:
+                dump_ir(documento, ir_path, fuente)
+            return documento
             
         except Exception as e:
             print(f"Error Full Document Extraction: {str(e)}")
@@ -0,0 +1,615 @@
+import gc
+import io
+import csv
+import os
+import re
+import sys
+import time
+import bisect
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .schemas import ColumnarTableBlock, DocumentMetadata, FullDocumentSchema, ParagraphBlock, TableBlock, TableRow
+    from .document_ir import bloque_desde_ir
+except ImportError:
+    from schemas import ColumnarTableBlock, DocumentMetadata, FullDocumentSchema, ParagraphBlock, TableBlock, TableRow
+    from document_ir import bloque_desde_ir
+
+# Subir cuando cambien las reglas: invalida los IR cacheados por local_engine
+REGLAS_VERSION = 3
+
+# Caracteres leídos del inicio del archivo para detectar el formato
+PREFIJO_DETECCION = 4096
+
+# Tamaño mínimo (caracteres) para que el parse paralelo compense el costo de los procesos
+UMBRAL_PARALELO = 4_000_000
+
+# Desde cuántas filas una tabla se entrega como ColumnarTableBlock (sin un TableRow por fila)
+FILAS_COLUMNAR = 1000
+
+LEGACY_HEADERS = ["Componente", "Especificación Técnica", "Cantidad", "Vida Útil", "Costo"]
+
+
+class Cursor:
+    """
+    Lector de líneas con anticipación (peek) y devolución; cuenta líneas y caracteres consumidos.
+    `origen` es la carpeta del archivo, para resolver rutas relativas (tablas CSV referenciadas);
+    `dependencias` acumula las rutas absolutas de los archivos que las reglas leyeron.
+    """
+
+    def __init__(self, lineas: Iterable[str], origen: Optional[str] = None):
+        self._it = iter(lineas)
+        self.origen = origen
+        self.dependencias: List[str] = []
+        self._devueltas: List[str] = []
+        self.lineas = 0
+        self.caracteres = 0
+
+    def peek(self) -> Optional[str]:
+        """Próxima línea (cruda) sin consumirla; None al final."""
+        if not self._devueltas:
+            linea = next(self._it, None)
+            if linea is None:
+                return None
+            self._devueltas.append(linea)
+        return self._devueltas[-1]
+
+    def devolver(self, lineas: Sequence[str]):
+        """Reinserta líneas ya consumidas (en su orden original) al frente del cursor."""
+        self._devueltas.extend(reversed(lineas))
+        self.lineas -= len(lineas)
+        self.caracteres -= sum(len(l) for l in lineas)
+
+    def tomar_mientras(self, condicion: Callable[[str], bool]) -> List[str]:
+        """Consume y retorna las líneas consecutivas (crudas) que cumplen `condicion`."""
+        tomadas = []
+        while self._devueltas:
+            if not condicion(self._devueltas[-1]):
+                break
+            tomadas.append(self._devueltas.pop())
+        else:
+            # Sin devoluciones pendientes: se itera el origen directamente (regiones de miles de líneas)
+            for linea in self._it:
+                if not condicion(linea):
+                    self._devueltas.append(linea)
+                    break
+                tomadas.append(linea)
+        self.lineas += len(tomadas)
+        self.caracteres += sum(map(len, tomadas))
+        return tomadas
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        linea = self.peek()
+        if linea is None:
+            raise StopIteration
+        self._devueltas.pop()
+        self.lineas += 1
+        self.caracteres += len(linea)
+        return linea
+
+
+@dataclass
+class Regla:
+    """
+    Una regla del motor: `patron` se evalúa (match) sobre la línea sin espacios laterales;
+    `filtro` es una condición adicional opcional sobre el match. `accion(linea, match, cursor)`
+    retorna los bloques generados, o None si la regla no aplica (se prueba la siguiente).
+    """
+    nombre: str
+    patron: str
+    accion: Callable
+    filtro: Optional[Callable] = None
+
+
+@dataclass
+class EstadisticasFormato:
+    archivos: int = 0
+    lineas: int = 0
+    caracteres: int = 0
+    bloques: int = 0
+    segundos: float = 0.0
+
+    @property
+    def lineas_por_segundo(self) -> float:
+        return self.lineas / self.segundos if self.segundos else 0.0
+
+    @property
+    def mb_por_segundo(self) -> float:
+        return self.caracteres / 1e6 / self.segundos if self.segundos else 0.0
+
+    def desde(self, anterior: "EstadisticasFormato") -> "EstadisticasFormato":
+        """Lo acumulado desde una copia anterior (p.ej. el aporte de un solo archivo)."""
+        return EstadisticasFormato(self.archivos - anterior.archivos, self.lineas - anterior.lineas,
+                                   self.caracteres - anterior.caracteres, self.bloques - anterior.bloques,
+                                   self.segundos - anterior.segundos)
+
+
+@dataclass
+class FormatoEntrada:
+    """
+    Formato de entrada declarado como conjunto de reglas (en orden de prioridad).
+    Las líneas que ninguna regla toma son 'cuerpo'; con unir_parrafos las líneas
+    consecutivas se unen hasta una línea en blanco (texto con saltos manuales).
+
+    Parse paralelo: `corte` es la regla de título de primer nivel en la que se puede partir
+    el archivo; `region` = (regla que abre, regex que cierra) describe bloques multilínea
+    que no se detienen ante esos títulos (dentro de ellos no se corta).
+    """
+    nombre: str
+    descripcion: str
+    reglas: List[Regla]
+    detector: Callable[[str], float]
+    metadata: Dict[str, str] = field(default_factory=dict)
+    referencias: List[str] = field(default_factory=list)
+    unir_parrafos: bool = False
+    corte: Optional[str] = None
+    region: Optional[Tuple[str, str]] = None
+    stats: EstadisticasFormato = field(default_factory=EstadisticasFormato)
+
+    def __post_init__(self):
+        # Reglas compiladas una sola vez al registrar el formato
+        self._compiladas = [(re.compile(r.patron), r.filtro, r.accion) for r in self.reglas]
+        # Búsqueda sobre el texto completo (re.M): líneas candidatas, confirmadas luego con regla_de
+        self._lineas_regla = {r.nombre: re.compile(rf"^[^\S\n]*(?:{r.patron})", re.M) for r in self.reglas}
+
+    def regla_de(self, linea: str) -> Optional[str]:
+        """Nombre de la primera regla cuyo patrón (y filtro) acepta la línea; None si es cuerpo."""
+        linea = linea.strip()
+        for regla, (patron, filtro, _) in zip(self.reglas, self._compiladas):
+            m = patron.match(linea)
+            if m is not None and (filtro is None or filtro(m)):
+                return regla.nombre
+        return None
+
+
+REGISTRO: Dict[str, FormatoEntrada] = {}
+
+def registrar_formato(formato: FormatoEntrada) -> FormatoEntrada:
+    REGISTRO[formato.nombre] = formato
+    return formato
+
+def obtener_formato(nombre: str) -> FormatoEntrada:
+    if nombre not in REGISTRO:
+        raise ValueError(f"Formato de entrada no registrado: {nombre} (opciones: {', '.join(REGISTRO)})")
+    return REGISTRO[nombre]
+
+def detectar_formato(prefijo: str) -> str:
+    """Formato con mayor puntaje sobre un prefijo del archivo (empate: el registrado primero)."""
+    mejor, puntaje = None, -1.0
+    for nombre, formato in REGISTRO.items():
+        p = formato.detector(prefijo)
+        if p > puntaje:
+            mejor, puntaje = nombre, p
+    return mejor
+
+def estadisticas() -> Dict[str, EstadisticasFormato]:
+    return {nombre: f.stats for nombre, f in REGISTRO.items()}
+
+
+# --- Motor ---
+
+def _bloques_cursor(cursor: Cursor, formato: FormatoEntrada) -> Iterator[ParagraphBlock]:
+    parrafo: List[str] = []
+    for raw in cursor:
+        linea = raw.strip()
+        if not linea:
+            if parrafo:
+                yield ParagraphBlock(role="cuerpo", content=" ".join(parrafo))
+                parrafo = []
+            continue
+        for patron, filtro, accion in formato._compiladas:
+            m = patron.match(linea)
+            if m is None or (filtro is not None and not filtro(m)):
+                continue
+            bloques = accion(linea, m, cursor)
+            if bloques is None:
+                continue
+            if parrafo:
+                yield ParagraphBlock(role="cuerpo", content=" ".join(parrafo))
+                parrafo = []
+            yield from bloques
+            break
+        else:
+            if formato.unir_parrafos:
+                parrafo.append(linea)
+            else:
+                yield ParagraphBlock(role="cuerpo", content=linea)
+    if parrafo:
+        yield ParagraphBlock(role="cuerpo", content=" ".join(parrafo))
+
+def _medido(bloques: Iterator[ParagraphBlock], cursor: Cursor, stats: EstadisticasFormato) -> Iterator[ParagraphBlock]:
+    """Acumula el tiempo propio del parser (no el del consumidor) y el volumen procesado."""
+    t = time.perf_counter()
+    for bloque in bloques:
+        stats.segundos += time.perf_counter() - t
+        stats.bloques += 1
+        yield bloque
+        t = time.perf_counter()
+    stats.segundos += time.perf_counter() - t
+    stats.lineas += cursor.lineas
+    stats.caracteres += cursor.caracteres
+    stats.archivos += 1
+
+def iter_bloques(lineas: Iterable[str], formato: str) -> Iterator[ParagraphBlock]:
+    """Pipeline en streaming: líneas -> ParagraphBlock según las reglas del formato."""
+    f = obtener_formato(formato)
+    cursor = lineas if isinstance(lineas, Cursor) else Cursor(lineas)
+    return _medido(_bloques_cursor(cursor, f), cursor, f.stats)
+
+def _leer_frontmatter(cursor: Cursor, max_lineas: int = 50) -> Dict[str, str]:
+    """
+    Bloque opcional '---' / 'clave: valor' / '---' al inicio del archivo. Si no cierra o
+    contiene otra cosa, las líneas se devuelven al cursor y se parsean como contenido.
+    """
+    primera = cursor.peek()
+    if primera is None or primera.strip() != "---":
+        return {}
+    leidas = [next(cursor)]
+    datos = {}
+    for raw in cursor:
+        leidas.append(raw)
+        if raw.strip() == "---":
+            break
+        clave, sep, valor = raw.partition(":")
+        if (not sep and raw.strip()) or len(leidas) > max_lineas:
+            cursor.devolver(leidas)
+            return {}
+        if sep:
+            datos[clave.strip().lower()] = valor.strip().strip('"\'')
+    else:
+        cursor.devolver(leidas)
+        return {}
+    alias = {"titulo": "title", "autor": "author", "institucion": "institution", "institución": "institution", "fecha": "date"}
+    return {alias.get(k, k): v for k, v in datos.items()}
+
+def parsear_archivo(file_path: str, formato: Optional[str] = None,
+                    metadata: Optional[Dict[str, str]] = None) -> FullDocumentSchema:
+    """
+    Parsea un archivo con el formato indicado (o detectado del prefijo si es None / 'auto').
+    Metadata: valores del formato < frontmatter del archivo < argumento `metadata`.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
+    with open(file_path, "r", encoding="utf-8") as f:
+        if formato in (None, "auto"):
+            formato = detectar_formato(f.read(PREFIJO_DETECCION))
+            f.seek(0)
+        f_entrada = obtener_formato(formato)
+        cursor = Cursor(f, origen=os.path.dirname(os.path.abspath(file_path)))
+        meta = {**f_entrada.metadata, **_leer_frontmatter(cursor), **(metadata or {})}
+        content = list(iter_bloques(cursor, formato))
+    schema = FullDocumentSchema(metadata=DocumentMetadata(**meta), content=content,
+                                references=list(f_entrada.referencias))
+    schema._dependencias = list(dict.fromkeys(cursor.dependencias))
+    return schema
+
+
+# --- Parse paralelo por secciones ---
+
+def _linea_en(texto: str, inicio: int) -> str:
+    fin = texto.find("\n", inicio)
+    return texto[inicio:] if fin < 0 else texto[inicio:fin]
+
+def puntos_de_corte(texto: str, formato: str, inicio: int = 0) -> List[int]:
+    """
+    Offsets (inicio de línea) donde el archivo puede partirse sin alterar el resultado:
+    títulos de primer nivel que ninguna regla multilínea en curso podría consumir.
+    """
+    f = obtener_formato(formato)
+    if f.corte is None:
+        return []
+    # Eventos por línea; en la misma línea el cierre de región va antes que la apertura o el corte
+    eventos = [(m.start(), 2) for m in f._lineas_regla[f.corte].finditer(texto, inicio)
+               if m.start() > inicio and f.regla_de(_linea_en(texto, m.start())) == f.corte]
+    if f.region is None:
+        return [pos for pos, _ in eventos]
+    abre, cierra = f.region
+    eventos += [(m.start(), 1) for m in f._lineas_regla[abre].finditer(texto, inicio)
+                if f.regla_de(_linea_en(texto, m.start())) == abre]
+    eventos += [(m.start(), 0) for m in re.compile(rf"^(?:{cierra})", re.M).finditer(texto, inicio)]
+    eventos.sort()
+    puntos, dentro = [], False
+    for pos, tipo in eventos:
+        if tipo == 0:
+            dentro = False
+        elif tipo == 1:
+            dentro = True
+        elif not dentro:
+            puntos.append(pos)
+    return puntos
+
+def _elegir_cortes(puntos: List[int], inicio: int, fin: int, segmentos: int) -> List[int]:
+    """Subconjunto de `puntos` que reparte [inicio, fin) en ~`segmentos` partes de tamaño parecido."""
+    cortes = []
+    paso = (fin - inicio) / segmentos
+    for k in range(1, segmentos):
+        i = bisect.bisect_left(puntos, inicio + k * paso)
+        if i < len(puntos) and (not cortes or puntos[i] > cortes[-1]):
+            cortes.append(puntos[i])
+    return cortes
+
+def _parsear_segmento(texto: str, formato: str, origen: str) -> Tuple[List[dict], int, int, List[str]]:
+    """Trabajador: bloques de un segmento como dicts (se reconstruyen sin revalidar en el padre)."""
+    cursor = Cursor(io.StringIO(texto), origen)
+    gc.disable() # solo se crean objetos acíclicos; el GC generacional solo agrega pausas
+    try:
+        bloques = [b.model_dump() for b in _bloques_cursor(cursor, obtener_formato(formato))]
+    finally:
+        gc.enable()
+    return bloques, cursor.lineas, cursor.caracteres, cursor.dependencias
+
+def parsear_archivo_paralelo(file_path: str, formato: Optional[str] = None,
+                             metadata: Optional[Dict[str, str]] = None, procesos: Optional[int] = None,
+                             umbral: int = UMBRAL_PARALELO) -> FullDocumentSchema:
+    """
+    Igual que parsear_archivo, pero parte el archivo en sus títulos de primer nivel
+    (puntos_de_corte) y parsea los segmentos en un pool de procesos; los bloques se unen
+    en orden, así que el resultado es idéntico al parse secuencial. Archivos por debajo
+    de `umbral` caracteres, o sin puntos de corte, se parsean en el proceso actual.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
+    with open(file_path, "r", encoding="utf-8") as f:
+        texto = f.read()
+    if formato in (None, "auto"):
+        formato = detectar_formato(texto[:PREFIJO_DETECCION])
+    f_entrada = obtener_formato(formato)
+    origen = os.path.dirname(os.path.abspath(file_path))
+    cursor = Cursor(io.StringIO(texto), origen)
+    meta = {**f_entrada.metadata, **_leer_frontmatter(cursor), **(metadata or {})}
+    inicio = cursor.caracteres
+
+    procesos = procesos or os.cpu_count() or 1
+    cortes = []
+    if procesos > 1 and len(texto) - inicio >= umbral:
+        cortes = _elegir_cortes(puntos_de_corte(texto, formato, inicio), inicio, len(texto), procesos * 4)
+    if not cortes:
+        content = list(iter_bloques(cursor, formato))
+    else:
+        t0 = time.perf_counter()
+        limites = [inicio, *cortes, len(texto)]
+        segmentos = [texto[a:b] for a, b in zip(limites, limites[1:])]
+        del texto
+        content, lineas, caracteres = [], cursor.lineas, cursor.caracteres
+        gc.disable()
+        try:
+            with ProcessPoolExecutor(max_workers=min(procesos, len(segmentos))) as pool:
+                # map entrega en orden: cada segmento se reconstruye mientras los siguientes se parsean
+                for bloques, n_lineas, n_caracteres, dependencias in pool.map(_parsear_segmento, segmentos,
+                                                                              repeat(formato), repeat(origen)):
+                    content.extend(bloque_desde_ir(b) for b in bloques)
+                    lineas += n_lineas
+                    caracteres += n_caracteres
+                    cursor.dependencias.extend(dependencias)
+        finally:
+            gc.enable()
+        st = f_entrada.stats
+        st.segundos += time.perf_counter() - t0 # tiempo de pared: throughput efectivo del pool
+        st.lineas += lineas
+        st.caracteres += caracteres
+        st.bloques += len(content)
+        st.archivos += 1
+    schema = FullDocumentSchema(metadata=DocumentMetadata(**meta), content=content,
+                                references=list(f_entrada.referencias))
+    schema._dependencias = list(dict.fromkeys(cursor.dependencias))
+    return schema
+
+
+# --- Acciones compartidas ---
+
+def _bloque(role: str, grupo=0, limpiar: Optional[Callable[[str], str]] = None):
+    """Acción de una línea: el texto es el grupo del match (o la línea completa, transformada por `limpiar`)."""
+    def accion(linea, m, cursor):
+        texto = m.group(grupo) if grupo else linea
+        return [ParagraphBlock(role=role, content=limpiar(texto) if limpiar else texto)]
+    return accion
+
+def _celdas_gfm(raw: str) -> List[str]:
+    return [c.strip() for c in raw.split("|") if c.strip()]
+
+def _filas_gfm(lineas: List[str]) -> List[List[str]]:
+    """Celdas no vacías de cada línea de la región, en bloque con el lector csv (sin comillas)."""
+    try:
+        return [[c for c in map(str.strip, fila) if c]
+                for fila in csv.reader(lineas, delimiter="|", quoting=csv.QUOTE_NONE)]
+    except csv.Error:
+        # Celdas más largas que csv.field_size_limit(): camino por línea
+        return [_celdas_gfm(raw) for raw in lineas]
+
+def _tabla(headers: List[str], filas: Iterable[List[str]]) -> ParagraphBlock:
+    """
+    Bloque tabla: se omiten las filas vacías, las cortas se rellenan con "" y las largas se
+    recortan al número de headers. Desde FILAS_COLUMNAR filas se entrega columnar.
+    """
+    n = len(headers)
+    filas = [f if len(f) == n else (f + [""] * (n - len(f)))[:n] for f in filas if f]
+    if n and len(filas) >= FILAS_COLUMNAR:
+        return ParagraphBlock(role="tabla", content=ColumnarTableBlock(
+            headers=headers, dtypes=["text"] * n, columns=[list(c) for c in zip(*filas)]))
+    return ParagraphBlock(role="tabla", content=TableBlock(headers=headers, rows=[TableRow(cells=f) for f in filas]))
+
+def _tabla_gfm(linea, m, cursor):
+    """Tabla GFM: encabezado + separador |---|; la región son las líneas que empiezan con '|'."""
+    sep = cursor.peek()
+    if sep is None or not set(sep.strip()) <= set("|-: "):
+        return None
+    next(cursor)
+    region = cursor.tomar_mientras(lambda raw: raw.lstrip().startswith("|"))
+    return [_tabla(_celdas_gfm(linea), _filas_gfm(region))]
+
+def _filas_csv(lector) -> List[List[str]]:
+    try:
+        return [[c.strip() for c in fila] for fila in lector if any(c.strip() for c in fila)]
+    except csv.Error as e:
+        raise ValueError(f"Tabla CSV inválida: {e}")
+
+def _tabla_desde_filas(filas: List[List[str]]) -> List[ParagraphBlock]:
+    """Primera fila = headers; sin filas no se genera bloque."""
+    return [_tabla(filas[0], filas[1:])] if filas else []
+
+def _tabla_csv(linea, m, cursor):
+    """Bloque ```csv / ```tsv embebido: se lee completo hasta el cierre ``` con el lector csv."""
+    region = cursor.tomar_mientras(lambda raw: not raw.lstrip().startswith("```"))
+    if cursor.peek() is not None:
+        next(cursor) # cierre del bloque
+    delimitador = "\t" if m.group(1) == "tsv" else ","
+    return _tabla_desde_filas(_filas_csv(csv.reader(region, delimiter=delimitador)))
+
+def _tabla_archivo(linea, m, cursor):
+    """
+    Referencia ![título](datos.csv|.tsv) en su propia línea: la tabla se lee del archivo,
+    relativo a la carpeta del documento. La ruta queda en cursor.dependencias para que el
+    IR cacheado y --watch también sigan al CSV.
+    """
+    ruta = os.path.abspath(os.path.join(cursor.origen or os.getcwd(), m.group(1)))
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"No se encontró la tabla referenciada: {ruta}")
+    cursor.dependencias.append(ruta)
+    with open(ruta, "r", encoding="utf-8-sig", newline="") as f:
+        filas = _filas_csv(csv.reader(f, delimiter="\t" if m.group(2) == "tsv" else ","))
+    return _tabla_desde_filas(filas)
+
+def _tabla_legacy(parar_en_titulo: bool, rellenar: bool):
+    """
+    Tabla de texto MGA ('Componente  Especificación Técnica ...'): filas separadas por doble
+    espacio hasta la línea TOTAL (y, en GFM, hasta un título '#').
+    """
+    def accion(linea, m, cursor):
+        rows = []
+        while True:
+            raw = cursor.peek()
+            if raw is None or "TOTAL" in raw or (parar_en_titulo and raw.strip().startswith("#")):
+                break
+            next(cursor)
+            row_line = raw.strip()
+            if not row_line:
+                continue
+            parts = [p.strip() for p in row_line.split("  ") if p.strip()]
+            if rellenar:
+                parts += [""] * (5 - len(parts))
+            elif len(parts) < 2:
+                parts = [row_line, "", "", "", ""]
+            rows.append(TableRow(cells=parts[:5]))
+        return [ParagraphBlock(role="tabla", content=TableBlock(headers=list(LEGACY_HEADERS), rows=rows))]
+    return accion
+
+def _quitar_numero_h1(texto: str) -> str:
+    return texto.split(".", 1)[1].strip() if "." in texto[:5] else texto
+
+def _quitar_numero_h2(texto: str) -> str:
+    return texto.split(" ", 1)[1].strip() if "." in texto[:5] else texto
+
+
+# --- Detectores ---
+
+# Marcas propias de Markdown (las viñetas '- ' también aparecen en texto plano, no cuentan)
+_MD_MARCAS = re.compile(r"^(#{1,6}\s|\|.*\||```)", re.M)
+_LEGACY_MARCAS = re.compile(r"^(\d+\.\s+[A-ZÁÉÍÓÚÑ\s]+|\d+\.\d+\s+.+|.*Componente.*Especificación Técnica.*)$", re.M)
+_TEXTO_BASE = 0.5
+
+def _detector_gfm(prefijo: str) -> float:
+    return float(len(_MD_MARCAS.findall(prefijo)))
+
+def _detector_legacy(prefijo: str) -> float:
+    # Las marcas markdown descartan el formato legacy (GFM también entiende los títulos numerados)
+    return 0.0 if _MD_MARCAS.search(prefijo) else float(len(_LEGACY_MARCAS.findall(prefijo)))
+
+def _detector_texto(prefijo: str) -> float:
+    # Puntaje fijo: gana solo si no hay marcas de los otros formatos
+    return _TEXTO_BASE
+
+
+# --- Formatos registrados ---
+
+registrar_formato(FormatoEntrada(
+    nombre="gfm",
+    descripcion="Markdown (GFM) con títulos #/##, títulos numerados, listas, tablas | col | y tablas CSV/TSV",
+    reglas=[
+        Regla("tabla_gfm", r"\|", _tabla_gfm),
+        Regla("tabla_csv", r"```(csv|tsv)\s*$", _tabla_csv),
+        Regla("tabla_archivo", r"!\[[^\]]*\]\(([^)]+\.(csv|tsv))\)$", _tabla_archivo),
+        Regla("tabla_legacy", r"(?!\|)(?=.*Componente).*Especificación Técnica", _tabla_legacy(parar_en_titulo=True, rellenar=True)),
+        Regla("lista", r"[-*] ", _bloque("lista_item", limpiar=lambda t: t[2:].strip())),
+        Regla("titulo1_md", r"#\s+(.+)$", _bloque("titulo1", grupo=1)),
+        Regla("titulo1_num", r"\d+\.\s+[A-ZÁÉÍÓÚÑ\s]+$", _bloque("titulo1", limpiar=_quitar_numero_h1)),
+        Regla("titulo2_num", r"\d+\.\d+\s+.+$", _bloque("titulo2", limpiar=_quitar_numero_h2)),
+        Regla("titulo2_md", r"##\s+(.+)$", _bloque("titulo2", grupo=1)),
+    ],
+    detector=_detector_gfm,
+    # Las tablas GFM y legacy se detienen ante una línea '#'; el bloque ```csv solo en su cierre
+    corte="titulo1_md",
+    region=("tabla_csv", r"[^\S\n]*```"),
+    metadata={"title": "DOCUMENTO TÉCNICO GENERADO", "author": "Google Antigravity Engine",
+              "institution": "Proyecto CITES - MGA", "date": "Febrero 2026"},
+    referencias=["Documento generado automáticamente por CITES Engine Local."],
+))
+
+registrar_formato(FormatoEntrada(
+    nombre="mga_legacy",
+    descripcion="Texto MGA: títulos '1. TITULO' / '1.1 Subtítulo', procesos 'Clave: valor' y tablas por doble espacio",
+    reglas=[
+        Regla("tabla_legacy", r"(?=.*Componente).*Especificación Técnica", _tabla_legacy(parar_en_titulo=False, rellenar=False)),
+        Regla("proceso", r"[^:]*:", _bloque("lista_item"), filtro=lambda m: len(m.group(0)[:-1].split()) < 5),
+        Regla("titulo1", r"\d+\.\s+[A-ZÁÉÍÓÚÑ\s]+$", _bloque("titulo1")),
+        Regla("titulo2", r"\d+\.\d+\s+.+$", _bloque("titulo2")),
+    ],
+    detector=_detector_legacy,
+    # La tabla legacy solo termina en TOTAL: un '1. TITULO' dentro de ella es una fila
+    corte="titulo1",
+    region=("tabla_legacy", r"[^\n]*TOTAL"),
+    metadata={"title": "APARTADO TÉCNICO - ANEXO MGA", "author": "Equipo de Formulación CITES",
+              "institution": "MinIgualdad - UNGRD", "date": "Febrero 2026"},
+    referencias=["Departamento Nacional de Planeación. (2013). Resolución 1450 de 2013.",
+                 "DNP. (2024). Guía para la Formulación de Proyectos de Inversión Pública MGA."],
+))
+
+registrar_formato(FormatoEntrada(
+    nombre="texto",
+    descripcion="Texto plano: párrafos separados por líneas en blanco, viñetas y títulos en MAYÚSCULAS",
+    reglas=[
+        Regla("lista", r"[-*•] ", _bloque("lista_item", limpiar=lambda t: t[2:].strip())),
+        Regla("titulo1", r"(?=.*[A-ZÁÉÍÓÚÑ])[^a-záéíóúñ]{3,80}$", _bloque("titulo1")),
+    ],
+    detector=_detector_texto,
+    # El título cierra el párrafo en curso, así que el corte no cambia la unión de líneas
+    corte="titulo1",
+    metadata={"title": "DOCUMENTO TÉCNICO GENERADO", "author": "Equipo de Formulación CITES",
+              "institution": "Proyecto CITES - MGA"},
+    unir_parrafos=True,
+))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parsea archivos con el registro de formatos y reporta el rendimiento")
+    parser.add_argument("archivos", nargs="+")
+    parser.add_argument("--formato", default="auto", choices=["auto", *REGISTRO])
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos para partir archivos grandes por títulos de primer nivel (0: todos los núcleos)")
+    args = parser.parse_args()
+
+    for archivo in args.archivos:
+        try:
+            with open(archivo, "r", encoding="utf-8") as f:
+                formato = detectar_formato(f.read(PREFIJO_DETECCION)) if args.formato == "auto" else args.formato
+            if args.procesos == 1:
+                doc = parsear_archivo(archivo, formato)
+            else:
+                doc = parsear_archivo_paralelo(archivo, formato, procesos=args.procesos or None)
+            print(f"📄 {archivo}: {formato}, {len(doc.content)} bloques")
+        except (OSError, ValueError) as e:
+            print(f"❌ {archivo}: {e}")
+    for nombre, s in estadisticas().items():
+        if s.archivos:
+            print(f"⏱️ {nombre}: {s.archivos} archivos, {s.lineas:,} líneas, {s.bloques:,} bloques, "
+                  f"{s.lineas_por_segundo:,.0f} líneas/s, {s.mb_por_segundo:.2f} MB/s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, List, Union, Literal
+from pydantic import BaseModel, Field, field_validator, field_serializer, model_validator, ConfigDict, PrivateAttr
+from typing import Any, Dict, Optional, List, Sequence, Union, Literal
 import datetime
+import numpy as np
 
 class APAAuthor(BaseModel):
     """
@@ -73,10 +74,165 @@ class TableBlock(BaseModel):
     rows: List[TableRow]
     headers: List[str]
 
+# --- Tablas columnares (presupuestos y cronogramas con miles de filas) ---
+
+ColumnDtype = Literal["text", "money", "int", "date"]
+
+def _a_float(valores, nombre: str) -> np.ndarray:
+    """Columna numérica: camino rápido con np.asarray; si hay texto tipo '$1,500' se limpia en bloque."""
+    try:
+        return np.asarray(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+    texto = np.asarray(["" if v is None else str(v) for v in valores], dtype=str)
+    for simbolo in ("$", ",", " "):
+        texto = np.char.replace(texto, simbolo, "")
+    texto = np.where(texto == "", "nan", texto)
+    try:
+        return texto.astype(np.float64)
+    except ValueError:
+        raise ValueError(f"Columna '{nombre}': hay valores no numéricos.")
+
+def _convertir_columna(valores, dtype: str, nombre: str):
+    """Valida y convierte una columna completa según su tipo (una sola pasada por columna)."""
+    if dtype == "text":
+        return [v if isinstance(v, str) else ("" if v is None else str(v)) for v in valores]
+    if dtype == "money":
+        return _a_float(valores, nombre)
+    if dtype == "int":
+        arr = _a_float(valores, nombre)
+        if np.isnan(arr).any() or not np.array_equal(arr, np.rint(arr)):
+            raise ValueError(f"Columna '{nombre}': se esperaban enteros sin celdas vacías.")
+        return arr.astype(np.int64)
+    try:
+        return np.asarray([None if v == "" else v for v in valores], dtype="datetime64[D]")
+    except (TypeError, ValueError):
+        raise ValueError(f"Columna '{nombre}': fechas inválidas (se espera AAAA-MM-DD).")
+
+def _formatear_unicos(arr: np.ndarray, fmt) -> List[str]:
+    """Formatea solo los valores distintos y los reparte con el índice inverso de np.unique."""
+    unicos, inverso = np.unique(arr, return_inverse=True)
+    return np.array([fmt(v) for v in unicos.tolist()], dtype=object)[inverso.reshape(-1)].tolist()
+
+def _formatear_columna(col, dtype: str) -> List[str]:
+    if dtype == "text":
+        return col
+    if dtype == "money":
+        return _formatear_unicos(col, lambda v: "" if v != v else f"${v:,.0f}")
+    if dtype == "int":
+        return col.astype(str).tolist()
+    return np.where(np.isnat(col), "", np.datetime_as_string(col, unit="D")).tolist()
+
+class ColumnarRow:
+    """Fila liviana con la misma interfaz que TableRow (`cells`)."""
+    __slots__ = ("cells",)
+
+    def __init__(self, cells: List[str]):
+        self.cells = cells
+
+class ColumnarRows:
+    """Secuencia perezosa de filas: cada fila se arma al pedirla desde las columnas ya formateadas."""
+
+    def __init__(self, columnas: List[List[str]], n: int):
+        self._columnas = columnas
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        for cells in zip(*self._columnas):
+            yield ColumnarRow(list(cells))
+
+    def __getitem__(self, i: int) -> ColumnarRow:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return ColumnarRow([c[i] for c in self._columnas])
+
+class ColumnarTableBlock(BaseModel):
+    """
+    Variante columnar de TableBlock: un arreglo por columna con su tipo declarado
+    (text, money, int, date). La validación corre una vez por columna y el formato
+    numérico se aplica vectorizado al renderizar; `rows` entrega filas perezosas.
+    """
+    kind: Literal["columnar"] = "columnar"
+    headers: List[str]
+    dtypes: List[ColumnDtype]
+    columns: List[Any] = Field(..., description="Un arreglo por columna, en el orden de headers")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True, extra='ignore')
+
+    _formateadas: Optional[List[List[str]]] = PrivateAttr(default=None)
+    _convertidas: bool = PrivateAttr(default=False)
+
+    @model_validator(mode="after")
+    def _validar_columnas(self):
+        # Pydantic vuelve a correr este validador al anidar la instancia (ParagraphBlock.content)
+        if self._convertidas:
+            return self
+        if not len(self.headers) == len(self.dtypes) == len(self.columns):
+            raise ValueError("headers, dtypes y columns deben tener el mismo largo.")
+        self.columns = [_convertir_columna(c, t, h) for c, t, h in zip(self.columns, self.dtypes, self.headers)]
+        largos = {len(c) for c in self.columns}
+        if len(largos) > 1:
+            raise ValueError(f"Las columnas tienen largos distintos: {sorted(largos)}")
+        self._convertidas = True
+        return self
+
+    @field_serializer("columns")
+    def _serializar_columnas(self, columns):
+        salida = []
+        for col, dtype in zip(columns, self.dtypes):
+            if dtype == "text":
+                salida.append(list(col))
+            elif dtype == "money":
+                salida.append(np.where(np.isnan(col), None, col).tolist())
+            elif dtype == "int":
+                salida.append(col.tolist())
+            else:
+                salida.append([None if v == "NaT" else v for v in np.datetime_as_string(col, unit="D").tolist()])
+        return salida
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def formatted_columns(self) -> List[List[str]]:
+        """Columnas como texto listo para el documento (se calcula una vez y se cachea)."""
+        if self._formateadas is None:
+            self._formateadas = [_formatear_columna(c, t) for c, t in zip(self.columns, self.dtypes)]
+        return self._formateadas
+
+    @property
+    def rows(self) -> ColumnarRows:
+        return ColumnarRows(self.formatted_columns(), self.n_rows)
+
+    @classmethod
+    def from_rows(cls, headers: Sequence[str], rows: Sequence[Sequence[Any]],
+                  dtypes: Optional[Sequence[str]] = None) -> "ColumnarTableBlock":
+        """Desde filas (listas); las filas cortas se rellenan y las largas se recortan al número de headers."""
+        n = len(headers)
+        columnas = [[r[j] if j < len(r) else None for r in rows] for j in range(n)]
+        return cls(headers=list(headers), dtypes=list(dtypes or ["text"] * n), columns=columnas)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]],
+                     dtypes: Optional[Dict[str, str]] = None) -> "ColumnarTableBlock":
+        """Desde una lista de dicts (formato 'datos' de los módulos MGA); dtypes por nombre de columna."""
+        headers = list(records[0].keys()) if records else []
+        dtypes = dtypes or {}
+        return cls(headers=headers, dtypes=[dtypes.get(h, "text") for h in headers],
+                   columns=[[r.get(h) for r in records] for h in headers])
+
+    def to_table_block(self) -> TableBlock:
+        return TableBlock(headers=self.headers, rows=[TableRow(cells=r.cells) for r in self.rows])
+
 class ParagraphBlock(BaseModel):
     """Contrato para cada unidad de contenido del documento."""
     role: Literal["titulo1", "titulo2", "titulo3", "cuerpo", "cita_larga", "referencia", "lista_item", "tabla"] = Field(..., description="Rol semántico del bloque")
-    content: Union[str, TableBlock] = Field(..., description="Texto o estructura de tabla")
+    content: Union[str, TableBlock, ColumnarTableBlock] = Field(..., description="Texto o estructura de tabla")
     
     model_config = ConfigDict(extra='ignore')
 
@@ -97,3 +253,11 @@ class FullDocumentSchema(BaseModel):
     references: List[str] = Field(..., description="Lista de referencias bibliográficas ya formateadas o raw")
 
     model_config = ConfigDict(extra='ignore')
+
+    # Archivos externos leídos al parsear (tablas CSV referenciadas), en rutas absolutas.
+    # No forman parte del contenido: el IR los guarda en su huella de fuente.
+    _dependencias: List[str] = PrivateAttr(default_factory=list)
+
+    @property
+    def dependencias(self) -> List[str]:
+        return self._dependencias
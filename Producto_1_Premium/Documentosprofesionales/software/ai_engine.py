@@ -10,6 +10,57 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 # --- 1. CONFIGURACIÓN DEL CEREBRO (Gemini) ---
 API_KEY = os.environ.get("GEMINI_API_KEY")
 
+def _build_mga_prompt(text_input):
+    """Prompt de estructuración MGA (compartido por el modo bloqueante y el streaming)."""
+    return f"""
+    Actúa como un Experto en Formulación de Proyectos bajo la Metodología General Ajustada (MGA).
+    Tu tarea es leer el siguiente texto desordenado y extraer/inferir la información para estructurarla en un JSON.
+    
+    TEXTO DEL USUARIO:
+    "{text_input}"
+
+    REGLAS DE EXTRACCIÓN:
+    1. Identifica un Título corto y la Entidad responsable.
+    2. Resume el Problema Central y el Objetivo General.
+    3. Identifica la Población y Ubicación.
+    4. Crea una Descripción Técnica de la solución.
+    5. Infiere una tabla de Especificaciones Técnicas (al menos 3 items).
+    6. Infiere un Cronograma (Fases, Actividades, Duración, Responsable).
+    7. Infiere un Presupuesto (Ítem, Unidad, Cantidad, Valor Unitario). Estima valores realistas en COP si no están.
+    8. Infiere Riesgos (Riesgo, Probabilidad, Impacto, Mitigación).
+
+    FORMATO JSON DE SALIDA (ESTRICTO):
+    {{
+        "title": "Título del Proyecto",
+        "entity": "Entidad Proponente",
+        "sections": {{
+            "identificacion": {{
+                "problema": "...",
+                "objetivo": "...",
+                "poblacion": "...",
+                "ubicacion": "..."
+            }},
+            "tecnica": {{
+                "descripcion": "...",
+                "especificaciones": [
+                    {{"Característica": "...", "Detalle": "..."}}
+                ]
+            }},
+            "cronograma": [
+                {{"Fase": "...", "Actividad": "...", "Duración": "...", "Responsable": "..."}}
+            ],
+            "presupuesto": [
+                {{"Ítem": "...", "Unidad": "...", "Cantidad": 1, "Valor Unitario": 1000}}
+            ],
+            "riesgos": [
+                {{"Riesgo": "...", "Probabilidad": "Alta/Media/Baja", "Impacto": "Alto/Medio/Bajo", "Mitigación": "..."}}
+            ]
+        }}
+    }}
+    
+    Responde SOLO con el JSON válido. Sin markdown, sin explicaciones.
+    """
+
 def analyze_unstructured_text(text_input, api_key=None):
     """
     Toma un texto desordenado (notas, correos, ideas) y lo estructura 
@@ -25,54 +76,7 @@ def analyze_unstructured_text(text_input, api_key=None):
         genai.configure(api_key=current_key)
         model = genai.GenerativeModel('gemini-2.0-flash')
 
-        prompt = f"""
-        Actúa como un Experto en Formulación de Proyectos bajo la Metodología General Ajustada (MGA).
-        Tu tarea es leer el siguiente texto desordenado y extraer/inferir la información para estructurarla en un JSON.
-        
-        TEXTO DEL USUARIO:
-        "{text_input}"
-
-        REGLAS DE EXTRACCIÓN:
-        1. Identifica un Título corto y la Entidad responsable.
-        2. Resume el Problema Central y el Objetivo General.
-        3. Identifica la Población y Ubicación.
-        4. Crea una Descripción Técnica de la solución.
-        5. Infiere una tabla de Especificaciones Técnicas (al menos 3 items).
-        6. Infiere un Cronograma (Fases, Actividades, Duración, Responsable).
-        7. Infiere un Presupuesto (Ítem, Unidad, Cantidad, Valor Unitario). Estima valores realistas en COP si no están.
-        8. Infiere Riesgos (Riesgo, Probabilidad, Impacto, Mitigación).
-
-        FORMATO JSON DE SALIDA (ESTRICTO):
-        {{
-            "title": "Título del Proyecto",
-            "entity": "Entidad Proponente",
-            "sections": {{
-                "identificacion": {{
-                    "problema": "...",
-                    "objetivo": "...",
-                    "poblacion": "...",
-                    "ubicacion": "..."
-                }},
-                "tecnica": {{
-                    "descripcion": "...",
-                    "especificaciones": [
-                        {{"Característica": "...", "Detalle": "..."}}
-                    ]
-                }},
-                "cronograma": [
-                    {{"Fase": "...", "Actividad": "...", "Duración": "...", "Responsable": "..."}}
-                ],
-                "presupuesto": [
-                    {{"Ítem": "...", "Unidad": "...", "Cantidad": 1, "Valor Unitario": 1000}}
-                ],
-                "riesgos": [
-                    {{"Riesgo": "...", "Probabilidad": "Alta/Media/Baja", "Impacto": "Alto/Medio/Bajo", "Mitigación": "..."}}
-                ]
-            }}
-        }}
-        
-        Responde SOLO con el JSON válido. Sin markdown, sin explicaciones.
-        """
+        prompt = _build_mga_prompt(text_input)
 
         response = model.generate_content(prompt)
         # Limpieza básica por si el modelo incluye markdown
@@ -84,6 +88,87 @@ def analyze_unstructured_text(text_input, api_key=None):
         print(f"[ERROR AI ENGINE]: {e}")
         return _get_mock_mga_data()
 
+# Claves que se entregan de forma progresiva (en el orden en que el modelo las escribe)
+PROGRESSIVE_KEYS = ("title", "entity", "identificacion", "tecnica", "cronograma", "presupuesto", "riesgos")
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_completed_keys(buffer, pending):
+    """
+    Busca en un JSON parcial los valores ya cerrados de las claves pendientes.
+    Un valor se considera listo cuando raw_decode lo puede leer completo.
+    """
+    found = {}
+    for key in pending:
+        marker = buffer.find(f'"{key}"')
+        if marker < 0:
+            continue
+        colon = buffer.find(":", marker + len(key) + 2)
+        if colon < 0:
+            continue
+        start = colon + 1
+        while start < len(buffer) and buffer[start] in " \t\r\n":
+            start += 1
+        try:
+            value, _ = _JSON_DECODER.raw_decode(buffer, start)
+        except json.JSONDecodeError:
+            continue  # Valor aún incompleto
+        found[key] = value
+    return found
+
+def _stream_mock_data(cancel_event=None):
+    mock = _get_mock_mga_data()
+    for key in PROGRESSIVE_KEYS:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        yield key, mock[key] if key in mock else mock["sections"][key]
+
+def stream_unstructured_text(text_input, api_key=None, cancel_event=None):
+    """
+    Variante progresiva de analyze_unstructured_text.
+    Genera tuplas (clave, valor) a medida que cada sección del JSON queda completa
+    en la respuesta en streaming. Se detiene si `cancel_event` se activa.
+    """
+    current_key = api_key if api_key else API_KEY
+
+    if not current_key:
+        print("[AVISO] No API Key. Retornando Mock Data.")
+        yield from _stream_mock_data(cancel_event)
+        return
+
+    pending = list(PROGRESSIVE_KEYS)
+    buffer = ""
+    try:
+        genai.configure(api_key=current_key)
+        model = genai.GenerativeModel('gemini-2.0-flash')
+        response = model.generate_content(_build_mga_prompt(text_input), stream=True)
+
+        for chunk in response:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            buffer += chunk.text
+            for key, value in _extract_completed_keys(buffer, pending).items():
+                pending.remove(key)
+                yield key, value
+
+        # Cierre: parseo completo para cualquier clave no detectada en streaming
+        if pending:
+            clean_json = buffer.replace('```json', '').replace('```', '').strip()
+            data = json.loads(clean_json)
+            for key in list(pending):
+                value = data.get(key, data.get("sections", {}).get(key))
+                if value is not None:
+                    pending.remove(key)
+                    yield key, value
+
+    except Exception as e:
+        print(f"[ERROR AI ENGINE]: {e}")
+        if len(pending) == len(PROGRESSIVE_KEYS):
+            # Mismo comportamiento que el modo bloqueante: sin datos parciales -> Mock
+            yield from _stream_mock_data(cancel_event)
+        else:
+            raise
+
 def _get_mock_mga_data():
     """Datos de prueba por si falla la API o no hay key"""
     return {
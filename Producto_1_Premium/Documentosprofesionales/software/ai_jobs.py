@@ -0,0 +1,115 @@
+import re
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+try:
+    from .ai_engine import stream_unstructured_text, PROGRESSIVE_KEYS
+except ImportError:
+    from ai_engine import stream_unstructured_text, PROGRESSIVE_KEYS
+
+# Estados del trabajo
+PENDIENTE = "pendiente"
+EJECUTANDO = "ejecutando"
+COMPLETADO = "completado"
+CANCELADO = "cancelado"
+ERROR = "error"
+
+# Trabajos terminados que se conservan (para mostrar su resultado y deduplicar); los más viejos se descartan
+MAX_TERMINADOS = 32
+
+
+def fingerprint_text(text_input: str, with_key: bool) -> str:
+    """Huella del texto normalizado (espacios colapsados) para deduplicar llamadas."""
+    normalized = re.sub(r"\s+", " ", text_input or "").strip()
+    raw = f"{int(with_key)}|{normalized}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:24]
+
+
+class AIStructuringJob:
+    """Estructuración IA ejecutada fuera del hilo del script, con resultados parciales."""
+
+    def __init__(self, fingerprint: str, text_input: str, api_key: Optional[str] = None):
+        self.fingerprint = fingerprint
+        self._text_input = text_input
+        self._api_key = api_key
+        self._lock = threading.Lock()
+        self._sections: Dict[str, object] = {}
+        self.cancel_event = threading.Event()
+        self.status = PENDIENTE
+        self.error: Optional[str] = None
+
+    def run(self):
+        if self.cancel_event.is_set():
+            # Cancelado mientras esperaba en el pool: no se llama al modelo
+            self.status = CANCELADO
+            self._api_key = None
+            return
+        self.status = EJECUTANDO
+        try:
+            for key, value in stream_unstructured_text(self._text_input, self._api_key, self.cancel_event):
+                with self._lock:
+                    self._sections[key] = value
+            self.status = CANCELADO if self.cancel_event.is_set() else COMPLETADO
+        except Exception as e:
+            self.error = str(e)
+            self.status = ERROR
+        finally:
+            self._api_key = None
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.status == PENDIENTE:
+            self.status = CANCELADO
+
+    def snapshot(self) -> Dict[str, object]:
+        """Copia de las secciones completas hasta el momento."""
+        with self._lock:
+            return dict(self._sections)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETADO, CANCELADO, ERROR)
+
+    @property
+    def progress(self) -> float:
+        with self._lock:
+            return len(self._sections) / len(PROGRESSIVE_KEYS)
+
+
+class AIJobManager:
+    """
+    Registro de trabajos IA por huella del texto de entrada.
+    Si el mismo texto ya está en curso (o terminó bien), se reutiliza el trabajo existente
+    en lugar de lanzar otra llamada al modelo. Solo se conservan los `max_terminados`
+    trabajos terminados más recientes (el manager vive lo que dura el proceso).
+    """
+
+    def __init__(self, max_workers: int = 2, max_terminados: int = MAX_TERMINADOS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mga-ai")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, AIStructuringJob] = {} # en orden de envío
+        self.max_terminados = max_terminados
+
+    def _descartar_terminados(self):
+        terminados = [fp for fp, job in self._jobs.items() if job.done]
+        for fp in terminados[:max(0, len(terminados) - self.max_terminados)]:
+            del self._jobs[fp]
+
+    def submit(self, text_input: str, api_key: Optional[str] = None) -> AIStructuringJob:
+        fingerprint = fingerprint_text(text_input, bool(api_key))
+        with self._lock:
+            job = self._jobs.get(fingerprint)
+            if job is not None and job.status in (PENDIENTE, EJECUTANDO, COMPLETADO):
+                return job
+            job = AIStructuringJob(fingerprint, text_input, api_key)
+            self._jobs.pop(fingerprint, None) # reenvío: pasa al final del orden
+            self._jobs[fingerprint] = job
+            self._descartar_terminados()
+            self._executor.submit(job.run)
+            return job
+
+    def get(self, fingerprint: str) -> Optional[AIStructuringJob]:
+        with self._lock:
+            return self._jobs.get(fingerprint)
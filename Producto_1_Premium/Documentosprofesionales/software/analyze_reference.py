@@ -1,69 +1,322 @@
 import os
-from docx import Document
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, List, Optional, Tuple
+
+from docx.styles import BabelFish
+
+# Análisis en streaming del DOCX: word/document.xml y styles.xml se leen directo del zip
+# con iterparse; cada elemento se procesa en su evento 'end' y se retira de su padre,
+# así la memoria depende de la anidación del XML y no del tamaño del documento.
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+TWIPS_POR_PULGADA = 1440
+MUESTRA_PARRAFOS = 3
+
+_P, _R, _T, _TBL, _TR = W + "p", W + "r", W + "t", W + "tbl", W + "tr"
+_PPR, _RPR, _TBLPR, _SECTPR = W + "pPr", W + "rPr", W + "tblPr", W + "sectPr"
+_BODY = W + "body"
+
+
+@dataclass
+class EstiloInfo:
+    nombre: str
+    tipo: str
+    basado_en: Optional[str] = None
+    fuente: Optional[str] = None      # resuelta por la cadena basedOn y docDefaults
+    tamano_pt: Optional[float] = None
+
+
+@dataclass
+class SeccionInfo:
+    margen_superior: Optional[float] = None # pulgadas
+    margen_inferior: Optional[float] = None
+    margen_izquierdo: Optional[float] = None
+    margen_derecho: Optional[float] = None
+    ancho: Optional[float] = None
+    alto: Optional[float] = None
+    orientacion: str = "portrait"
+    header_propio: bool = False
+    footer_propio: bool = False
+
+
+@dataclass
+class AnalisisDocx:
+    archivo: str
+    fuente_base: Optional[str] = None
+    tamano_base_pt: Optional[float] = None
+    secciones: List[SeccionInfo] = field(default_factory=list)
+    estilos_definidos: Dict[str, EstiloInfo] = field(default_factory=dict) # por styleId
+    parrafos: int = 0
+    parrafos_vacios: int = 0
+    runs: int = 0
+    caracteres: int = 0
+    estilos_parrafo: Counter = field(default_factory=Counter)     # párrafos con texto, por nombre de estilo
+    fuentes_explicitas: Counter = field(default_factory=Counter)  # runs con rFonts propio
+    fuentes_efectivas: Counter = field(default_factory=Counter)   # caracteres por fuente resuelta
+    tamanos_efectivos: Counter = field(default_factory=Counter)   # caracteres por tamaño (pt)
+    tablas: int = 0
+    filas_tabla: int = 0
+    estilos_tabla: Counter = field(default_factory=Counter)
+    columnas_tabla: Counter = field(default_factory=Counter)      # número de columnas -> tablas
+    muestra: List[Tuple[str, str]] = field(default_factory=list)  # (estilo, texto) de los primeros párrafos
+
+    def to_dict(self) -> dict:
+        """Dict serializable a JSON (los Counter como dicts ordenados por frecuencia)."""
+        d = {f.name: getattr(self, f.name) for f in fields(self)}
+        for k, v in d.items():
+            if isinstance(v, Counter):
+                d[k] = dict(v.most_common())
+        d["secciones"] = [asdict(s) for s in self.secciones]
+        d["estilos_definidos"] = {k: asdict(e) for k, e in self.estilos_definidos.items()}
+        d["muestra"] = [list(m) for m in self.muestra]
+        return d
+
+
+def _fuente(rfonts: ET.Element, tema: Dict[str, str]) -> Optional[str]:
+    """Nombre de fuente de un w:rFonts: explícita (ascii/hAnsi) o la del tema (minor/major)."""
+    for attr in ("ascii", "hAnsi"):
+        if rfonts.get(W + attr):
+            return rfonts.get(W + attr)
+    for attr in ("asciiTheme", "hAnsiTheme"):
+        valor = rfonts.get(W + attr)
+        if valor:
+            return tema.get("major" if valor.startswith("major") else "minor")
+    return None
+
+def _tamano(sz: ET.Element) -> Optional[float]:
+    valor = sz.get(W + "val")
+    return float(valor) / 2 if valor else None # medios puntos
+
+def _pulgadas(elem: ET.Element, attr: str) -> Optional[float]:
+    valor = elem.get(W + attr)
+    return round(float(valor) / TWIPS_POR_PULGADA, 3) if valor else None
+
+def _leer_tema(z: zipfile.ZipFile) -> Dict[str, str]:
+    """Fuentes minor/major del tema (las que usa Word cuando el estilo apunta al tema)."""
+    if "word/theme/theme1.xml" not in z.namelist():
+        return {}
+    tema = {}
+    with z.open("word/theme/theme1.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag in (A + "minorFont", A + "majorFont"):
+                latin = elem.find(A + "latin")
+                if latin is not None and latin.get("typeface"):
+                    tema["minor" if elem.tag == A + "minorFont" else "major"] = latin.get("typeface")
+                elem.clear()
+    return tema
+
+def _leer_estilos(z: zipfile.ZipFile, analisis: AnalisisDocx, tema: Dict[str, str]) -> Optional[str]:
+    """Llena estilos_definidos y la fuente base; retorna el styleId del estilo de párrafo por defecto."""
+    if "word/styles.xml" not in z.namelist():
+        return None
+    por_defecto = None
+    propios: Dict[str, Tuple[Optional[str], Optional[float]]] = {}
+    with z.open("word/styles.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == W + "rPrDefault":
+                rfonts, sz = elem.find(f"{_RPR}/{W}rFonts"), elem.find(f"{_RPR}/{W}sz")
+                analisis.fuente_base = _fuente(rfonts, tema) if rfonts is not None else None
+                analisis.tamano_base_pt = _tamano(sz) if sz is not None else None
+                elem.clear()
+            elif elem.tag == W + "style":
+                style_id, tipo = elem.get(W + "styleId"), elem.get(W + "type", "")
+                nombre, basado = elem.find(W + "name"), elem.find(W + "basedOn")
+                rfonts, sz = elem.find(f"{_RPR}/{W}rFonts"), elem.find(f"{_RPR}/{W}sz")
+                # Nombres como los muestra Word/python-docx ('heading 1' -> 'Heading 1')
+                analisis.estilos_definidos[style_id] = EstiloInfo(
+                    nombre=BabelFish.internal2ui(nombre.get(W + "val")) if nombre is not None else style_id, tipo=tipo,
+                    basado_en=basado.get(W + "val") if basado is not None else None)
+                propios[style_id] = (_fuente(rfonts, tema) if rfonts is not None else None,
+                                     _tamano(sz) if sz is not None else None)
+                if tipo == "paragraph" and elem.get(W + "default") in ("1", "true"):
+                    por_defecto = style_id
+                elem.clear()
+
+    def resolver(style_id, i, vistos=()):
+        # Propiedad i (0 fuente, 1 tamaño) por la cadena basedOn; corta ciclos mal formados
+        if style_id not in propios or style_id in vistos:
+            return None
+        valor = propios[style_id][i]
+        if valor is None:
+            return resolver(analisis.estilos_definidos[style_id].basado_en, i, (*vistos, style_id))
+        return valor
+
+    for style_id, info in analisis.estilos_definidos.items():
+        info.fuente = resolver(style_id, 0) or analisis.fuente_base
+        info.tamano_pt = resolver(style_id, 1) or analisis.tamano_base_pt
+    return por_defecto
+
+def analizar_docx(file_path) -> AnalisisDocx:
+    """
+    Estadísticas completas de estilos, fuentes, tablas y secciones de un DOCX, en una sola
+    pasada en streaming y con memoria acotada (sirve para referencias de cientos de MB).
+    Acepta una ruta o un archivo en memoria (BytesIO, p.ej. una plantilla recién generada).
+    """
+    analisis = AnalisisDocx(archivo=os.path.basename(file_path) if isinstance(file_path, str) else "")
+    with zipfile.ZipFile(file_path) as z:
+        tema = _leer_tema(z)
+        por_defecto = _leer_estilos(z, analisis, tema)
+        estilos = analisis.estilos_definidos
+        with z.open("word/document.xml") as f:
+            _recorrer_documento(f, analisis, estilos, por_defecto, tema)
+    return analisis
+
+def _recorrer_documento(f, analisis: AnalisisDocx, estilos: Dict[str, EstiloInfo],
+                        por_defecto: Optional[str], tema: Dict[str, str]):
+    pila: List[ET.Element] = []                 # elementos abiertos (el padre de cada 'end' es pila[-1])
+    parrafos: List[dict] = []                   # párrafos abiertos (los cuadros de texto anidan párrafos)
+    tablas: List[dict] = []
+    runs: List[dict] = []                       # idem para runs (un cuadro de texto vive dentro de un run)
+    seccion: Optional[SeccionInfo] = None
+
+    for evento, elem in ET.iterparse(f, events=("start", "end")):
+        tag = elem.tag
+        if evento == "start":
+            if tag == _P:
+                parrafos.append({"estilo": por_defecto, "caracteres": 0, "texto": []})
+            elif tag == _R:
+                runs.append({"fuente": None, "tamano": None, "estilo": None, "caracteres": 0})
+            elif tag == _TBL:
+                tablas.append({"estilo": None, "filas": 0, "columnas": 0})
+            elif tag == _SECTPR and pila and pila[-1].tag in (_BODY, _PPR):
+                seccion = SeccionInfo()
+            pila.append(elem)
+            continue
+
+        pila.pop()
+        padre = pila[-1] if pila else None
+        abuelo = pila[-2].tag if len(pila) > 1 else None
+
+        if tag == _T and padre is not None and padre.tag == _R and parrafos:
+            texto = elem.text or ""
+            parrafos[-1]["caracteres"] += len(texto)
+            if len(analisis.muestra) < MUESTRA_PARRAFOS:
+                parrafos[-1]["texto"].append(texto)
+            if runs:
+                runs[-1]["caracteres"] += len(texto)
+        elif padre is not None and padre.tag == _RPR and abuelo == _R and runs:
+            # Propiedades del run (no las de la marca de párrafo en pPr/rPr)
+            run = runs[-1]
+            if tag == W + "rFonts":
+                run["fuente"] = _fuente(elem, tema)
+                if elem.get(W + "ascii") or elem.get(W + "hAnsi"):
+                    analisis.fuentes_explicitas[run["fuente"]] += 1
+            elif tag == W + "sz":
+                run["tamano"] = _tamano(elem)
+            elif tag == W + "rStyle":
+                run["estilo"] = elem.get(W + "val")
+        elif tag == _R and runs:
+            run = runs.pop()
+            analisis.runs += 1
+            n = run["caracteres"]
+            if n:
+                estilo_run = estilos.get(run["estilo"])
+                estilo_p = estilos.get(parrafos[-1]["estilo"]) if parrafos else None
+                fuente = (run["fuente"] or (estilo_run and estilo_run.fuente)
+                          or (estilo_p and estilo_p.fuente) or analisis.fuente_base)
+                tamano = (run["tamano"] or (estilo_run and estilo_run.tamano_pt)
+                          or (estilo_p and estilo_p.tamano_pt) or analisis.tamano_base_pt)
+                analisis.fuentes_efectivas[fuente or "(sin definir)"] += n
+                analisis.tamanos_efectivos[tamano or 0.0] += n
+        elif tag == W + "pStyle" and padre is not None and padre.tag == _PPR and abuelo == _P and parrafos:
+            parrafos[-1]["estilo"] = elem.get(W + "val")
+        elif tag == _P and parrafos:
+            p = parrafos.pop()
+            analisis.parrafos += 1
+            if p["caracteres"] == 0:
+                analisis.parrafos_vacios += 1
+            else:
+                info = estilos.get(p["estilo"])
+                nombre = info.nombre if info else (p["estilo"] or "Normal")
+                analisis.estilos_parrafo[nombre] += 1
+                analisis.caracteres += p["caracteres"]
+                if len(analisis.muestra) < MUESTRA_PARRAFOS and "".join(p["texto"]).strip():
+                    analisis.muestra.append((nombre, "".join(p["texto"])[:100]))
+        elif tag == W + "tblStyle" and padre is not None and padre.tag == _TBLPR and abuelo == _TBL and tablas:
+            tablas[-1]["estilo"] = elem.get(W + "val")
+        elif tag == W + "gridCol" and abuelo == _TBL and tablas:
+            tablas[-1]["columnas"] += 1
+        elif tag == _TR and tablas:
+            tablas[-1]["filas"] += 1
+        elif tag == _TBL and tablas:
+            t = tablas.pop()
+            info = estilos.get(t["estilo"])
+            analisis.tablas += 1
+            analisis.filas_tabla += t["filas"]
+            analisis.estilos_tabla[info.nombre if info else (t["estilo"] or "(sin estilo)")] += 1
+            analisis.columnas_tabla[t["columnas"]] += 1
+        elif seccion is not None and padre is not None and padre.tag == _SECTPR:
+            if tag == W + "pgMar":
+                seccion.margen_superior, seccion.margen_inferior = _pulgadas(elem, "top"), _pulgadas(elem, "bottom")
+                seccion.margen_izquierdo, seccion.margen_derecho = _pulgadas(elem, "left"), _pulgadas(elem, "right")
+            elif tag == W + "pgSz":
+                seccion.ancho, seccion.alto = _pulgadas(elem, "w"), _pulgadas(elem, "h")
+                seccion.orientacion = elem.get(W + "orient", "portrait")
+            elif tag in (W + "headerReference", W + "footerReference") and elem.get(W + "type", "default") == "default":
+                # Igual que python-docx: sin referencia 'default' la sección hereda de la anterior
+                if tag == W + "headerReference":
+                    seccion.header_propio = True
+                else:
+                    seccion.footer_propio = True
+        elif tag == _SECTPR and seccion is not None and padre is not None and padre.tag in (_BODY, _PPR):
+            analisis.secciones.append(seccion)
+            seccion = None
+
+        # Ya procesado: se retira del árbol (es el único hijo que queda en su padre)
+        if padre is not None:
+            padre.remove(elem)
 
 def analyze_docx(file_path):
     print(f"\n{'='*50}")
     print(f"ANALIZANDO: {os.path.basename(file_path)}")
     print(f"{'='*50}")
-    
+
     if not os.path.exists(file_path):
         print(f"Archivo no encontrado: {file_path}")
         return
 
     try:
-        doc = Document(file_path)
-        
-        # 1. Análisis de Secciones (Márgenes)
-        print("\n--- [1. Configuración de Página] ---")
-        for i, section in enumerate(doc.sections):
-            top = section.top_margin.inches if section.top_margin else 0
-            bottom = section.bottom_margin.inches if section.bottom_margin else 0
-            left = section.left_margin.inches if section.left_margin else 0
-            right = section.right_margin.inches if section.right_margin else 0
-            print(f"Sección {i+1}: Márgenes (T:{top:.2f}, B:{bottom:.2f}, L:{left:.2f}, R:{right:.2f}) inches")
-            
-            # Header/Footer
-            has_header = not section.header.is_linked_to_previous
-            has_footer = not section.footer.is_linked_to_previous
-            print(f"   Header propio: {has_header}, Footer propio: {has_footer}")
-
-        # 2. Análisis de Estilos en Uso
-        print("\n--- [2. Estilos Detectados en Párrafos] ---")
-        styles_used = set()
-        fonts_used = set()
-        
-        # Muestreo de los primeros 50 párrafos para no saturar
-        for p in doc.paragraphs[:50]:
-            if p.text.strip():
-                styles_used.add(p.style.name)
-                for run in p.runs:
-                    if run.font.name:
-                        fonts_used.add(run.font.name)
-        
-        print(f"Estilos únicos detectados: {list(styles_used)}")
-        print(f"Fuentes explícitas detectadas: {list(fonts_used)}")
-
-        # 3. Análisis de Tablas
-        print(f"\n--- [3. Tablas] ---")
-        print(f"Total de tablas: {len(doc.tables)}")
-        if len(doc.tables) > 0:
-            first_table = doc.tables[0]
-            print(f"Estilo de primera tabla: '{first_table.style.name}'")
-            print(f"Filas: {len(first_table.rows)}, Columnas: {len(first_table.columns)}")
-
-        # 4. Texto de Muestra (Primeros 3 parrafos)
-        print("\n--- [4. Muestra de Contenido] ---")
-        for p in doc.paragraphs[:3]:
-            if p.text.strip():
-                print(f"[{p.style.name}] {p.text[:100]}...")
-
-    except Exception as e:
+        a = analizar_docx(file_path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
         print(f"Error al leer DOCX: {e}")
+        return
+
+    # 1. Análisis de Secciones (Márgenes)
+    print("\n--- [1. Configuración de Página] ---")
+    for i, s in enumerate(a.secciones):
+        print(f"Sección {i+1}: Márgenes (T:{s.margen_superior or 0:.2f}, B:{s.margen_inferior or 0:.2f}, "
+              f"L:{s.margen_izquierdo or 0:.2f}, R:{s.margen_derecho or 0:.2f}) inches, {s.orientacion}")
+        print(f"   Header propio: {s.header_propio}, Footer propio: {s.footer_propio}")
+
+    # 2. Análisis de Estilos en Uso (documento completo)
+    print("\n--- [2. Estilos Detectados en Párrafos] ---")
+    print(f"Párrafos: {a.parrafos} ({a.parrafos_vacios} vacíos), runs: {a.runs}, caracteres: {a.caracteres:,}")
+    print(f"Fuente base: {a.fuente_base} {a.tamano_base_pt or ''}pt")
+    print(f"Estilos únicos detectados: {dict(a.estilos_parrafo.most_common())}")
+    print(f"Fuentes explícitas detectadas: {dict(a.fuentes_explicitas.most_common())}")
+    print(f"Fuentes efectivas (caracteres): {dict(a.fuentes_efectivas.most_common())}")
+    print(f"Tamaños efectivos (caracteres): {dict(a.tamanos_efectivos.most_common())}")
+
+    # 3. Análisis de Tablas
+    print(f"\n--- [3. Tablas] ---")
+    print(f"Total de tablas: {a.tablas}, filas: {a.filas_tabla}")
+    if a.tablas:
+        print(f"Estilos de tabla: {dict(a.estilos_tabla.most_common())}")
+        print(f"Columnas por tabla: {dict(sorted(a.columnas_tabla.items()))}")
+
+    # 4. Texto de Muestra (Primeros 3 parrafos)
+    print("\n--- [4. Muestra de Contenido] ---")
+    for estilo, texto in a.muestra:
+        print(f"[{estilo}] {texto}...")
 
 if __name__ == "__main__":
-    # Archivos de referencia
+    # Archivos de referencia (o los indicados por línea de comandos)
     ref_1 = r"x:\skills-analista\contexto\Producto_1_Premium\CITES_MGA_Proyecto.docx"
     ref_2 = r"x:\skills-analista\contexto\Producto_1_Premium\CITES_Apartado_Tecnico_MGA.docx"
-    
-    analyze_docx(ref_1)
-    analyze_docx(ref_2)
+
+    for ruta in sys.argv[1:] or [ref_1, ref_2]:
+        analyze_docx(ruta)
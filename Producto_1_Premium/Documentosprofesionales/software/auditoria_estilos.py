@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import glob
+import time
+import zipfile
+import argparse
+import datetime
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from io import BytesIO
+from itertools import repeat
+from typing import Dict, List, Optional
+
+from docx import Document
+
+# Ajuste de path para importar módulos hermanos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from software.analyze_reference import AnalisisDocx, analizar_docx
+from software.cites_builder import CITESReportBuilder
+from software.estilos import APAStyler
+
+# Estilos que cada builder emite (los valores de fuente/tamaño salen de su plantilla real)
+ESTILOS_APA = ["Normal", "APA Heading 1", "APA Heading 2", "APA Block Quote", "APA Reference"]
+ESTILOS_CITES = ["Normal", "Title", "Heading 1", "Heading 2", "Heading 3", "List Bullet"]
+ESTILOS_TABLA = ["Table Grid"]
+
+TOLERANCIA_MARGEN = 0.02  # pulgadas
+PROPORCION_MINIMA = 0.95  # fracción de caracteres que debe estar en las fuentes/tamaños del perfil
+REGLAS = ("margenes", "fuentes", "tamanos", "estilos", "tablas")
+MARGENES = ("superior", "inferior", "izquierdo", "derecho")
+
+
+@dataclass
+class PerfilEstilo:
+    nombre: str
+    margenes: Dict[str, float]
+    fuentes: List[str]
+    tamanos: List[float]
+    estilos: List[str]
+    estilos_tabla: List[str]
+
+
+def _perfil(nombre: str, plantilla: bytes, estilos: List[str]) -> PerfilEstilo:
+    """
+    Perfil a partir del DOCX que genera el builder: márgenes de su sección, fuentes/tamaños
+    resueltos de sus estilos y los que el builder aplica como formato directo en el contenido
+    de la plantilla (p.ej. encabezados de tabla a 10 pt).
+    """
+    a = analizar_docx(BytesIO(plantilla))
+    por_nombre = {e.nombre: e for e in a.estilos_definidos.values()}
+    usados = [por_nombre[e] for e in estilos if e in por_nombre]
+    seccion = a.secciones[0]
+    return PerfilEstilo(
+        nombre=nombre,
+        margenes={m: getattr(seccion, f"margen_{m}") for m in MARGENES},
+        fuentes=sorted({e.fuente for e in usados if e.fuente} | set(a.fuentes_efectivas)),
+        tamanos=sorted({e.tamano_pt for e in usados if e.tamano_pt} | set(a.tamanos_efectivos)),
+        estilos=list(estilos),
+        estilos_tabla=list(ESTILOS_TABLA),
+    )
+
+def perfil_apa() -> PerfilEstilo:
+    doc = Document()
+    APAStyler.apply_document_settings(doc)
+    APAStyler.create_custom_styles(doc)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return _perfil("apa", buffer.getvalue(), ESTILOS_APA)
+
+def perfil_cites() -> PerfilEstilo:
+    # Muestra con una tabla: create_table formatea los runs del encabezado directamente (10 pt)
+    builder = CITESReportBuilder(output_filename=None, template=CITESReportBuilder.build_template())
+    builder.create_table([["Encabezado"], ["Valor"]])
+    buffer = BytesIO()
+    builder.doc.save(buffer)
+    return _perfil("cites", buffer.getvalue(), ESTILOS_CITES)
+
+def perfiles_referencia() -> Dict[str, PerfilEstilo]:
+    return {"apa": perfil_apa(), "cites": perfil_cites()}
+
+
+def _fuera_de_perfil(conteo, admitidos) -> Dict:
+    return {str(k): n for k, n in conteo.items() if k not in admitidos}
+
+def auditar(analisis: AnalisisDocx, perfil: PerfilEstilo) -> dict:
+    """Compara un análisis contra un perfil: hallazgos por regla y puntaje (fracción de reglas cumplidas)."""
+    hallazgos = []
+    for i, s in enumerate(analisis.secciones):
+        for m in MARGENES:
+            encontrado, esperado = getattr(s, f"margen_{m}"), perfil.margenes[m]
+            if esperado is not None and (encontrado is None or abs(encontrado - esperado) > TOLERANCIA_MARGEN):
+                hallazgos.append({"regla": "margenes", "seccion": i + 1, "margen": m,
+                                  "esperado": esperado, "encontrado": encontrado})
+
+    for regla, conteo, admitidos in (("fuentes", analisis.fuentes_efectivas, perfil.fuentes),
+                                     ("tamanos", analisis.tamanos_efectivos, perfil.tamanos)):
+        total = sum(conteo.values())
+        fuera = _fuera_de_perfil(conteo, admitidos)
+        proporcion = 1 - sum(fuera.values()) / total if total else 1.0
+        if proporcion < PROPORCION_MINIMA:
+            hallazgos.append({"regla": regla, "esperado": admitidos, "encontrado": fuera,
+                              "proporcion": round(proporcion, 4)})
+
+    for regla, conteo, admitidos in (("estilos", analisis.estilos_parrafo, perfil.estilos),
+                                     ("tablas", analisis.estilos_tabla, perfil.estilos_tabla)):
+        fuera = _fuera_de_perfil(conteo, admitidos)
+        if fuera:
+            hallazgos.append({"regla": regla, "esperado": admitidos, "encontrado": fuera})
+
+    fallidas = {h["regla"] for h in hallazgos}
+    return {"cumple": not hallazgos, "puntaje": round(1 - len(fallidas) / len(REGLAS), 2), "hallazgos": hallazgos}
+
+def _auditar_archivo(path: str, perfiles: Dict[str, PerfilEstilo], base: str) -> dict:
+    """Trabajador del pool: un documento contra todos los perfiles (los errores se reportan, no se propagan)."""
+    archivo = os.path.relpath(path, base)
+    t0 = time.perf_counter()
+    try:
+        a = analizar_docx(path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, OSError, ValueError) as e:
+        return {"archivo": archivo, "error": f"{type(e).__name__}: {e}"}
+    resultados = {nombre: auditar(a, p) for nombre, p in perfiles.items()}
+    return {
+        "archivo": archivo,
+        "perfil_mas_cercano": max(resultados, key=lambda n: resultados[n]["puntaje"]),
+        "perfiles": resultados,
+        "estadisticas": {"secciones": len(a.secciones), "parrafos": a.parrafos, "caracteres": a.caracteres,
+                         "tablas": a.tablas, "fuente_principal": next(iter(a.fuentes_efectivas.most_common(1)), (None,))[0]},
+        "segundos": round(time.perf_counter() - t0, 4),
+    }
+
+def auditar_carpeta(carpeta: str, procesos: Optional[int] = None,
+                    perfiles: Optional[Dict[str, PerfilEstilo]] = None) -> dict:
+    """
+    Audita todos los .docx de una carpeta (recursivo) en un pool de procesos.
+    procesos=1 audita en el proceso actual. Retorna el reporte completo (serializable a JSON).
+    """
+    perfiles = perfiles or perfiles_referencia()
+    archivos = sorted(p for p in glob.glob(os.path.join(carpeta, "**", "*.docx"), recursive=True)
+                      if not os.path.basename(p).startswith("~$")) # bloqueos de Word abiertos
+    procesos = procesos or os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    if procesos == 1 or len(archivos) < 2:
+        resultados = [_auditar_archivo(p, perfiles, carpeta) for p in archivos]
+    else:
+        chunksize = max(1, len(archivos) // (procesos * 8))
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = list(pool.map(_auditar_archivo, archivos, repeat(perfiles), repeat(carpeta),
+                                       chunksize=chunksize))
+    segundos = time.perf_counter() - t0
+
+    documentos = [r for r in resultados if "error" not in r]
+    return {
+        "carpeta": os.path.abspath(carpeta),
+        "generado": datetime.datetime.now().isoformat(timespec="seconds"),
+        "perfiles": {n: asdict(p) for n, p in perfiles.items()},
+        "resumen": {
+            "documentos": len(documentos),
+            "errores": len(resultados) - len(documentos),
+            "cumplen": {n: sum(d["perfiles"][n]["cumple"] for d in documentos) for n in perfiles},
+            "procesos": procesos,
+            "segundos": round(segundos, 3),
+            "documentos_por_segundo": round(len(resultados) / segundos, 2) if segundos else 0.0,
+        },
+        "documentos": documentos,
+        "errores": [r for r in resultados if "error" in r],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Auditoría de estilo MGA/APA sobre una carpeta de documentos DOCX")
+    parser.add_argument("carpeta", help="Carpeta con los DOCX a auditar (se recorre recursivamente)")
+    parser.add_argument("--output", "-o", default="auditoria_estilos.json", help="Reporte JSON de salida")
+    parser.add_argument("--procesos", "-j", type=int, default=0, help="Procesos del pool (0: todos los núcleos)")
+    parser.add_argument("--perfil", choices=["apa", "cites", "todos"], default="todos",
+                        help="Perfil de referencia contra el que se compara")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.carpeta):
+        print(f"❌ No se encuentra la carpeta: {args.carpeta}")
+        sys.exit(1)
+    perfiles = perfiles_referencia()
+    if args.perfil != "todos":
+        perfiles = {args.perfil: perfiles[args.perfil]}
+
+    reporte = auditar_carpeta(args.carpeta, args.procesos or None, perfiles)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    r = reporte["resumen"]
+    print(f"✅ {r['documentos']} documentos auditados en {r['segundos']:.2f} s "
+          f"({r['documentos_por_segundo']:.1f} docs/s, {r['procesos']} procesos)")
+    for nombre, n in r["cumplen"].items():
+        print(f"   {nombre.upper()}: {n}/{r['documentos']} cumplen el perfil")
+    if r["errores"]:
+        print(f"⚠️ {r['errores']} archivo(s) no se pudieron leer (ver 'errores' en el reporte)")
+    print(f"📄 Reporte: {os.path.abspath(args.output)}")
+
+if __name__ == "__main__":
+    main()
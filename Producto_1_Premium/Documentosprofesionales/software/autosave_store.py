@@ -0,0 +1,258 @@
+import os
+import re
+import time
+import uuid
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # Fallback: json estándar (más lento, mismo formato en disco)
+    import json
+    orjson = None
+
+# Carpeta por defecto junto a los entregables generados
+DEFAULT_AUTOSAVE_DIR = os.path.join(os.path.dirname(__file__), "..", "salida", "autosave")
+
+# DataFrames de los editores del wizard que se persisten junto a project_data
+EDITOR_FRAMES = ("specs_df", "cronograma_df", "presupuesto_df", "riesgos_df")
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _dumps(obj) -> bytes:
+    """Serializa a bytes JSON compactos (orjson si está disponible)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def _frame_to_payload(df) -> dict:
+    """DataFrame -> dict columnar ligero (sin índice)."""
+    split = df.to_dict("split")
+    return {"columns": split["columns"], "data": split["data"]}
+
+
+def _payload_to_frame(payload: dict):
+    import pandas as pd
+    return pd.DataFrame(payload.get("data", []), columns=payload.get("columns", []))
+
+
+def new_project_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class ProjectAutosaveStore:
+    """
+    Autoguardado con debounce del `project_data` del wizard y sus DataFrames de edición.
+
+    Cada sección (metadatos, identificación, técnica, cronograma, presupuesto, riesgos y
+    cada editor) se guarda en su propio archivo. Se compara un hash del contenido
+    serializado y solo se reescriben las secciones sucias. El debounce es de borde
+    final: si llegan reruns muy seguidos, la última versión se escribe al vencer la ventana.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, debounce_s: float = 2.0):
+        self.base_dir = os.path.abspath(base_dir or DEFAULT_AUTOSAVE_DIR)
+        self.debounce_s = debounce_s
+        self._lock = threading.Lock()
+        self._digests: Dict[str, Dict[str, bytes]] = {}  # project_id -> seccion -> hash
+        self._last_write: Dict[str, float] = {}
+        self._pending: Dict[str, Dict[str, bytes]] = {}  # project_id -> seccion -> payload
+        self._timers: Dict[str, threading.Timer] = {}
+
+    # --- Serialización por secciones ---
+    @staticmethod
+    def split_sections(project_data: dict, frames: Optional[dict] = None) -> Dict[str, bytes]:
+        """Descompone el estado del wizard en secciones serializadas independientes."""
+        payloads = {
+            "meta": _dumps({
+                "title": project_data.get("title", ""),
+                "entity": project_data.get("entity", ""),
+                "section_order": list(project_data.get("sections", {}).keys()),
+            })
+        }
+        for name, value in project_data.get("sections", {}).items():
+            payloads[f"sec_{name}"] = _dumps(value)
+        for name, df in (frames or {}).items():
+            if df is not None:
+                payloads[f"df_{name}"] = _dumps(_frame_to_payload(df))
+        return payloads
+
+    # --- Escritura ---
+    def _project_dir(self, project_id: str) -> str:
+        if not _SAFE_ID.match(project_id or ""):
+            raise ValueError(f"Identificador de proyecto inválido: {project_id!r}")
+        return os.path.join(self.base_dir, project_id)
+
+    def _dirty_sections(self, project_id: str, payloads: Dict[str, bytes]) -> Dict[str, bytes]:
+        known = self._digests.setdefault(project_id, {})
+        if not known:
+            known.update(self._read_manifest_digests(project_id))
+        dirty = {}
+        for name, raw in payloads.items():
+            digest = hashlib.blake2b(raw, digest_size=16).digest()
+            if known.get(name) != digest:
+                dirty[name] = raw
+        return dirty
+
+    def autosave(self, project_id: str, project_data: dict, frames: Optional[dict] = None,
+                 force: bool = False) -> List[str]:
+        """
+        Registra el estado actual. Retorna las secciones escritas en disco en esta llamada
+        (vacío si no hubo cambios o si la escritura quedó diferida por el debounce).
+        """
+        payloads = self.split_sections(project_data, frames)
+        with self._lock:
+            dirty = self._dirty_sections(project_id, payloads)
+            pending = self._pending.setdefault(project_id, {})
+            # Secciones revertidas dentro de la ventana: el disco ya tiene su valor actual,
+            # el pendiente es una versión intermedia que no debe escribirse
+            for name in payloads.keys() - dirty.keys():
+                pending.pop(name, None)
+            pending.update(dirty)
+            if not pending:
+                return []
+
+            elapsed = time.monotonic() - self._last_write.get(project_id, 0.0)
+            if force or elapsed >= self.debounce_s:
+                return self._flush_locked(project_id)
+
+            # Debounce: programar la escritura para el final de la ventana
+            if project_id not in self._timers:
+                timer = threading.Timer(self.debounce_s - elapsed, self.flush, args=(project_id,))
+                timer.daemon = True
+                self._timers[project_id] = timer
+                timer.start()
+            return []
+
+    def flush(self, project_id: str) -> List[str]:
+        """Fuerza la escritura de las secciones pendientes de un proyecto."""
+        with self._lock:
+            return self._flush_locked(project_id)
+
+    def _flush_locked(self, project_id: str) -> List[str]:
+        timer = self._timers.pop(project_id, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(project_id, {})
+        if not pending:
+            return []
+
+        folder = self._project_dir(project_id)
+        os.makedirs(folder, exist_ok=True)
+        known = self._digests.setdefault(project_id, {})
+        for name, raw in pending.items():
+            self._atomic_write(os.path.join(folder, f"{name}.json"), raw)
+            known[name] = hashlib.blake2b(raw, digest_size=16).digest()
+
+        manifest = {
+            "project_id": project_id,
+            "updated_at": time.time(),
+            "digests": {k: v.hex() for k, v in known.items()},
+        }
+        if "meta" in pending:
+            meta = _loads(pending["meta"])
+            manifest["title"] = meta.get("title", "")
+        else:
+            manifest["title"] = self._read_manifest(project_id).get("title", "")
+        self._atomic_write(os.path.join(folder, "manifest.json"), _dumps(manifest))
+        self._last_write[project_id] = time.monotonic()
+        return sorted(pending.keys())
+
+    @staticmethod
+    def _atomic_write(path: str, raw: bytes):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+
+    # --- Lectura / Reanudación ---
+    def _read_manifest(self, project_id: str) -> dict:
+        path = os.path.join(self._project_dir(project_id), "manifest.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "rb") as f:
+            return _loads(f.read())
+
+    def _read_manifest_digests(self, project_id: str) -> Dict[str, bytes]:
+        digests = self._read_manifest(project_id).get("digests", {})
+        return {k: bytes.fromhex(v) for k, v in digests.items()}
+
+    def exists(self, project_id: str) -> bool:
+        return bool(_SAFE_ID.match(project_id or "")) and \
+            os.path.exists(os.path.join(self.base_dir, project_id, "manifest.json"))
+
+    def load(self, project_id: str) -> Tuple[dict, dict]:
+        """
+        Reconstruye (project_data, frames) de un proyecto guardado.
+        Solo lee los archivos listados en el manifiesto.
+        """
+        self.flush(project_id)
+        folder = self._project_dir(project_id)
+        manifest = self._read_manifest(project_id)
+        if not manifest:
+            raise FileNotFoundError(f"No existe autoguardado para el proyecto: {project_id}")
+
+        raw_sections = {}
+        for name in manifest.get("digests", {}):
+            path = os.path.join(folder, f"{name}.json")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    raw_sections[name] = f.read()
+
+        meta = _loads(raw_sections.get("meta", b"{}"))
+        project_data = {"title": meta.get("title", ""), "entity": meta.get("entity", ""), "sections": {}}
+        for name in meta.get("section_order", []):
+            key = f"sec_{name}"
+            if key in raw_sections:
+                project_data["sections"][name] = _loads(raw_sections[key])
+
+        frames = {}
+        for name, raw in raw_sections.items():
+            if name.startswith("df_"):
+                frames[name[3:]] = _payload_to_frame(_loads(raw))
+
+        with self._lock:
+            self._digests[project_id] = {
+                k: hashlib.blake2b(v, digest_size=16).digest() for k, v in raw_sections.items()
+            }
+        return project_data, frames
+
+    def list_projects(self) -> List[dict]:
+        """Proyectos guardados, del más reciente al más antiguo."""
+        if not os.path.isdir(self.base_dir):
+            return []
+        projects = []
+        for entry in os.listdir(self.base_dir):
+            if not _SAFE_ID.match(entry):
+                continue
+            manifest = self._read_manifest(entry)
+            if manifest:
+                projects.append({
+                    "project_id": entry,
+                    "title": manifest.get("title", ""),
+                    "updated_at": manifest.get("updated_at", 0),
+                })
+        return sorted(projects, key=lambda p: p["updated_at"], reverse=True)
+
+    def delete(self, project_id: str):
+        folder = self._project_dir(project_id)
+        with self._lock:
+            timer = self._timers.pop(project_id, None)
+            if timer is not None:
+                timer.cancel()
+            self._pending.pop(project_id, None)
+            self._digests.pop(project_id, None)
+            if os.path.isdir(folder):
+                for name in os.listdir(folder):
+                    os.remove(os.path.join(folder, name))
+                os.rmdir(folder)
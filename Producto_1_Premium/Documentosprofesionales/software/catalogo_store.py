@@ -0,0 +1,192 @@
+import os
+import csv
+import heapq
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .mga_apu import CatalogoPrecios, InsumoCatalogo, normalizar_descripcion
+except ImportError:
+    from mga_apu import CatalogoPrecios, InsumoCatalogo, normalizar_descripcion
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "..", "salida", "catalogo_insumos.sqlite")
+
+# Candidatos recuperados por el índice antes de re-puntuar por similitud
+CANDIDATOS = 200
+
+def trigramas(texto_normalizado: str) -> Set[str]:
+    """Trigramas con relleno de espacios para que los bordes de palabra cuenten."""
+    t = f"  {texto_normalizado} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+def similitud(a: Set[str], b: Set[str]) -> float:
+    """Coeficiente de Jaccard entre dos conjuntos de trigramas."""
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+@dataclass
+class Coincidencia:
+    codigo: str
+    descripcion: str
+    unidad: str
+    precio: float
+    tipo: str
+    puntaje: float
+
+class CatalogoStore:
+    """
+    Catálogo local de insumos en SQLite con búsqueda difusa.
+    Si el SQLite soporta FTS5 con tokenizador trigram (3.34+), las búsquedas que aparecen
+    literalmente en una descripción (autocompletar) se resuelven con el índice FTS; el
+    resto usa un índice invertido de trigramas en memoria. Los candidatos se re-puntúan
+    por similitud de trigramas sobre la descripción normalizada.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_CATALOG_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Streamlit llama desde varios hilos: una conexión compartida protegida con lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY, codigo TEXT UNIQUE, descripcion TEXT, unidad TEXT,
+            precio REAL, tipo TEXT, norm TEXT)""")
+        try:
+            self._conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+                norm, content='items', content_rowid='id', tokenize='trigram')""")
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._conn.commit()
+        self._trigramas: Dict[int, Set[str]] = {}
+        self._invertido: Dict[str, List[int]] = defaultdict(list)
+        self._cargar_indice_memoria()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def _cargar_indice_memoria(self):
+        self._trigramas.clear()
+        self._invertido.clear()
+        for rid, norm in self._conn.execute("SELECT id, norm FROM items"):
+            self._indexar(rid, norm)
+
+    def _indexar(self, rid: int, norm: str):
+        tri = trigramas(norm)
+        self._trigramas[rid] = tri
+        for t in tri:
+            self._invertido[t].append(rid)
+
+    # --- Carga ---
+    def agregar_items(self, insumos: Iterable[InsumoCatalogo]) -> int:
+        """Inserta o actualiza (por código) en una sola transacción."""
+        filas = [(i.codigo, i.descripcion, i.unidad, float(i.precio), i.tipo, normalizar_descripcion(i.descripcion))
+                 for i in insumos]
+        with self._lock:
+            self._conn.executemany("""INSERT INTO items (codigo, descripcion, unidad, precio, tipo, norm)
+                VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(codigo) DO UPDATE SET
+                descripcion=excluded.descripcion, unidad=excluded.unidad, precio=excluded.precio,
+                tipo=excluded.tipo, norm=excluded.norm""", filas)
+            if self.fts:
+                self._conn.execute("INSERT INTO items_fts(items_fts) VALUES('rebuild')")
+            self._conn.commit()
+            self._cargar_indice_memoria()
+        return len(filas)
+
+    def importar_csv(self, archivo) -> int:
+        """
+        CSV con columnas codigo, descripcion, unidad, precio y tipo (opcional).
+        `archivo` puede ser una ruta o un objeto de texto abierto.
+        """
+        if isinstance(archivo, str):
+            with open(archivo, "r", encoding="utf-8-sig", newline="") as f:
+                return self.importar_csv(f)
+        lector = csv.DictReader(archivo)
+        return self.agregar_items(
+            InsumoCatalogo(r["codigo"], r["descripcion"], r.get("unidad", ""), float(r.get("precio") or 0),
+                           r.get("tipo") or "Material")
+            for r in lector
+        )
+
+    # --- Búsqueda ---
+    def _candidatos(self, norm: str, tri: Set[str], minimo: int) -> List[int]:
+        """Ids a re-puntuar, de más a menos prometedor. Se llama con el lock tomado."""
+        if self.fts and len(norm) >= 3:
+            # Coincidencia literal (subcadena): la normalización deja solo [a-z0-9 ].
+            # ORDER BY rank (bm25) antes del LIMIT: sin él las filas salen por rowid y una
+            # descripción exacta cargada tarde queda fuera de los candidatos
+            filas = self._conn.execute("SELECT rowid FROM items_fts WHERE items_fts MATCH ? ORDER BY rank LIMIT ?",
+                                       (f'"{norm}"', CANDIDATOS)).fetchall()
+            if len(filas) >= minimo:
+                return [r[0] for r in filas]
+        # Los trigramas compartidos son la intersección: con ellos sale el Jaccard exacto
+        # de cada candidato, así los empates en conteo no dejan fuera al más similar
+        conteo = Counter(rid for t in tri for rid in self._invertido.get(t, ()))
+        n = len(tri)
+        return heapq.nlargest(CANDIDATOS, conteo,
+                              key=lambda rid: conteo[rid] / (n + len(self._trigramas[rid]) - conteo[rid]))
+
+    def buscar(self, texto: str, limite: int = 10, umbral: float = 0.0) -> List[Coincidencia]:
+        norm = normalizar_descripcion(texto)
+        if not norm:
+            return []
+        tri = trigramas(norm)
+        # El lock cubre también los índices en memoria: agregar_items los vacía y reconstruye
+        with self._lock:
+            puntuados = sorted(((similitud(tri, self._trigramas.get(rid, set())), rid)
+                                for rid in self._candidatos(norm, tri, limite)), reverse=True)
+            puntuados = [(p, rid) for p, rid in puntuados[:limite] if p >= umbral]
+            if not puntuados:
+                return []
+            ids = [rid for _, rid in puntuados]
+            filas = {r[0]: r[1:] for r in self._conn.execute(
+                f"SELECT id, codigo, descripcion, unidad, precio, tipo FROM items WHERE id IN ({','.join('?' * len(ids))})", ids)}
+        return [Coincidencia(*filas[rid], puntaje=p) for p, rid in puntuados if rid in filas]
+
+    def mejor_coincidencia(self, texto: str, umbral: float = 0.5) -> Optional[Coincidencia]:
+        resultado = self.buscar(texto, limite=1, umbral=umbral)
+        return resultado[0] if resultado else None
+
+    def normalizar_filas(self, filas: List[Dict], columna: str = "Ítem", umbral: float = 0.5,
+                         columna_unidad: Optional[str] = "Unidad",
+                         columna_precio: Optional[str] = "Valor Unitario") -> Tuple[List[Dict], List[Dict]]:
+        """
+        Pasada masiva: reemplaza el texto libre de `columna` por la descripción del catálogo
+        cuando la similitud supera `umbral`. Completa unidad y precio solo si están vacíos.
+        Retorna (filas normalizadas, cambios realizados). Los textos repetidos se buscan una vez.
+        """
+        memo: Dict[str, Optional[Coincidencia]] = {}
+        salida, cambios = [], []
+        for k, fila in enumerate(filas):
+            original = str(fila.get(columna) or "")
+            if original not in memo:
+                memo[original] = self.mejor_coincidencia(original, umbral) if original.strip() else None
+            match = memo[original]
+            nueva = dict(fila)
+            if match is not None and match.descripcion != original:
+                nueva[columna] = match.descripcion
+                cambios.append({"Fila": k, "Original": original, "Catálogo": match.descripcion,
+                                "Código": match.codigo, "Similitud": round(match.puntaje, 2)})
+            if match is not None:
+                if columna_unidad and not fila.get(columna_unidad):
+                    nueva[columna_unidad] = match.unidad
+                if columna_precio and not fila.get(columna_precio):
+                    nueva[columna_precio] = match.precio
+            salida.append(nueva)
+        return salida, cambios
+
+    def a_catalogo_precios(self) -> CatalogoPrecios:
+        """Catálogo en memoria para el MotorAPU."""
+        with self._lock:
+            filas = self._conn.execute("SELECT codigo, descripcion, unidad, precio, tipo FROM items ORDER BY id").fetchall()
+        return CatalogoPrecios([InsumoCatalogo(*f) for f in filas])
+
+    def cerrar(self):
+        self._conn.close()
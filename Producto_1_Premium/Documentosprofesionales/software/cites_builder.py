@@ -1,5 +1,6 @@
 import os
 import sys
+from io import BytesIO
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -13,9 +14,47 @@ except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from backend.schemas import FullDocumentSchema, ParagraphBlock, TableBlock
 
+def format_numbered_heading(counters: dict, text, level=1):
+    """
+    Avanza los contadores {'h1', 'h2', 'h3'} y retorna el título numerado.
+    Compartido por el builder DOCX y la vista previa HTML para que ambos numeren igual.
+    """
+    if level == 1:
+        counters["h1"] += 1
+        counters["h2"] = 0 # Reiniciar subtítulos
+        counters["h3"] = 0
+        prefix = f"{counters['h1']}."
+    elif level == 2:
+        counters["h2"] += 1
+        counters["h3"] = 0
+        prefix = f"{counters['h1']}.{counters['h2']}"
+    elif level == 3:
+        counters["h3"] += 1
+        prefix = f"{counters['h1']}.{counters['h2']}.{counters['h3']}"
+    else:
+        prefix = ""
+
+    return f"{prefix} {text.upper() if level == 1 else text}"
+
+def strip_manual_numbering(text, level=1):
+    """Quita la numeración manual ("1. TEXTO", "1.1 Texto") para re-numerar con los contadores."""
+    clean_text = text
+    if clean_text[0].isdigit() and "." in clean_text[:5]:
+        # Nivel 1: "1. TEXTO" | Nivel 2: a veces es "1.1 Texto"
+        parts = clean_text.split(".", 1) if level == 1 else clean_text.split(" ", 1)
+        if len(parts) > 1: clean_text = parts[1].strip()
+    return clean_text
+
 class CITESReportBuilder:
-    def __init__(self, output_filename="Proyecto_CITES_Generado.docx", style_mode="MGA"):
-        self.doc = Document()
+    def __init__(self, output_filename="Proyecto_CITES_Generado.docx", style_mode="MGA", template=None):
+        """
+        template: bytes de un DOCX ya estilizado (ver build_template). Permite reutilizar
+        una plantilla "caliente" al generar muchos documentos en el mismo proceso.
+        """
+        if template is not None:
+            self.doc = Document(BytesIO(template))
+        else:
+            self.doc = Document()
         self.output_filename = output_filename
         self.style_mode = style_mode 
         
@@ -26,7 +65,15 @@ class CITESReportBuilder:
             "h3": 0
         }
         
-        self._setup_styles()
+        if template is None:
+            self._setup_styles()
+
+    @classmethod
+    def build_template(cls, style_mode="MGA") -> bytes:
+        """Serializa un documento vacío con los estilos ya aplicados, para reutilizarlo como plantilla."""
+        buffer = BytesIO()
+        cls(output_filename=None, style_mode=style_mode).doc.save(buffer)
+        return buffer.getvalue()
 
     def save(self):
         """Guarda el documento en la ruta definida."""
@@ -84,22 +131,7 @@ class CITESReportBuilder:
         Calcula automáticamente la numeración jerárquica (1. -> 1.1 -> 1.1.1)
         e inyecta el texto para que el Panel de Navegación lo reconozca.
         """
-        if level == 1:
-            self.counters["h1"] += 1
-            self.counters["h2"] = 0 # Reiniciar subtítulos
-            self.counters["h3"] = 0
-            prefix = f"{self.counters['h1']}."
-        elif level == 2:
-            self.counters["h2"] += 1
-            self.counters["h3"] = 0
-            prefix = f"{self.counters['h1']}.{self.counters['h2']}"
-        elif level == 3:
-            self.counters["h3"] += 1
-            prefix = f"{self.counters['h1']}.{self.counters['h2']}.{self.counters['h3']}"
-        else:
-            prefix = ""
-            
-        full_text = f"{prefix} {text.upper() if level == 1 else text}"
+        full_text = format_numbered_heading(self.counters, text, level)
         self.doc.add_heading(full_text, level=level)
 
     def add_key_value_paragraph(self, key, value):
@@ -113,9 +145,10 @@ class CITESReportBuilder:
         """
         Genera tablas profesionales estilo MGA.
         data: Lista de listas [['Col1', 'Col2'], ['Val1', 'Val2']] O objeto TableBlock O dict
+        (también cualquier vista con headers/rows[i].cells, p.ej. TableView de compact_document)
         """
-        # Adaptación para TableBlock de Pydantic
-        if isinstance(data, TableBlock):
+        # Adaptación para TableBlock de Pydantic y vistas compactas
+        if isinstance(data, TableBlock) or (hasattr(data, "headers") and hasattr(data, "rows")):
             rows_data = []
             rows_data.append(data.headers)
             for row in data.rows:
@@ -154,27 +187,6 @@ class CITESReportBuilder:
                                 run.font.bold = True
                                 run.font.size = Pt(10)
 
-        if not data: return
-        
-        rows = len(data)
-        cols = len(data[0]) if rows > 0 else 0
-        if cols == 0: return
-
-        table = self.doc.add_table(rows=rows, cols=cols)
-        table.style = 'Table Grid' # Estilo con bordes visibles
-        
-        for i, row_data in enumerate(data):
-            cells = table.rows[i].cells
-            for j, cell_text in enumerate(row_data):
-                if j < len(cells):
-                    cells[j].text = str(cell_text)
-                    # Formato al Header
-                    if header and i == 0:
-                        for paragraph in cells[j].paragraphs:
-                            for run in paragraph.runs:
-                                run.font.bold = True
-                                run.font.size = Pt(10)
-
     def build_from_schema(self, schema: FullDocumentSchema):
         """Método de Integración: Construye el reporte completo desde datos estructurados."""
         
@@ -188,23 +200,10 @@ class CITESReportBuilder:
         for block in schema.content:
             if block.role == "titulo1":
                 # Limpiar numeración manual si viene del MD para usar la auto-numeración del builder
-                clean_text = block.content
-                # Regex simple para quitar "1. TEXTO" -> "TEXTO" si existe, o dejarlo
-                # Por ahora asumimos que el parser pasa el texto completo.
-                # Para MGA estricto, idealmente limpiamos "1. " del string si vamos a re-numerar.
-                if clean_text[0].isdigit() and "." in clean_text[:5]:
-                     parts = clean_text.split(".", 1)
-                     if len(parts) > 1: clean_text = parts[1].strip()
-                
-                self.add_numbered_heading(clean_text, level=1)
+                self.add_numbered_heading(strip_manual_numbering(block.content, 1), level=1)
 
             elif block.role == "titulo2":
-                clean_text = block.content
-                if clean_text[0].isdigit() and "." in clean_text[:5]:
-                     parts = clean_text.split(" ", 1) # A veces es "1.1 Texto"
-                     if len(parts) > 1: clean_text = parts[1].strip()
-
-                self.add_numbered_heading(clean_text, level=2)
+                self.add_numbered_heading(strip_manual_numbering(block.content, 2), level=2)
 
             elif block.role == "tabla":
                 self.create_table(block.content)
@@ -88,14 +88,28 @@ class DocumentFactory:
 class ProjectAssembler:
     """Ensamblador del Proyecto Completo."""
     
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, verificar_consistencia: bool = False):
         self.factory = DocumentFactory(filename)
         self.modulos = []
+        self.verificar_consistencia = verificar_consistencia
+        self.reporte_consistencia = None
 
     def registrar_modulo(self, modulo):
         self.modulos.append(modulo)
 
+    def verificar(self):
+        """Concilia los montos de los módulos registrados (ver mga_consistencia)."""
+        try:
+            from .mga_consistencia import verificar_consistencia
+        except ImportError:
+            from mga_consistencia import verificar_consistencia
+        self.reporte_consistencia = verificar_consistencia(self.modulos)
+        self.reporte_consistencia.imprimir()
+        return self.reporte_consistencia
+
     def construir(self):
+        if self.verificar_consistencia:
+            self.verificar()
         for modulo in self.modulos:
             contenido = modulo.render_content()
             self.factory.procesar_contenido(contenido)
@@ -0,0 +1,60 @@
+import pandas as pd
+from typing import List, Dict, Union
+
+IVA = 0.19
+
+class BudgetManager:
+    """
+    Motor financiero del presupuesto del wizard.
+    Recibe las filas del editor (DataFrame o lista de dicts) con columnas
+    'Ítem', 'Unidad', 'Cantidad', 'Valor Unitario' y calcula columnas derivadas en bloque.
+    """
+
+    def __init__(self, data: Union[pd.DataFrame, List[Dict]]):
+        df = data.copy() if isinstance(data, pd.DataFrame) else pd.DataFrame(data or [])
+        for col in ("Ítem", "Unidad"):
+            df[col] = df[col].fillna("") if col in df.columns else ""
+        for col in ("Cantidad", "Valor Unitario"):
+            # Valores no numéricos cuentan como 0 en lugar de romper el cálculo
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0) if col in df.columns else 0.0
+        df["Total"] = df["Cantidad"] * df["Valor Unitario"]
+        self.df = df
+
+    def calculate_totals(self) -> float:
+        """Costo directo total (suma de Cantidad x Valor Unitario)."""
+        return float(self.df["Total"].sum())
+
+    def totals_by_item(self) -> pd.DataFrame:
+        """Agrupa ítems repetidos (mismo nombre) sumando cantidades y totales."""
+        return (self.df.groupby("Ítem", sort=False, dropna=False)
+                .agg({"Unidad": "first", "Cantidad": "sum", "Total": "sum"})
+                .reset_index())
+
+    def get_summary_table_for_doc(self) -> List[Dict[str, str]]:
+        """Tabla resumen formateada para el DOCX (el detalle completo va en el Excel)."""
+        if self.df.empty:
+            return []
+        grouped = self.totals_by_item()
+        summary = [
+            {"Ítem": str(item), "Unidad": str(unidad), "Cantidad": f"{cant:,.2f}", "Total": f"${total:,.0f}"}
+            for item, unidad, cant, total in grouped.itertuples(index=False)
+        ]
+        direct = self.calculate_totals()
+        summary.append({"Ítem": "COSTO DIRECTO TOTAL", "Unidad": "", "Cantidad": "", "Total": f"${direct:,.0f}"})
+        summary.append({"Ítem": f"IVA ({IVA:.0%})", "Unidad": "", "Cantidad": "", "Total": f"${direct * IVA:,.0f}"})
+        summary.append({"Ítem": "TOTAL PROYECTO", "Unidad": "", "Cantidad": "", "Total": f"${direct * (1 + IVA):,.0f}"})
+        return summary
+
+    def export_excel_summary(self, output_path: str):
+        """Excel de soporte: hoja de detalle, resumen por ítem y totales."""
+        direct = self.calculate_totals()
+        totals = pd.DataFrame([
+            {"Concepto": "Costo Directo Total", "Valor": direct},
+            {"Concepto": f"IVA ({IVA:.0%})", "Valor": direct * IVA},
+            {"Concepto": "Total Proyecto", "Valor": direct * (1 + IVA)},
+        ])
+        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+            self.df.to_excel(writer, sheet_name="Detalle", index=False)
+            self.totals_by_item().to_excel(writer, sheet_name="Resumen por Ítem", index=False)
+            totals.to_excel(writer, sheet_name="Totales", index=False)
+        print(f"Excel de presupuesto guardado en: {output_path}")
@@ -1,164 +1,189 @@
 import sys
 import os
-import re
+import time
 import argparse
 import traceback
+from dataclasses import replace
+from typing import Dict, List
 
 # Ajuste de path para importar módulos hermanos
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.schemas import FullDocumentSchema, DocumentMetadata, ParagraphBlock, TableBlock, TableRow
+from backend.document_ir import cargar_o_parsear, digest, ir_path_for
+from backend.corpus import dividir_secciones
+from backend.parsers import REGISTRO, REGLAS_VERSION, estadisticas, parsear_archivo, parsear_archivo_paralelo
 from software.cites_builder import run_cites_pipeline
 
-def parse_markdown_generic(file_path):
+def parse_markdown_generic(file_path, formato="gfm", procesos=1):
     """
-    Parser robusto para Markdown Estándar (GFM) y extensiones específicas MGA.
-    Soporta:
-    - Headers (#, ##, 1. Título)
-    - Listas (-, *)
-    - Tablas GFM (| col | col |)
-    - Bloques de texto
+    Parser para Markdown Estándar (GFM) y extensiones específicas MGA.
+    Delegado al registro de formatos (backend/parsers.py); formato="auto" detecta
+    el formato a partir del inicio del archivo. Con procesos != 1 los archivos grandes
+    se parten por títulos de primer nivel y se parsean en paralelo (0: todos los núcleos).
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
+    if procesos == 1:
+        return parsear_archivo(file_path, formato)
+    return parsear_archivo_paralelo(file_path, formato, procesos=procesos or None)
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+def huella_documento(data) -> dict:
+    """Digest de metadata, referencias y de cada sección (titulo1) para comparar entre corridas."""
+    return {
+        "metadata": digest(data.metadata.model_dump()),
+        "references": digest(list(data.references)),
+        "secciones": [(titulo, digest([b.model_dump() for b in bloques]))
+                      for titulo, bloques in dividir_secciones(data.content)],
+    }
 
-    # Metadatos por defecto (podrían extraerse de YAML frontmatter si existiera)
-    metadata = DocumentMetadata(
-        title="DOCUMENTO TÉCNICO GENERADO",
-        author="Google Antigravity Engine",
-        institution="Proyecto CITES - MGA",
-        date="Febrero 2026"
-    )
+def secciones_cambiadas(anterior: dict, actual: dict) -> List[str]:
+    """Títulos de las secciones nuevas o modificadas respecto a la huella anterior."""
+    previas = anterior["secciones"]
+    cambios = [titulo or "(inicio)" for i, (titulo, d) in enumerate(actual["secciones"])
+               if i >= len(previas) or previas[i] != (titulo, d)]
+    if len(previas) > len(actual["secciones"]):
+        cambios.append(f"{len(previas) - len(actual['secciones'])} sección(es) eliminada(s)")
+    if anterior["metadata"] != actual["metadata"]:
+        cambios.insert(0, "metadata")
+    if anterior["references"] != actual["references"]:
+        cambios.append("referencias")
+    return cambios
 
-    content_blocks = []
-    
-    # Regex Patterns
-    regex_h1_num = re.compile(r"^\d+\.\s+[A-ZÁÉÍÓÚÑ\s]+$") # 1. TITULO
-    regex_h1_md = re.compile(r"^#\s+(.+)$") # # Título
-    regex_h2_num = re.compile(r"^\d+\.\d+\s+.+$") # 1.1 Subtítulo
-    regex_h2_md = re.compile(r"^##\s+(.+)$") # ## Subtítulo
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if not line:
-            i += 1
-            continue
-            
-        # --- 1. DETECCIÓN DE TABLAS (GFM Standard) ---
-        # Heurística: Línea empieza con pipe, y la siguiente es separador |---|
-        if line.startswith("|"):
-            # Verificar si es una tabla válida (mínimo header + separador)
-            if i + 1 < len(lines) and set(lines[i+1].strip()) <= set("|-: "):
-                 # Es una tabla!
-                 headers = [c.strip() for c in line.split("|") if c.strip()]
-                 i += 2 # Saltar header y separador
-                 
-                 rows = []
-                 while i < len(lines) and lines[i].strip().startswith("|"):
-                     row_cells = [c.strip() for c in lines[i].split("|") if c.strip()]
-                     if row_cells:
-                         # Rellenar celdas faltantes si la fila es más corta que el header
-                         while len(row_cells) < len(headers):
-                             row_cells.append("")
-                         rows.append(TableRow(cells=row_cells[:len(headers)]))
-                     i += 1
-                 
-                 content_blocks.append(ParagraphBlock(
-                     role="tabla", 
-                     content=TableBlock(headers=headers, rows=rows)
-                 ))
-                 continue
-        
-        # --- 2. DETECCIÓN DE TABLAS "TEXTO" (Legacy/Heurística MGA) ---
-        # Mantiene compatibilidad con formatos no estándar tipo "Componente  Especificación"
-        if "Componente" in line and "Especificación Técnica" in line and not line.startswith("|"):
-             headers = ["Componente", "Especificación Técnica", "Cantidad", "Vida Útil", "Costo"]
-             i += 1
-             rows = []
-             while i < len(lines) and "TOTAL" not in lines[i] and not lines[i].strip().startswith("#"):
-                 row_line = lines[i].strip()
-                 if row_line:
-                     parts = [p.strip() for p in row_line.split("  ") if p.strip()]
-                     # Padding simple
-                     while len(parts) < 5: parts.append("")
-                     rows.append(TableRow(cells=parts[:5]))
-                 i += 1
-             content_blocks.append(ParagraphBlock(role="tabla", content=TableBlock(headers=headers, rows=rows)))
-             continue
-
-        # --- 3. LISTAS ---
-        if line.startswith("- ") or line.startswith("* "):
-            content_blocks.append(ParagraphBlock(role="lista_item", content=line[2:].strip()))
-            i += 1
-            continue
-
-        # --- 4. TÍTULOS ---
-        match_h1_md = regex_h1_md.match(line)
-        match_h1_num = regex_h1_num.match(line)
-        
-        if match_h1_md:
-            content_blocks.append(ParagraphBlock(role="titulo1", content=match_h1_md.group(1)))
-        elif match_h1_num:
-             # Limpiar "1. " si ya viene
-             content = line
-             if "." in line[:5]: content = line.split(".", 1)[1].strip()
-             content_blocks.append(ParagraphBlock(role="titulo1", content=content))
-        elif regex_h2_num.match(line):
-             content = line
-             if "." in line[:5]: content = line.split(" ", 1)[1].strip()
-             content_blocks.append(ParagraphBlock(role="titulo2", content=content))
-        elif regex_h2_md.match(line):
-            content_blocks.append(ParagraphBlock(role="titulo2", content=regex_h2_md.group(1)))
-        else:
-            # Texto Normal / Key-Value
-            content_blocks.append(ParagraphBlock(role="cuerpo", content=line))
-        
-        i += 1
+class MotorLocal:
+    """Parse (con IR cacheado) + render CITES; conserva la última huella de cada entrada."""
 
-    # Referencias Placeholder (Mejora: extraer de sección "Referencias" si existe)
-    references = ["Documento generado automáticamente por CITES Engine Local."]
+    def __init__(self, formato: str = "gfm", usar_cache: bool = True, procesos: int = 1):
+        self.formato = formato
+        self.usar_cache = usar_cache
+        self.procesos = procesos
+        self.huellas: Dict[str, dict] = {}
+        self.ir_paths: Dict[str, str] = {} # IR explícito por entrada (--ir)
+        self.dependencias: Dict[str, List[str]] = {} # archivos leídos al parsear cada entrada (CSV referenciados)
 
-    return FullDocumentSchema(
-        metadata=metadata,
-        content=content_blocks,
-        references=references
-    )
+    def construir(self, input_path: str, output_path: str) -> bool:
+        """Retorna True si se renderizó; False si los bloques no cambiaron desde la corrida anterior."""
+        ir_path = self.ir_paths.get(input_path) or ir_path_for(input_path)
+        data, desde_cache = cargar_o_parsear(input_path, lambda p: parse_markdown_generic(p, self.formato, self.procesos), ir_path,
+                                             usar_cache=self.usar_cache,
+                                             parser_id=f"backend.parsers:{self.formato}:v{REGLAS_VERSION}")
+        print(f"IR:      {ir_path} ({'reutilizado' if desde_cache else 'regenerado'})")
+        self.dependencias[input_path] = list(data.dependencias)
+        huella = huella_documento(data)
+        anterior = self.huellas.get(input_path)
+        if anterior is not None:
+            cambios = secciones_cambiadas(anterior, huella)
+            if not cambios and os.path.exists(output_path):
+                print(f"Sin cambios en los bloques: {os.path.basename(output_path)} se conserva.")
+                return False
+            print(f"Cambios: {', '.join(cambios) if cambios else 'salida faltante'}")
+        run_cites_pipeline(data, output_path)
+        self.huellas[input_path] = huella
+        return True
+
+def vigilar(motor: MotorLocal, salidas: Dict[str, str], intervalo: float = 0.5, debounce: float = 0.8):
+    """
+    Modo --watch: sondea mtime/tamaño de las entradas y de los archivos que referencian
+    (tablas CSV); una ráfaga de guardados se agrupa hasta que la entrada pasa `debounce`
+    segundos sin cambios, y solo entonces se reconstruye.
+    """
+    def firma(path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def archivos(entrada):
+        return [entrada, *motor.dependencias.get(entrada, ())]
+
+    # Clave (entrada, archivo): un CSV compartido por dos entradas reconstruye ambas
+    firmas = {(e, a): firma(a) for e in salidas for a in archivos(e)}
+    pendientes: Dict[str, float] = {}
+    print(f"👀 Vigilando {len(firmas)} archivo(s). Ctrl+C para salir.")
+    try:
+        while True:
+            time.sleep(intervalo)
+            ahora = time.monotonic()
+            for entrada in salidas:
+                for archivo in archivos(entrada):
+                    actual = firma(archivo)
+                    if actual != firmas.get((entrada, archivo)):
+                        firmas[(entrada, archivo)] = actual
+                        pendientes[entrada] = ahora
+            for path, desde in list(pendientes.items()):
+                if ahora - desde < debounce:
+                    continue
+                del pendientes[path]
+                if firmas[(path, path)] is None:
+                    print(f"⚠️ {path} no existe (¿renombrado?); se sigue vigilando.")
+                    continue
+                print(f"🔄 {os.path.basename(path)} modificado")
+                try:
+                    t0 = time.perf_counter()
+                    if motor.construir(path, salidas[path]):
+                        print(f"✅ Reconstruido en {time.perf_counter() - t0:.2f} s")
+                except Exception as e:
+                    # Un guardado a medias no debe detener la vigilancia
+                    print(f"❌ Error al reconstruir {path}: {e}")
+                # Tablas referenciadas por primera vez en este guardado: se vigilan desde su estado actual
+                for archivo in archivos(path):
+                    if (path, archivo) not in firmas:
+                        firmas[(path, archivo)] = firma(archivo)
+    except KeyboardInterrupt:
+        print("👋 Vigilancia detenida.")
 
 def main():
     parser = argparse.ArgumentParser(description="Motor de Generación de Documentos CITES/MGA Local")
-    parser.add_argument("input", help="Ruta del archivo Markdown (.md) de entrada")
-    parser.add_argument("--output", "-o", help="Ruta del archivo DOCX de salida (opcional)")
+    parser.add_argument("input", nargs="+", help="Ruta(s) de los archivos Markdown (.md) de entrada")
+    parser.add_argument("--output", "-o", help="Ruta del archivo DOCX de salida (opcional, solo con una entrada)")
+    parser.add_argument("--ir", help="Ruta del IR (.ir.json); por defecto junto al archivo de entrada")
+    parser.add_argument("--no-cache", action="store_true", help="Ignorar el IR existente y volver a parsear")
+    parser.add_argument("--formato", default="gfm", choices=["auto", *REGISTRO],
+                        help="Formato de entrada (auto: detectar por el inicio del archivo)")
+    parser.add_argument("--procesos", "-j", type=int, default=1,
+                        help="Procesos para parsear archivos grandes por secciones (0: todos los núcleos)")
+    parser.add_argument("--watch", "-w", action="store_true", help="Reconstruir al guardar cambios en las entradas")
+    parser.add_argument("--intervalo", type=float, default=0.5, help="Segundos entre sondeos en --watch")
+    parser.add_argument("--debounce", type=float, default=0.8, help="Segundos sin cambios antes de reconstruir")
     
     args = parser.parse_args()
-    
-    input_path = os.path.abspath(args.input)
-    if not os.path.exists(input_path):
-        print(f"Error: No se encuentra el archivo de entrada: {input_path}")
-        return
-
-    # Determinación de Output
-    if args.output:
-        output_path = os.path.abspath(args.output)
-    else:
-        # Default: misma carpeta, extensión .docx
-        base_name = os.path.splitext(input_path)[0]
-        output_path = f"{base_name}_MGA.docx"
+    if len(args.input) > 1 and (args.output or args.ir):
+        parser.error("--output e --ir solo se admiten con una única entrada")
+
+    salidas = {}
+    for entrada in args.input:
+        input_path = os.path.abspath(entrada)
+        if not os.path.exists(input_path):
+            print(f"Error: No se encuentra el archivo de entrada: {input_path}")
+            return
+        # Determinación de Output
+        if args.output:
+            salidas[input_path] = os.path.abspath(args.output)
+        else:
+            # Default: misma carpeta, extensión .docx
+            base_name = os.path.splitext(input_path)[0]
+            salidas[input_path] = f"{base_name}_MGA.docx"
 
+    motor = MotorLocal(args.formato, usar_cache=not args.no_cache, procesos=args.procesos)
+    if args.ir:
+        motor.ir_paths[next(iter(salidas))] = os.path.abspath(args.ir)
     print(f"--- INICIANDO MOTOR LOCAL CITES ---")
-    print(f"Entrada: {input_path}")
-    print(f"Salida:  {output_path}")
-    
-    try:
-        data = parse_markdown_generic(input_path)
-        run_cites_pipeline(data, output_path)
-        print(f"Proceso finalizado con exito.")
-    except Exception as e:
-        print(f"Error critico en ejecucion: {e}")
-        traceback.print_exc()
+    for input_path, output_path in salidas.items():
+        print(f"Entrada: {input_path}")
+        print(f"Salida:  {output_path}")
+        try:
+            # Las estadísticas del registro son acumuladas: se reporta solo el aporte de esta entrada
+            antes = {nombre: replace(st) for nombre, st in estadisticas().items()}
+            motor.construir(input_path, output_path)
+            for nombre, st in estadisticas().items():
+                propio = st.desde(antes[nombre])
+                if propio.archivos:
+                    print(f"Parser:  {nombre}, {propio.bloques} bloques, {propio.lineas_por_segundo:,.0f} líneas/s")
+            print(f"Proceso finalizado con exito.")
+        except Exception as e:
+            print(f"Error critico en ejecucion: {e}")
+            traceback.print_exc()
+
+    if args.watch:
+        vigilar(motor, salidas, args.intervalo, args.debounce)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,220 @@
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+try:
+    from .mga_preparacion import CadenaValor, CadenaValorItem
+except ImportError:
+    from mga_preparacion import CadenaValor, CadenaValorItem
+
+TIPOS_INSUMO = ("Material", "Mano de Obra", "Equipo", "Transporte")
+
+def normalizar_descripcion(texto: str) -> str:
+    """Minúsculas, sin tildes ni signos, espacios colapsados: 'Cemento  Gris (50kg)' -> 'cemento gris 50kg'."""
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", texto).split())
+
+@dataclass
+class InsumoCatalogo:
+    codigo: str
+    descripcion: str
+    unidad: str
+    precio: float
+    tipo: str = "Material" # Material, Mano de Obra, Equipo, Transporte
+
+@dataclass
+class ComponenteAPU:
+    insumo: str # Código o descripción del insumo en el catálogo
+    cantidad: float # Rendimiento por unidad de la actividad
+    desperdicio: float = 0.0 # Fracción (0.05 = 5%)
+
+@dataclass
+class APU:
+    codigo: str
+    descripcion: str
+    unidad: str
+    componentes: List[ComponenteAPU] = field(default_factory=list)
+
+class CatalogoPrecios:
+    """
+    Catálogo local de insumos indexado por código y por descripción normalizada.
+    Los precios viven en un array; `version` aumenta con cada cambio de precio.
+    """
+
+    def __init__(self, insumos: Sequence[InsumoCatalogo] = ()):
+        self.insumos: List[InsumoCatalogo] = []
+        self._por_codigo: Dict[str, int] = {}
+        self._por_descripcion: Dict[str, int] = {}
+        self._precios: List[float] = []
+        self._tipos: List[int] = []
+        self._array: Optional[np.ndarray] = None
+        self.version = 0
+        for insumo in insumos:
+            self.agregar(insumo)
+
+    def __len__(self):
+        return len(self.insumos)
+
+    def agregar(self, insumo: InsumoCatalogo) -> int:
+        if insumo.tipo not in TIPOS_INSUMO:
+            raise ValueError(f"Tipo de insumo no soportado: {insumo.tipo}")
+        pos = self._por_codigo.get(insumo.codigo)
+        if pos is not None:
+            self.insumos[pos] = insumo
+            self._tipos[pos] = TIPOS_INSUMO.index(insumo.tipo)
+            self.actualizar_precio(insumo.codigo, insumo.precio)
+        else:
+            pos = len(self.insumos)
+            self.insumos.append(insumo)
+            self._precios.append(float(insumo.precio))
+            self._tipos.append(TIPOS_INSUMO.index(insumo.tipo))
+            self._por_codigo[insumo.codigo] = pos
+            self._array = None
+            self.version += 1
+        self._por_descripcion[normalizar_descripcion(insumo.descripcion)] = pos
+        return pos
+
+    def posicion(self, clave: str) -> Optional[int]:
+        """Posición del insumo por código exacto o por descripción normalizada."""
+        pos = self._por_codigo.get(clave)
+        return pos if pos is not None else self._por_descripcion.get(normalizar_descripcion(clave))
+
+    def actualizar_precio(self, clave: str, precio: float):
+        pos = self.posicion(clave)
+        if pos is None:
+            raise KeyError(f"Insumo no encontrado en el catálogo: {clave}")
+        self._precios[pos] = float(precio)
+        self.insumos[pos].precio = float(precio)
+        if self._array is not None:
+            self._array[pos] = float(precio)
+        self.version += 1
+
+    @property
+    def precios(self) -> np.ndarray:
+        if self._array is None:
+            self._array = np.asarray(self._precios, dtype=float)
+        return self._array
+
+    @property
+    def tipos(self) -> np.ndarray:
+        return np.asarray(self._tipos, dtype=np.int64)
+
+class MotorAPU:
+    """
+    Análisis de Precios Unitarios. Las composiciones se guardan como una tabla dispersa
+    (apu, insumo, coeficiente) resuelta contra el catálogo una sola vez; el precio unitario
+    de todos los APU es un np.bincount de coeficiente x precio, así que un cambio de
+    precio en el catálogo se refleja en todos los APU sin recorrerlos.
+    """
+
+    def __init__(self, catalogo: CatalogoPrecios):
+        self.catalogo = catalogo
+        self.apus: List[APU] = []
+        self._indice: Dict[str, int] = {}
+        self._filas: List[Tuple[int, int, float]] = []
+        self._compilado: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._cache: Optional[Tuple[int, np.ndarray]] = None
+
+    def registrar(self, apu: APU) -> int:
+        faltantes = [c.insumo for c in apu.componentes if self.catalogo.posicion(c.insumo) is None]
+        if faltantes:
+            raise KeyError(f"APU '{apu.codigo}': insumos no encontrados en el catálogo: {faltantes}")
+        if apu.codigo in self._indice:
+            raise ValueError(f"APU duplicado: {apu.codigo}")
+        k = len(self.apus)
+        self.apus.append(apu)
+        self._indice[apu.codigo] = k
+        for c in apu.componentes:
+            self._filas.append((k, self.catalogo.posicion(c.insumo), c.cantidad * (1.0 + c.desperdicio)))
+        self._compilado = None
+        self._cache = None
+        return k
+
+    def posicion(self, codigo: str) -> int:
+        if codigo not in self._indice:
+            raise KeyError(f"APU no registrado: {codigo}")
+        return self._indice[codigo]
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._compilado is None:
+            filas = np.asarray(self._filas, dtype=float).reshape(-1, 3)
+            self._compilado = (filas[:, 0].astype(np.int64), filas[:, 1].astype(np.int64), filas[:, 2])
+        return self._compilado
+
+    def precios_unitarios(self) -> np.ndarray:
+        """Costo directo por unidad de cada APU (cacheado por versión del catálogo)."""
+        if self._cache is None or self._cache[0] != self.catalogo.version:
+            apu, insumo, coef = self._arrays()
+            precios = np.bincount(apu, weights=coef * self.catalogo.precios[insumo], minlength=len(self.apus))
+            self._cache = (self.catalogo.version, precios)
+        return self._cache[1]
+
+    def desglose_por_tipo(self) -> np.ndarray:
+        """Matriz (APU x tipo de insumo) del costo directo unitario."""
+        apu, insumo, coef = self._arrays()
+        n_tipos = len(TIPOS_INSUMO)
+        combinado = apu * n_tipos + self.catalogo.tipos[insumo]
+        sumas = np.bincount(combinado, weights=coef * self.catalogo.precios[insumo], minlength=len(self.apus) * n_tipos)
+        return sumas.reshape(len(self.apus), n_tipos)
+
+class PresupuestoAPU:
+    """
+    Presupuesto de obra: líneas (APU, cantidad, capítulo) valoradas con el MotorAPU.
+    AIU (administración, imprevistos, utilidad) sobre el costo directo e IVA sobre la utilidad.
+    """
+
+    def __init__(self, motor: MotorAPU, administracion: float = 0.0, imprevistos: float = 0.0,
+                 utilidad: float = 0.0, iva: float = 0.19):
+        self.motor = motor
+        self.administracion = administracion
+        self.imprevistos = imprevistos
+        self.utilidad = utilidad
+        self.iva = iva
+        self._apu: List[int] = []
+        self._cantidades: List[float] = []
+        self.capitulos: List[str] = []
+
+    def __len__(self):
+        return len(self._apu)
+
+    def agregar_linea(self, codigo_apu: str, cantidad: float, capitulo: str = ""):
+        self._apu.append(self.motor.posicion(codigo_apu))
+        self._cantidades.append(float(cantidad))
+        self.capitulos.append(capitulo)
+
+    def valores_unitarios(self) -> np.ndarray:
+        return self.motor.precios_unitarios()[np.asarray(self._apu, dtype=np.int64)]
+
+    def totales_linea(self) -> np.ndarray:
+        return np.asarray(self._cantidades, dtype=float) * self.valores_unitarios()
+
+    def resumen(self) -> Dict[str, float]:
+        directo = float(self.totales_linea().sum())
+        a, i, u = directo * self.administracion, directo * self.imprevistos, directo * self.utilidad
+        iva = u * self.iva
+        return {"Costo Directo": directo, "Administración": a, "Imprevistos": i, "Utilidad": u,
+                "IVA sobre Utilidad": iva, "Total": directo + a + i + u + iva}
+
+    # --- Salidas hacia el resto del sistema ---
+    def a_presupuesto_wizard(self) -> List[Dict]:
+        """Filas con las columnas del editor de presupuesto del wizard (BudgetManager)."""
+        unitarios = self.valores_unitarios()
+        return [
+            {"Ítem": self.motor.apus[k].descripcion, "Unidad": self.motor.apus[k].unidad,
+             "Cantidad": cant, "Valor Unitario": float(vu)}
+            for k, cant, vu in zip(self._apu, self._cantidades, unitarios)
+        ]
+
+    def a_cadena_valor(self, nombre: str, etapa: str = "Inversión", escala: float = 1e6) -> CadenaValor:
+        """Una CadenaValorItem por capítulo (valor en millones con escala=1e6)."""
+        totales = self.totales_linea()
+        codigos = {}
+        cap_idx = np.fromiter((codigos.setdefault(c or "General", len(codigos)) for c in self.capitulos), dtype=np.int64)
+        sumas = np.bincount(cap_idx, weights=totales, minlength=len(codigos))
+        items = [CadenaValorItem(cap, "APU", "Obra", etapa, float(v / escala)) for cap, v in zip(codigos, sumas)]
+        return CadenaValor(nombre, items)
+
+    def tabla_resumen(self) -> List[Dict[str, str]]:
+        return [{"Concepto": k, "Valor": f"${v:,.0f}"} for k, v in self.resumen().items()]
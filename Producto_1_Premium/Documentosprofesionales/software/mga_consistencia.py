@@ -0,0 +1,226 @@
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Tolerancia relativa para considerar dos totales iguales (redondeos en millones)
+TOLERANCIA = 0.005
+
+_NUMERO = re.compile(r"-?\d[\d.,]*")
+_ANIO = re.compile(r"(19|20)\d{2}")
+
+def normalizar_etapa(etapa: str) -> str:
+    """'Inversión', 'Inversion', 'INVERSIÓN' -> 'inversion'; igual para operación."""
+    texto = unicodedata.normalize("NFKD", str(etapa)).encode("ascii", "ignore").decode().strip().lower()
+    if texto.startswith("inver"):
+        return "inversion"
+    if texto.startswith("opera"):
+        return "operacion"
+    return texto
+
+def parsear_monto(texto) -> Optional[float]:
+    """
+    Primer número de un texto como '44,000 millones COP', '$2.980' o '$1.234.567,89'. None si no hay.
+    Con ambos separadores el último es el decimal (formato colombiano '2.980,50' o '2,980.50');
+    con uno solo, es de miles si cada grupo que separa tiene exactamente 3 dígitos ('1,5' -> 1.5).
+    """
+    if isinstance(texto, (int, float)):
+        return float(texto)
+    m = _NUMERO.search(str(texto))
+    if not m:
+        return None
+    numero = m.group(0).rstrip(".,")
+    if "," in numero and "." in numero:
+        miles, decimal = (".", ",") if numero.rfind(",") > numero.rfind(".") else (",", ".")
+        numero = numero.replace(miles, "").replace(decimal, ".")
+    elif re.fullmatch(r"-?\d{1,3}([.,]\d{3})+", numero):
+        numero = numero.replace(",", "").replace(".", "")
+    else:
+        numero = numero.replace(",", ".")
+    try:
+        return float(numero)
+    except ValueError:
+        return None
+
+def parsear_periodo(texto: str) -> Tuple[List[int], bool]:
+    """'2026-2028' -> ([2026, 2027, 2028], False); '2027-2030 (Anual)' -> (..., True)."""
+    anios = [int(m.group(0)) for m in _ANIO.finditer(str(texto))]
+    rango = list(range(min(anios), max(anios) + 1)) if anios else []
+    return rango, "anual" in str(texto).lower()
+
+@dataclass
+class RegistroMonetario:
+    modulo: str
+    ubicacion: str
+    concepto: str # cadena_valor, flujo, fuente, cierre
+    etapa: str # inversion / operacion
+    monto: float
+    anio: Optional[int] = None # Periodo del flujo (0..N) o año calendario de la fuente
+    fuente: str = ""
+    recurrente: bool = False # Monto por año
+
+@dataclass
+class Discrepancia:
+    regla: str
+    descripcion: str
+    valores: Dict[str, float]
+    ubicaciones: List[str] = field(default_factory=list)
+
+class IndiceMonetario:
+    """
+    Índice de todos los montos del proyecto construido en una sola pasada.
+    Mantiene totales agrupados por (concepto, etapa), por (concepto, etapa, año) y por
+    (concepto, etapa, fuente), junto con las ubicaciones que aportan a cada grupo.
+    """
+
+    def __init__(self):
+        self.registros: List[RegistroMonetario] = []
+        self.por_etapa: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.por_anio: Dict[Tuple[str, str, Optional[int]], float] = defaultdict(float)
+        self.por_fuente: Dict[Tuple[str, str, str], float] = defaultdict(float)
+        self.ubicaciones: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        self.ubicaciones_anio: Dict[Tuple[str, str, Optional[int]], List[str]] = defaultdict(list)
+
+    def agregar(self, reg: RegistroMonetario):
+        self.registros.append(reg)
+        self.por_etapa[(reg.concepto, reg.etapa)] += reg.monto
+        self.por_anio[(reg.concepto, reg.etapa, reg.anio)] += reg.monto
+        if reg.fuente:
+            self.por_fuente[(reg.concepto, reg.etapa, reg.fuente)] += reg.monto
+        self.ubicaciones[(reg.concepto, reg.etapa)].append(reg.ubicacion)
+        self.ubicaciones_anio[(reg.concepto, reg.etapa, reg.anio)].append(reg.ubicacion)
+
+    def total(self, concepto: str, etapa: str) -> float:
+        return self.por_etapa.get((concepto, etapa), 0.0)
+
+    def tiene(self, concepto: str, etapa: str) -> bool:
+        return (concepto, etapa) in self.por_etapa
+
+def indexar_modulos(modulos) -> IndiceMonetario:
+    """Recorre los módulos MGA (por sus atributos, sin importar el tipo) y los indexa."""
+    indice = IndiceMonetario()
+    for modulo in modulos:
+        nombre = type(modulo).__name__
+
+        for cv in getattr(modulo, "cadenas_valor", None) or []:
+            for k, item in enumerate(cv.items):
+                indice.agregar(RegistroMonetario(
+                    nombre, f"{nombre}.cadenas_valor['{cv.nombre}'].items[{k}] ({item.actividad})",
+                    "cadena_valor", normalizar_etapa(item.etapa), float(item.valor),
+                    fuente=item.tipo_insumo, recurrente="año" in (item.unidad_tiempo or "")))
+
+        for k, f in enumerate(getattr(modulo, "flujos_detalle", None) or []):
+            ubic = f"{nombre}.flujos_detalle[{k}] (año {f.periodo})"
+            indice.agregar(RegistroMonetario(nombre, ubic, "flujo", "inversion", abs(f.inversion), anio=f.periodo))
+            indice.agregar(RegistroMonetario(nombre, ubic, "flujo", "operacion", abs(f.costos_op), anio=f.periodo))
+            indice.agregar(RegistroMonetario(nombre, ubic, "flujo", "beneficios", f.beneficios, anio=f.periodo))
+            indice.agregar(RegistroMonetario(nombre, ubic, "flujo", "neto", f.flujo_neto, anio=f.periodo))
+
+        for k, fuente in enumerate(getattr(modulo, "fuentes_financiamiento", None) or []):
+            anios, anual = parsear_periodo(fuente.periodo)
+            indice.agregar(RegistroMonetario(
+                nombre, f"{nombre}.fuentes_financiamiento[{k}] ({fuente.nombre_entidad})",
+                "fuente", normalizar_etapa(fuente.etapa), float(fuente.monto),
+                anio=anios[0] if anios else None, fuente=fuente.tipo_recurso, recurrente=anual))
+
+        cierre = getattr(modulo, "cierre_financiero", None) or {}
+        for clave, etapa in (("Inversión Total", "inversion"), ("Costos Op. Anuales", "operacion")):
+            monto = parsear_monto(cierre.get(clave, ""))
+            if monto is not None:
+                indice.agregar(RegistroMonetario(nombre, f"{nombre}.cierre_financiero['{clave}']", "cierre", etapa, monto,
+                                                 recurrente=etapa == "operacion"))
+    return indice
+
+def _difieren(a: float, b: float, tolerancia: float) -> bool:
+    return abs(a - b) > tolerancia * max(abs(a), abs(b), 1.0)
+
+class ReporteConsistencia:
+    def __init__(self, indice: IndiceMonetario, discrepancias: List[Discrepancia]):
+        self.indice = indice
+        self.discrepancias = discrepancias
+
+    @property
+    def ok(self) -> bool:
+        return not self.discrepancias
+
+    def imprimir(self):
+        if self.ok:
+            print(f"✅ Consistencia financiera: {len(self.indice.registros)} montos revisados, sin discrepancias.")
+            return
+        print(f"⚠️ Consistencia financiera: {len(self.discrepancias)} discrepancia(s) en {len(self.indice.registros)} montos revisados")
+        for d in self.discrepancias:
+            valores = ", ".join(f"{k}: {v:,.0f}" for k, v in d.valores.items())
+            print(f"  - [{d.regla}] {d.descripcion} ({valores})")
+            for u in d.ubicaciones[:5]:
+                print(f"      · {u}")
+            if len(d.ubicaciones) > 5:
+                print(f"      · ... y {len(d.ubicaciones) - 5} más")
+
+def verificar_consistencia(modulos, tolerancia: float = TOLERANCIA) -> ReporteConsistencia:
+    """
+    Concilia los totales del proyecto:
+    - Inversión: cadena de valor vs. cofinanciación vs. flujo de caja año 0 vs. cierre financiero.
+    - Operación anual: cadena de valor (/año) vs. fuentes anuales vs. costos del flujo por año vs. cierre.
+    - Flujo neto de cada año = inversión + costos + beneficios.
+    Solo se comparan las fuentes presentes; el costo es lineal en el número de montos.
+    """
+    indice = indexar_modulos(modulos)
+    discrepancias: List[Discrepancia] = []
+
+    def conciliar(regla, descripcion, candidatos):
+        presentes = {etiqueta: (valor, ubic) for etiqueta, valor, ubic, hay in candidatos if hay}
+        if len(presentes) < 2:
+            return
+        valores = {k: v for k, (v, _) in presentes.items()}
+        referencia = next(iter(valores.values()))
+        if any(_difieren(v, referencia, tolerancia) for v in valores.values()):
+            ubicaciones = [u for _, ubic in presentes.values() for u in ubic]
+            discrepancias.append(Discrepancia(regla, descripcion, valores, ubicaciones))
+
+    # Inversión
+    cv_inv = [r for r in indice.registros if r.concepto == "cadena_valor" and r.etapa == "inversion" and not r.recurrente]
+    fuentes_inv = indice.total("fuente", "inversion")
+    flujo_0 = indice.por_anio.get(("flujo", "inversion", 0), 0.0)
+    conciliar("INVERSION", "La inversión total no coincide entre módulos", [
+        ("Cadena de valor", sum(r.monto for r in cv_inv), [r.ubicacion for r in cv_inv], bool(cv_inv)),
+        ("Cofinanciación", fuentes_inv, indice.ubicaciones[("fuente", "inversion")], indice.tiene("fuente", "inversion")),
+        ("Flujo año 0", flujo_0, indice.ubicaciones_anio[("flujo", "inversion", 0)], indice.tiene("flujo", "inversion")),
+        ("Cierre financiero", indice.total("cierre", "inversion"), indice.ubicaciones[("cierre", "inversion")],
+         indice.tiene("cierre", "inversion")),
+    ])
+
+    # Operación anual
+    cv_op = [r for r in indice.registros if r.concepto == "cadena_valor" and r.etapa == "operacion" and r.recurrente]
+    fuentes_op = [r for r in indice.registros if r.concepto == "fuente" and r.etapa == "operacion" and r.recurrente]
+    op_anual = {
+        "Cadena de valor (/año)": (sum(r.monto for r in cv_op), [r.ubicacion for r in cv_op], bool(cv_op)),
+        "Fuentes anuales": (sum(r.monto for r in fuentes_op), [r.ubicacion for r in fuentes_op], bool(fuentes_op)),
+        "Cierre financiero": (indice.total("cierre", "operacion"), indice.ubicaciones[("cierre", "operacion")],
+                              indice.tiene("cierre", "operacion")),
+    }
+    conciliar("OPERACION", "El costo de operación anual no coincide entre módulos",
+              [(k, v, u, h) for k, (v, u, h) in op_anual.items()])
+
+    # Costos de operación del flujo por año contra la referencia anual
+    referencia_op = next(((k, v) for k, (v, _, hay) in op_anual.items() if hay and k != "Cadena de valor (/año)"), None)
+    if referencia_op:
+        etiqueta, valor = referencia_op
+        for (concepto, etapa, anio), monto in indice.por_anio.items():
+            if concepto == "flujo" and etapa == "operacion" and monto and _difieren(monto, valor, tolerancia):
+                discrepancias.append(Discrepancia(
+                    "OPERACION_ANUAL", f"Costos de operación del año {anio} difieren de {etiqueta}",
+                    {f"Flujo año {anio}": monto, etiqueta: valor},
+                    indice.ubicaciones_anio[(concepto, etapa, anio)]))
+
+    # Flujo neto interno
+    for modulo in modulos:
+        for k, f in enumerate(getattr(modulo, "flujos_detalle", None) or []):
+            calculado = f.inversion + f.costos_op + f.beneficios
+            if _difieren(calculado, f.flujo_neto, tolerancia):
+                discrepancias.append(Discrepancia(
+                    "FLUJO_NETO", f"El flujo neto del año {f.periodo} no es inversión + costos + beneficios",
+                    {"Registrado": f.flujo_neto, "Calculado": calculado},
+                    [f"{type(modulo).__name__}.flujos_detalle[{k}] (año {f.periodo})"]))
+
+    return ReporteConsistencia(indice, discrepancias)
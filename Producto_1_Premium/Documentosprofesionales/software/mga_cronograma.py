@@ -0,0 +1,166 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+try:
+    from .mga_programacion import CronogramaActividad
+except ImportError:
+    from mga_programacion import CronogramaActividad
+
+# Columnas de CronogramaActividad: (campo, mes inicial, mes final) en meses desde el inicio
+BUCKETS_MESES = (
+    ("meses_1_6", 0, 6),
+    ("meses_7_12", 6, 12),
+    ("meses_13_24", 12, 24),
+    ("meses_25_36", 24, 36),
+    ("meses_37_48", 36, 48),
+)
+
+class CicloDependenciasError(ValueError):
+    """Las dependencias forman un ciclo; `ciclo` lista los códigos involucrados."""
+
+    def __init__(self, ciclo: List[str]):
+        self.ciclo = ciclo
+        super().__init__("Dependencias circulares: " + " -> ".join(ciclo + ciclo[:1]))
+
+@dataclass
+class ActividadProgramada:
+    codigo: str
+    nombre: str
+    duracion: float # Meses
+    predecesoras: List[str] = field(default_factory=list)
+    # Resultados del cálculo (meses desde el inicio del proyecto)
+    inicio_temprano: float = 0.0
+    fin_temprano: float = 0.0
+    inicio_tardio: float = 0.0
+    fin_tardio: float = 0.0
+    holgura: float = 0.0
+
+    @property
+    def critica(self) -> bool:
+        return abs(self.holgura) < 1e-9
+
+class ProgramadorRutaCritica:
+    """
+    Método de la ruta crítica (CPM) para el cronograma MGA.
+    Orden topológico de Kahn y pasadas hacia adelante/atrás en O(actividades + dependencias);
+    las columnas por bloque de meses de CronogramaActividad se derivan de las fechas tempranas.
+    """
+
+    def __init__(self):
+        self.actividades: Dict[str, ActividadProgramada] = {}
+        self.orden: List[str] = []
+        self.duracion_total: float = 0.0
+
+    def agregar_actividad(self, codigo: str, nombre: str, duracion: float, predecesoras: Sequence[str] = ()):
+        if duracion < 0:
+            raise ValueError(f"La actividad '{codigo}' tiene duración negativa ({duracion}).")
+        self.actividades[codigo] = ActividadProgramada(codigo, nombre, float(duracion), list(predecesoras))
+        self.orden = []
+
+    def _orden_topologico(self, sucesores: List[List[int]], grado: List[int]) -> List[int]:
+        cola = deque(i for i, g in enumerate(grado) if g == 0)
+        orden = []
+        while cola:
+            i = cola.popleft()
+            orden.append(i)
+            for j in sucesores[i]:
+                grado[j] -= 1
+                if grado[j] == 0:
+                    cola.append(j)
+        return orden
+
+    @staticmethod
+    def _extraer_ciclo(codigos: List[str], predecesores: List[List[int]], pendientes: set) -> List[str]:
+        # Todo nodo pendiente tiene un predecesor pendiente: retroceder hasta repetir un nodo
+        i = next(iter(pendientes))
+        visitados: Dict[int, int] = {}
+        camino = []
+        while i not in visitados:
+            visitados[i] = len(camino)
+            camino.append(i)
+            i = next(p for p in predecesores[i] if p in pendientes)
+        ciclo = camino[visitados[i]:]
+        return [codigos[k] for k in reversed(ciclo)]
+
+    def calcular(self) -> float:
+        """Calcula fechas tempranas/tardías y holguras. Retorna la duración total (meses)."""
+        codigos = list(self.actividades)
+        indice = {c: i for i, c in enumerate(codigos)}
+        n = len(codigos)
+        duracion = [self.actividades[c].duracion for c in codigos]
+        predecesores: List[List[int]] = [[] for _ in range(n)]
+        sucesores: List[List[int]] = [[] for _ in range(n)]
+        for c in codigos:
+            j = indice[c]
+            for p in self.actividades[c].predecesoras:
+                if p not in indice:
+                    raise ValueError(f"La actividad '{c}' depende de '{p}', que no existe.")
+                predecesores[j].append(indice[p])
+                sucesores[indice[p]].append(j)
+
+        orden = self._orden_topologico(sucesores, [len(p) for p in predecesores])
+        if len(orden) < n:
+            pendientes = set(range(n)) - set(orden)
+            raise CicloDependenciasError(self._extraer_ciclo(codigos, predecesores, pendientes))
+
+        # Pasada hacia adelante
+        it = [0.0] * n
+        ft = [0.0] * n
+        for i in orden:
+            it[i] = max((ft[p] for p in predecesores[i]), default=0.0)
+            ft[i] = it[i] + duracion[i]
+        total = max(ft, default=0.0)
+
+        # Pasada hacia atrás
+        ftt = [total] * n
+        itt = [0.0] * n
+        for i in reversed(orden):
+            ftt[i] = min((itt[s] for s in sucesores[i]), default=total)
+            itt[i] = ftt[i] - duracion[i]
+
+        for i, c in enumerate(codigos):
+            act = self.actividades[c]
+            act.inicio_temprano, act.fin_temprano = it[i], ft[i]
+            act.inicio_tardio, act.fin_tardio = itt[i], ftt[i]
+            act.holgura = itt[i] - it[i]
+
+        self.orden = [codigos[i] for i in orden]
+        self.duracion_total = total
+        return total
+
+    def _calculado(self) -> List[ActividadProgramada]:
+        if len(self.orden) != len(self.actividades):
+            self.calcular()
+        return [self.actividades[c] for c in self.orden]
+
+    def ruta_critica(self) -> List[str]:
+        """Códigos de las actividades sin holgura, en orden topológico."""
+        return [a.codigo for a in self._calculado() if a.critica]
+
+    def a_cronograma(self, marca: str = "X") -> List[CronogramaActividad]:
+        """
+        Filas de CronogramaActividad con `marca` en cada bloque de meses que se cruza con
+        [inicio temprano, fin temprano). Los hitos (duración 0) marcan el bloque donde caen.
+        Lo que exceda el mes 48 no tiene columna en el formato MGA.
+        """
+        filas = []
+        for a in self._calculado():
+            fin = a.fin_temprano if a.duracion > 0 else a.inicio_temprano + 1e-9
+            valores = {campo: (marca if a.inicio_temprano < hasta and fin > desde else "")
+                       for campo, desde, hasta in BUCKETS_MESES}
+            filas.append(CronogramaActividad(concepto=a.nombre, **valores))
+        return filas
+
+    def tabla_programacion(self) -> List[Dict[str, str]]:
+        return [
+            {
+                "Actividad": a.nombre,
+                "Duración (meses)": f"{a.duracion:g}",
+                "Inicio": f"{a.inicio_temprano:g}",
+                "Fin": f"{a.fin_temprano:g}",
+                "Holgura": f"{a.holgura:g}",
+                "Crítica": "Sí" if a.critica else "No",
+            }
+            for a in self._calculado()
+        ]
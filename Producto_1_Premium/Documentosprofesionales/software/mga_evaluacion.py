@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List
+import numpy as np
 
 @dataclass
 class FlujoCajaDetail:
@@ -15,6 +16,141 @@ class IndicadorManual:
     valor: str
     interpretacion: str
 
+# --- MOTOR DE INDICADORES (vectorizado: una fila por proyecto, una columna por periodo) ---
+
+# Malla de tasas para acotar la TIR: densa cerca de 0 y geométrica hasta 100.000%
+_TIR_GRID = np.unique(np.concatenate([
+    np.linspace(-0.99, 1.0, 200),
+    np.geomspace(1.0, 1000.0, 120),
+]))
+
+def _como_matriz(flujos) -> np.ndarray:
+    """Acepta un vector (un proyecto) o una matriz (proyectos x periodos)."""
+    arr = np.asarray(flujos, dtype=float)
+    return arr[None, :] if arr.ndim == 1 else arr
+
+def _factores_descuento(tasa, n_periodos: int) -> np.ndarray:
+    """Matriz (proyectos x periodos) o vector de (1+r)^-t."""
+    t = np.arange(n_periodos)
+    tasa = np.asarray(tasa, dtype=float)
+    with np.errstate(over="ignore", divide="ignore"):
+        return (1.0 + tasa[..., None]) ** -t
+
+def calcular_vpn(flujos, tasa) -> np.ndarray:
+    """VPN de cada fila. `tasa` escalar o un valor por proyecto."""
+    m = _como_matriz(flujos)
+    return (m * _factores_descuento(tasa, m.shape[1])).sum(axis=-1)
+
+def calcular_tir(flujos, tol: float = 1e-10, max_iter: int = 100, referencia: float = 0.10) -> np.ndarray:
+    """
+    TIR por fila con Newton acotado (safeguarded Newton): se busca en la malla el cambio
+    de signo del VPN y dentro de ese intervalo se itera Newton, cayendo a bisección si el
+    paso sale del intervalo. Con flujos no convencionales (varias raíces) se toma la más
+    cercana a `referencia`. NaN si el flujo no tiene cambio de signo
+    (un flujo en ceros no tiene TIR: su VPN es nulo a cualquier tasa).
+    """
+    m = _como_matriz(flujos)
+    n, p = m.shape
+    t = np.arange(p)
+
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        vpn_malla = m @ ((1.0 + _TIR_GRID)[None, :] ** -t[:, None])
+    signo = np.sign(vpn_malla)
+    cambio = (signo[:, :-1] * signo[:, 1:]) < 0
+    # Raíz exacta en un punto de la malla; una fila con VPN nulo en toda la malla (flujo en ceros) no tiene TIR
+    exacta = (signo == 0) & (signo != 0).any(axis=1, keepdims=True)
+    tiene = cambio.any(axis=1) | exacta.any(axis=1)
+    distancia = np.abs((_TIR_GRID[:-1] + _TIR_GRID[1:]) / 2 - referencia)
+    d_intervalo = np.where(cambio, distancia[None, :], np.inf)
+    d_exacta = np.where(exacta, np.abs(_TIR_GRID - referencia)[None, :], np.inf)
+    k, j = d_intervalo.argmin(axis=1), d_exacta.argmin(axis=1)
+    usar_exacta = d_exacta[np.arange(n), j] <= d_intervalo[np.arange(n), k]
+    lo, hi = _TIR_GRID[k], _TIR_GRID[k + 1]
+    f_lo = vpn_malla[np.arange(n), k]
+
+    x = (lo + hi) / 2
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        for _ in range(max_iter):
+            base = 1.0 + x[:, None]
+            desc = base ** -t
+            f = (m * desc).sum(axis=1)
+            df = (-t * m * desc / base).sum(axis=1)
+
+            # Actualizar el intervalo conservando el cambio de signo
+            mismo = np.sign(f) == np.sign(f_lo)
+            lo, f_lo = np.where(mismo, x, lo), np.where(mismo, f, f_lo)
+            hi = np.where(mismo, hi, x)
+
+            newton = x - f / df
+            ok = np.isfinite(newton) & (newton > lo) & (newton < hi)
+            x_nuevo = np.where(ok, newton, (lo + hi) / 2)
+            if np.all(np.abs(x_nuevo - x) <= tol * np.maximum(1.0, np.abs(x))):
+                x = x_nuevo
+                break
+            x = x_nuevo
+
+    return np.where(tiene, np.where(usar_exacta, _TIR_GRID[j], x), np.nan)
+
+def calcular_rbc(beneficios, costos, tasa) -> np.ndarray:
+    """Relación Beneficio/Costo: VP(beneficios) / VP(costos), con costos en valor absoluto."""
+    vp_b = calcular_vpn(np.abs(beneficios), tasa)
+    vp_c = calcular_vpn(np.abs(costos), tasa)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(vp_c > 0, vp_b / vp_c, np.nan)
+
+def calcular_cae(costos, tasa, horizonte=None) -> np.ndarray:
+    """
+    Costo Anual Equivalente: VP(costos) x factor de recuperación de capital del horizonte.
+    `horizonte` (años, escalar o uno por proyecto) por defecto es el número de periodos - 1;
+    se pasa explícito cuando la matriz viene rellenada con ceros (portafolios).
+    """
+    m = np.abs(_como_matriz(costos))
+    horizonte = np.asarray(m.shape[1] - 1 if horizonte is None else horizonte, dtype=float)
+    r = np.asarray(tasa, dtype=float)
+    vp_c = calcular_vpn(m, r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frc = np.where(r == 0, 1.0 / horizonte, r / (1.0 - (1.0 + r) ** -horizonte))
+    return np.where(horizonte > 0, vp_c * frc, vp_c)
+
+def calcular_pri(flujos) -> np.ndarray:
+    """
+    Periodo de recuperación de la inversión (años, interpolado): primer periodo en que el
+    flujo acumulado vuelve a ser >= 0 después de haber sido negativo. NaN si no se recupera
+    en el horizonte; 0 si el acumulado nunca es negativo (no hay inversión que recuperar).
+    """
+    m = _como_matriz(flujos)
+    acumulado = np.cumsum(m, axis=1)
+    negativo = acumulado < 0
+    ya_negativo = np.zeros_like(negativo)
+    ya_negativo[:, 1:] = np.logical_or.accumulate(negativo, axis=1)[:, :-1]
+    recupera = (acumulado >= 0) & ya_negativo
+    tiene = recupera.any(axis=1)
+    k = recupera.argmax(axis=1)
+    filas = np.arange(m.shape[0])
+    previo = acumulado[filas, np.maximum(k - 1, 0)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraccion = np.where(m[filas, k] != 0, -previo / m[filas, k], 0.0)
+    pri = np.where(tiene, k - 1 + np.clip(fraccion, 0.0, 1.0), np.nan)
+    return np.where(negativo.any(axis=1), pri, 0.0)
+
+def evaluar_lote(flujos_netos, tasa, beneficios=None, costos=None) -> Dict[str, np.ndarray]:
+    """
+    Evalúa miles de proyectos en una sola llamada.
+    flujos_netos: matriz (proyectos x periodos). Si no se pasan beneficios/costos,
+    se toman la parte positiva y negativa del flujo neto.
+    Retorna arrays {vpn, tir, rbc, cae, pri} de largo = proyectos.
+    """
+    neto = _como_matriz(flujos_netos)
+    beneficios = np.clip(neto, 0, None) if beneficios is None else _como_matriz(beneficios)
+    costos = np.clip(-neto, 0, None) if costos is None else _como_matriz(costos)
+    return {
+        "vpn": calcular_vpn(neto, tasa),
+        "tir": calcular_tir(neto),
+        "rbc": calcular_rbc(beneficios, costos, tasa),
+        "cae": calcular_cae(costos, tasa),
+        "pri": calcular_pri(neto),
+    }
+
 class MgaEvaluacion:
     """Módulo 3: Evaluación Financiera y Económica."""
     
@@ -24,13 +160,76 @@ class MgaEvaluacion:
         self.indicadores_manuales: List[IndicadorManual] = []
         self.analisis_resultados: str = ""
         self.decision: str = ""
+        self.simulacion = None # ResultadoSimulacion (mga_simulacion), opcional
 
     def agregar_flujo_detalle(self, anio: int, inv: float, costos: float, ben: float, neto: float):
         self.flujos_detalle.append(FlujoCajaDetail(anio, inv, costos, ben, neto))
 
+    def set_flujos_desde_proyeccion(self, proyeccion: Dict[str, np.ndarray], beneficios=None):
+        """
+        Reemplaza el flujo de caja con la proyección de la cadena de valor
+        (MgaPreparacion.proyeccion_cadena_valor). Si no se pasan beneficios por año,
+        se conservan los de los flujos existentes.
+        """
+        inversion = np.asarray(proyeccion.get("Inversión", []), dtype=float)
+        operacion = np.asarray(proyeccion.get("Operación", []), dtype=float)
+        n = max(len(inversion), len(operacion))
+        if beneficios is None:
+            actual = self.matriz_flujos()["beneficios"]
+            beneficios = np.zeros(n)
+            beneficios[:min(n, len(actual))] = actual[:n]
+        inv = 0.0 - np.pad(inversion, (0, n - len(inversion)))
+        cos = 0.0 - np.pad(operacion, (0, n - len(operacion)))
+        ben = np.pad(np.asarray(beneficios, dtype=float)[:n], (0, max(0, n - len(beneficios))))
+        neto = inv + cos + ben
+        self.flujos_detalle = [FlujoCajaDetail(t, float(inv[t]), float(cos[t]), float(ben[t]), float(neto[t])) for t in range(n)]
+
+    def matriz_flujos(self) -> Dict[str, np.ndarray]:
+        """Vectores por periodo (0..N) de inversión, costos, beneficios y flujo neto."""
+        n = max((f.periodo for f in self.flujos_detalle), default=-1) + 1
+        cols = {k: np.zeros(n) for k in ("inversion", "costos_op", "beneficios", "flujo_neto")}
+        if n:
+            periodos = np.array([f.periodo for f in self.flujos_detalle])
+            for k, arr in cols.items():
+                np.add.at(arr, periodos, [getattr(f, k) for f in self.flujos_detalle])
+        return cols
+
+    def calcular_indicadores(self) -> Dict[str, float]:
+        """VPN, TIR, RBC, CAE y PRI calculados desde los flujos (nunca quedan desactualizados)."""
+        if not self.flujos_detalle:
+            return {}
+        m = self.matriz_flujos()
+        costos = np.abs(m["inversion"]) + np.abs(m["costos_op"])
+        res = evaluar_lote(m["flujo_neto"], self.tsd, beneficios=m["beneficios"], costos=costos)
+        return {k: float(v[0]) for k, v in res.items()}
+
+    def _tabla_indicadores_calculados(self) -> List[Dict[str, str]]:
+        ind = self.calcular_indicadores()
+        if not ind:
+            return []
+        vpn, tir, rbc, cae, pri = (ind[k] for k in ("vpn", "tir", "rbc", "cae", "pri"))
+        tsd_txt = f"{self.tsd*100:g}%"
+        return [
+            {"Indicador": "VPN", "Valor": f"${vpn:,.0f}",
+             "Interpretación": "Positivo - Genera valor" if vpn > 0 else "Negativo - No recupera el costo de oportunidad"},
+            {"Indicador": "TIR", "Valor": "N/D" if np.isnan(tir) else f"{tir*100:,.1f}%",
+             "Interpretación": "Sin cambio de signo en el flujo" if np.isnan(tir) else
+                               (f"Superior a TSD ({tsd_txt}) - Rentable" if tir > self.tsd else f"Inferior a TSD ({tsd_txt})")},
+            {"Indicador": "Relación B/C", "Valor": "N/D" if np.isnan(rbc) else f"{rbc:,.2f}:1",
+             "Interpretación": "Mayor a 1 - Beneficios > Costos" if rbc > 1 else "Menor o igual a 1"},
+            {"Indicador": "CAE", "Valor": f"${cae:,.0f}", "Interpretación": "Costo anual equivalente del horizonte"},
+            {"Indicador": "Periodo de Recuperación", "Valor": "N/D" if np.isnan(pri) else f"{pri:,.1f} años",
+             "Interpretación": "No se recupera en el horizonte" if np.isnan(pri) else
+                               "Sin inversión por recuperar" if pri == 0 else "Años para recuperar la inversión"},
+        ]
+
     def agregar_indicador(self, nombre: str, valor: str, interp: str):
         self.indicadores_manuales.append(IndicadorManual(nombre, valor, interp))
         
+    def set_simulacion(self, resultado):
+        """Adjunta un ResultadoSimulacion para renderizar sus tablas de riesgo."""
+        self.simulacion = resultado
+
     def set_analisis(self, texto: str):
         self.analisis_resultados = texto
         
@@ -50,7 +249,8 @@ class MgaEvaluacion:
             for f in sorted(self.flujos_detalle, key=lambda x: x.periodo)
         ]
 
-        # Construir tabla de indicadores
+        # Construir tabla de indicadores: calculados desde los flujos + manuales adicionales
+        tabla_calculados = self._tabla_indicadores_calculados()
         tabla_indicadores = [
             {"Indicador": i.nombre, "Valor": i.valor, "Interpretación": i.interpretacion}
             for i in self.indicadores_manuales
@@ -65,9 +265,15 @@ class MgaEvaluacion:
             {"tipo": "titulo2", "texto": "Indicadores de Evaluación"},
         ]
         
+        if tabla_calculados:
+            contenido.append({"tipo": "tabla", "titulo": "Indicadores Calculados desde el Flujo", "datos": tabla_calculados})
         if tabla_indicadores:
             contenido.append({"tipo": "tabla", "titulo": "Resumen de Indicadores", "datos": tabla_indicadores})
             
+        if self.simulacion is not None:
+            contenido.append({"tipo": "titulo2", "texto": "Análisis de Riesgo (Monte Carlo)"})
+            contenido.extend(self.simulacion.tablas())
+
         if self.analisis_resultados:
             contenido.append({"tipo": "titulo2", "texto": "Análisis de Resultados"})
             contenido.append({"tipo": "parrafo", "texto": self.analisis_resultados})
@@ -59,6 +59,7 @@ class MgaIdentificacion:
         self.alternativas: List[Alternativa] = []
         self.participantes: List[Participante] = []
         self.contribucion_politica: List[str] = []
+        self.evaluacion_multicriterio = None # ResultadoMulticriterio (mga_multicriterio), opcional
 
     def agregar_alternativa(self, alt: Alternativa):
         self.alternativas.append(alt)
@@ -69,6 +70,16 @@ class MgaIdentificacion:
     def set_contribucion_politica(self, lineas: List[str]):
         self.contribucion_politica = lineas
 
+    def set_evaluacion_multicriterio(self, resultado):
+        """Marca como seleccionada la alternativa de mayor puntaje multicriterio."""
+        self.evaluacion_multicriterio = resultado
+        mejor = resultado.alternativas[resultado.mejor]
+        for alt in self.alternativas:
+            alt.seleccionada = alt.nombre == mejor
+            if alt.seleccionada and not alt.justificacion:
+                alt.justificacion = (f"Mayor puntaje en la evaluación multicriterio "
+                                     f"({resultado.puntajes[resultado.mejor]*100:.1f} sobre 100).")
+
     def render_content(self) -> dict:
         """Retorna el contenido estructurado para el Document Factory."""
         
@@ -92,6 +103,17 @@ class MgaIdentificacion:
         lista_fines = [f"Directo: {f}" for f in self.objetivos.fines_directos] + \
                       [f"Indirecto: {f}" for f in self.objetivos.fines_indirectos]
 
+        bloques_multicriterio = []
+        mc = self.evaluacion_multicriterio
+        if mc is not None:
+            bloques_multicriterio = [
+                {"tipo": "tabla", "titulo": "Pesos de los Criterios", "datos": mc.tabla_pesos()},
+                {"tipo": "tabla", "titulo": "Puntaje Multicriterio de Alternativas", "datos": mc.tabla_puntajes()},
+            ]
+            if mc.rc is not None:
+                estado = "consistente" if mc.consistente else "inconsistente, se recomienda revisar las comparaciones"
+                bloques_multicriterio.append({"tipo": "parrafo", "texto": f"Razón de consistencia AHP: {mc.rc:.3f} ({estado})."})
+
         return {
             "titulo": f"MÓDULO 1: IDENTIFICACIÓN - {self.nombre_proyecto}",
             "cuerpo": [
@@ -128,6 +150,7 @@ class MgaIdentificacion:
                 # Cap 6: Alternativas
                 {"tipo": "titulo2", "texto": "Capítulo 6: Alternativas de Solución"},
                 {"tipo": "tabla", "titulo": "Evaluación de Alternativas", "datos": datos_alternativas},
+                *bloques_multicriterio,
                 {"tipo": "parrafo", "texto": f"Justificación Selección: {next((a.justificacion for a in self.alternativas if a.seleccionada), '')}"},
             ]
         }
@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+try:
+    from .mga_preparacion import DatosMercado, ProductoMercado
+except ImportError:
+    from mga_preparacion import DatosMercado, ProductoMercado
+
+MODELOS = ("lineal", "geometrico", "logistico")
+
+@dataclass
+class SerieMercado:
+    """
+    Serie histórica de un producto y modelos de crecimiento para proyectarla.
+    capacidad_*: techo de saturación del modelo logístico (por defecto 2x el máximo histórico).
+    aporte_proyecto: oferta adicional anual que aporta el proyecto desde anio_inicio_proyecto.
+    """
+    producto: str
+    anios: List[int]
+    oferta: List[float]
+    demanda: List[float]
+    modelo_oferta: str = "lineal"
+    modelo_demanda: str = "geometrico"
+    capacidad_oferta: Optional[float] = None
+    capacidad_demanda: Optional[float] = None
+    aporte_proyecto: float = 0.0
+    anio_inicio_proyecto: Optional[int] = None
+
+def _ajuste_lineal(t: np.ndarray, y: np.ndarray):
+    """Mínimos cuadrados y = a + b·t por fila, ignorando NaN. Retorna (a, b)."""
+    valido = ~np.isnan(y)
+    n = valido.sum(axis=1)
+    t = np.where(valido, t, 0.0)
+    y = np.where(valido, y, 0.0)
+    st, sy = t.sum(axis=1), y.sum(axis=1)
+    stt, sty = (t * t).sum(axis=1), (t * y).sum(axis=1)
+    den = n * stt - st * st
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = np.where(den != 0, (n * sty - st * sy) / den, 0.0)
+        a = np.where(n > 0, (sy - b * st) / np.maximum(n, 1), 0.0)
+    return a, b
+
+def proyectar_series(t_hist: np.ndarray, y_hist: np.ndarray, t_fut: np.ndarray,
+                     modelos: Sequence[str], capacidades: np.ndarray) -> np.ndarray:
+    """
+    Proyecta muchas series a la vez. t_hist/y_hist: (series x años históricos) con NaN de
+    relleno; t_fut: años a proyectar. Los tres modelos se linealizan y se ajustan por grupo:
+    lineal y = a + b·t, geométrico ln y = a + b·t, logístico ln(K/y - 1) = a + b·t.
+    """
+    modelos = np.asarray(modelos)
+    invalidos = set(modelos.tolist()) - set(MODELOS)
+    if invalidos:
+        raise ValueError(f"Modelos de proyección no soportados: {sorted(invalidos)}")
+    salida = np.full((y_hist.shape[0], len(t_fut)), np.nan)
+    for modelo in MODELOS:
+        filas = np.flatnonzero(modelos == modelo)
+        if not filas.size:
+            continue
+        y, t = y_hist[filas], t_hist[filas]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if modelo == "lineal":
+                a, b = _ajuste_lineal(t, y)
+                salida[filas] = a[:, None] + b[:, None] * t_fut
+            elif modelo == "geometrico":
+                a, b = _ajuste_lineal(t, np.where(y > 0, np.log(y), np.nan))
+                salida[filas] = np.exp(a[:, None] + b[:, None] * t_fut)
+            else:
+                k = capacidades[filas][:, None]
+                z = np.where((y > 0) & (y < k), np.log(k / y - 1.0), np.nan)
+                a, b = _ajuste_lineal(t, z)
+                salida[filas] = k / (1.0 + np.exp(a[:, None] + b[:, None] * t_fut))
+    return np.maximum(salida, 0.0)
+
+class ProyectorMercado:
+    """Balance oferta-demanda proyectado para muchos productos en una sola pasada matricial."""
+
+    def __init__(self, series: List[SerieMercado]):
+        self.series = series
+        largo = max((len(s.anios) for s in series), default=0)
+        self.base = min((min(s.anios) for s in series if s.anios), default=0)
+        shape = (len(series), largo)
+        self.t_hist = np.full(shape, np.nan)
+        self.oferta_hist = np.full(shape, np.nan)
+        self.demanda_hist = np.full(shape, np.nan)
+        for i, s in enumerate(series):
+            n = len(s.anios)
+            self.t_hist[i, :n] = np.asarray(s.anios, dtype=float) - self.base
+            self.oferta_hist[i, :n] = s.oferta
+            self.demanda_hist[i, :n] = s.demanda
+
+    def _capacidades(self, campo: str, historico: np.ndarray) -> np.ndarray:
+        maximo = np.nan_to_num(np.nanmax(historico, axis=1, initial=0.0))
+        dados = np.array([getattr(s, campo) if getattr(s, campo) is not None else np.nan for s in self.series], dtype=float)
+        return np.where(np.isnan(dados), 2.0 * maximo, dados)
+
+    def proyectar(self, anios: Sequence[int]) -> Dict[str, np.ndarray]:
+        """Matrices (productos x años): oferta/demanda y déficit sin y con proyecto."""
+        t_fut = np.asarray(anios, dtype=float) - self.base
+        oferta = proyectar_series(self.t_hist, self.oferta_hist, t_fut, [s.modelo_oferta for s in self.series],
+                                  self._capacidades("capacidad_oferta", self.oferta_hist))
+        demanda = proyectar_series(self.t_hist, self.demanda_hist, t_fut, [s.modelo_demanda for s in self.series],
+                                   self._capacidades("capacidad_demanda", self.demanda_hist))
+
+        aporte = np.array([s.aporte_proyecto for s in self.series], dtype=float)
+        inicio = np.array([s.anio_inicio_proyecto if s.anio_inicio_proyecto is not None else -np.inf
+                           for s in self.series], dtype=float)
+        activo = np.asarray(anios, dtype=float)[None, :] >= inicio[:, None]
+        oferta_con = oferta + np.where(activo, aporte[:, None], 0.0)
+
+        return {
+            "oferta_sin": oferta,
+            "oferta_con": oferta_con,
+            "demanda": demanda,
+            "deficit_sin": np.maximum(demanda - oferta, 0.0),
+            "deficit_con": np.maximum(demanda - oferta_con, 0.0),
+        }
+
+    def a_productos_mercado(self, anios: Sequence[int], incluir_historico: bool = True) -> List[ProductoMercado]:
+        """Filas DatosMercado (Histórico, Sin Proyecto, Con Proyecto) con el déficit ya calculado."""
+        p = {k: np.rint(v).astype(int) for k, v in self.proyectar(anios).items()}
+        # El déficit se recalcula sobre los valores redondeados para que la tabla cuadre
+        p["deficit_sin"] = np.maximum(p["demanda"] - p["oferta_sin"], 0)
+        p["deficit_con"] = np.maximum(p["demanda"] - p["oferta_con"], 0)
+        productos = []
+        for i, s in enumerate(self.series):
+            datos = []
+            if incluir_historico:
+                for anio, of, de in zip(s.anios, s.oferta, s.demanda):
+                    of, de = int(round(of)), int(round(de))
+                    datos.append(DatosMercado(str(anio), of, de, max(de - of, 0), "Histórico", "Dato observado"))
+            for j, anio in enumerate(anios):
+                datos.append(DatosMercado(str(anio), int(p["oferta_sin"][i, j]), int(p["demanda"][i, j]), int(p["deficit_sin"][i, j]),
+                                          "Sin Proyecto", f"Oferta {s.modelo_oferta}, demanda {s.modelo_demanda}"))
+            for j, anio in enumerate(anios):
+                datos.append(DatosMercado(str(anio), int(p["oferta_con"][i, j]), int(p["demanda"][i, j]), int(p["deficit_con"][i, j]),
+                                          "Con Proyecto", f"Aporte del proyecto: {s.aporte_proyecto:,.0f}"))
+            productos.append(ProductoMercado(s.producto, datos))
+        return productos
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Índice aleatorio de Saaty por tamaño de matriz
+INDICE_ALEATORIO = (0.0, 0.0, 0.0, 0.58, 0.90, 1.12, 1.24, 1.32, 1.41, 1.45, 1.49, 1.51, 1.48, 1.56, 1.57, 1.59)
+
+# Razón de consistencia máxima aceptable
+RC_MAXIMA = 0.10
+
+def pesos_ahp(matriz) -> Tuple[np.ndarray, float, float]:
+    """
+    Pesos AHP por el vector propio principal de la matriz de comparaciones pareadas.
+    Retorna (pesos normalizados, lambda_max, razón de consistencia).
+    """
+    a = np.asarray(matriz, dtype=float)
+    n = a.shape[0]
+    if a.ndim != 2 or a.shape[1] != n:
+        raise ValueError("La matriz de comparaciones debe ser cuadrada.")
+    if np.any(a <= 0) or not np.allclose(a * a.T, 1.0, rtol=1e-6):
+        raise ValueError("La matriz de comparaciones debe ser positiva y recíproca (a_ji = 1 / a_ij).")
+    valores, vectores = np.linalg.eig(a)
+    k = int(np.argmax(valores.real))
+    lambda_max = float(valores[k].real)
+    pesos = np.abs(vectores[:, k].real)
+    pesos = pesos / pesos.sum()
+    ic = (lambda_max - n) / (n - 1) if n > 1 else 0.0
+    ri = INDICE_ALEATORIO[n] if n < len(INDICE_ALEATORIO) else INDICE_ALEATORIO[-1]
+    rc = ic / ri if ri > 0 else 0.0
+    return pesos, lambda_max, max(rc, 0.0)
+
+def matriz_desde_comparaciones(criterios: Sequence[str], comparaciones: Dict[Tuple[str, str], float]) -> np.ndarray:
+    """
+    Matriz recíproca desde comparaciones {(A, B): valor} en escala de Saaty (1-9):
+    valor > 1 significa que A es más importante que B.
+    """
+    idx = {c: i for i, c in enumerate(criterios)}
+    a = np.ones((len(criterios), len(criterios)))
+    for (x, y), valor in comparaciones.items():
+        a[idx[x], idx[y]] = valor
+        a[idx[y], idx[x]] = 1.0 / valor
+    return a
+
+@dataclass
+class ResultadoMulticriterio:
+    alternativas: List[str]
+    criterios: List[str]
+    pesos: np.ndarray
+    normalizada: np.ndarray # (alternativas x criterios), 0-1
+    puntajes: np.ndarray # Puntaje ponderado por alternativa
+    rc: Optional[float] = None # Solo con matriz AHP
+
+    @property
+    def mejor(self) -> int:
+        return int(np.argmax(self.puntajes))
+
+    @property
+    def consistente(self) -> bool:
+        return self.rc is None or self.rc <= RC_MAXIMA
+
+    def ranking(self) -> np.ndarray:
+        return np.argsort(-self.puntajes, kind="stable")
+
+    def tabla_pesos(self) -> List[Dict[str, str]]:
+        return [{"Criterio": c, "Peso": f"{p*100:.1f}%"} for c, p in zip(self.criterios, self.pesos)]
+
+    def tabla_puntajes(self) -> List[Dict[str, str]]:
+        puestos = np.empty(len(self.alternativas), dtype=int)
+        puestos[self.ranking()] = np.arange(1, len(self.alternativas) + 1)
+        return [
+            {"Alternativa": self.alternativas[i],
+             **{c: f"{self.normalizada[i, j]:.2f}" for j, c in enumerate(self.criterios)},
+             "Puntaje": f"{self.puntajes[i]*100:.1f}",
+             "Puesto": str(puestos[i])}
+            for i in self.ranking()
+        ]
+
+class EvaluadorMulticriterio:
+    """
+    Evaluación multicriterio de alternativas. Los pesos se dan directamente o salen
+    de una matriz AHP; los puntajes crudos (alternativas x criterios) se normalizan
+    min-max por columna (invirtiendo los criterios a minimizar) y se ponderan con un
+    producto matriz-vector.
+    """
+
+    def __init__(self, criterios: Sequence[str], pesos: Optional[Sequence[float]] = None,
+                 matriz_ahp=None, minimizar: Sequence[str] = ()):
+        self.criterios = list(criterios)
+        self.rc: Optional[float] = None
+        if matriz_ahp is not None:
+            self.pesos, _, self.rc = pesos_ahp(matriz_ahp)
+            if self.rc > RC_MAXIMA:
+                print(f"⚠️ Matriz AHP inconsistente: RC = {self.rc:.3f} (máximo recomendado {RC_MAXIMA})")
+        elif pesos is not None:
+            p = np.asarray(pesos, dtype=float)
+            self.pesos = p / p.sum()
+        else:
+            self.pesos = np.full(len(self.criterios), 1.0 / len(self.criterios))
+        if len(self.pesos) != len(self.criterios):
+            raise ValueError("Debe haber un peso por criterio.")
+        self.sentido = np.array([-1.0 if c in minimizar else 1.0 for c in self.criterios])
+
+    def normalizar(self, puntajes) -> np.ndarray:
+        x = np.asarray(puntajes, dtype=float)
+        minimo, maximo = x.min(axis=0), x.max(axis=0)
+        rango = maximo - minimo
+        with np.errstate(divide="ignore", invalid="ignore"):
+            norm = np.where(rango > 0, (x - minimo) / rango, 1.0)
+        return np.where(self.sentido > 0, norm, 1.0 - norm) if (self.sentido < 0).any() else norm
+
+    def evaluar(self, alternativas: Sequence[str], puntajes) -> ResultadoMulticriterio:
+        """puntajes: matriz (alternativas x criterios) o {alternativa: {criterio: valor}}."""
+        if isinstance(puntajes, dict):
+            puntajes = [[puntajes[a][c] for c in self.criterios] for a in alternativas]
+        normalizada = self.normalizar(puntajes)
+        return ResultadoMulticriterio(list(alternativas), self.criterios, self.pesos, normalizada,
+                                      normalizada @ self.pesos, self.rc)
+
+    def aplicar(self, identificacion, puntajes) -> ResultadoMulticriterio:
+        """Evalúa las alternativas de un MgaIdentificacion y marca la seleccionada."""
+        resultado = self.evaluar([a.nombre for a in identificacion.alternativas], puntajes)
+        identificacion.set_evaluacion_multicriterio(resultado)
+        return resultado
@@ -0,0 +1,203 @@
+import os
+import glob
+import time
+import argparse
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+try:
+    from .mga_evaluacion import MgaEvaluacion, calcular_vpn, calcular_tir, calcular_rbc, calcular_cae, calcular_pri
+    from .document_factory import DocumentFactory
+    from .mga_wizard import load_answers
+except ImportError:
+    from mga_evaluacion import MgaEvaluacion, calcular_vpn, calcular_tir, calcular_rbc, calcular_cae, calcular_pri
+    from document_factory import DocumentFactory
+    from mga_wizard import load_answers
+
+TSD_DEFECTO = (0.09, 0.12, 0.15)
+
+@dataclass
+class ProyectoPortafolio:
+    nombre: str
+    entidad: str
+    evaluacion: MgaEvaluacion
+    archivo: str = ""
+
+def proyecto_desde_definicion(definicion: dict, archivo: str = "") -> ProyectoPortafolio:
+    """
+    Crea un proyecto a partir de su definición:
+    {"nombre", "entidad", "tsd", "flujos": [{"periodo", "inversion", "costos_op", "beneficios", "flujo_neto"?}]}
+    Si falta flujo_neto se calcula como inversión + costos + beneficios (costos en negativo).
+    """
+    evaluacion = MgaEvaluacion(tasa_social_descuento=float(definicion.get("tsd", 0.12)))
+    for f in definicion.get("flujos", []):
+        inv, cos, ben = (float(f.get(k, 0) or 0) for k in ("inversion", "costos_op", "beneficios"))
+        neto = f.get("flujo_neto")
+        evaluacion.agregar_flujo_detalle(int(f["periodo"]), inv, cos, ben, inv + cos + ben if neto is None else float(neto))
+    return ProyectoPortafolio(
+        nombre=definicion.get("nombre", os.path.splitext(os.path.basename(archivo))[0] or "Proyecto"),
+        entidad=definicion.get("entidad", ""),
+        evaluacion=evaluacion,
+        archivo=archivo,
+    )
+
+def cargar_definiciones(rutas: Sequence[str]) -> List[ProyectoPortafolio]:
+    """Carga archivos JSON/YAML (o carpetas con ellos); cada archivo puede traer uno o varios proyectos."""
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            for ext in ("*.json", "*.yaml", "*.yml"):
+                archivos.extend(sorted(glob.glob(os.path.join(ruta, ext))))
+        else:
+            archivos.append(ruta)
+    return [proyecto_desde_definicion(d, path) for path in archivos for d in load_answers(path)]
+
+class Portafolio:
+    """
+    Evaluación en lote de muchos proyectos MGA.
+    Los flujos de todos los proyectos se apilan en matrices (proyectos x periodos),
+    rellenadas con ceros hasta el horizonte más largo, y los indicadores se calculan
+    para varias TSD con las funciones vectorizadas de mga_evaluacion.
+    """
+
+    def __init__(self, proyectos: List[ProyectoPortafolio]):
+        self.proyectos = proyectos
+        self._matrices: Optional[Dict[str, np.ndarray]] = None
+
+    def matrices(self) -> Dict[str, np.ndarray]:
+        """Matrices apiladas de flujo neto, beneficios y costos, más el horizonte de cada proyecto."""
+        if self._matrices is None:
+            vectores = [p.evaluacion.matriz_flujos() for p in self.proyectos]
+            periodos = max((len(v["flujo_neto"]) for v in vectores), default=0)
+            neto, beneficios, costos = (np.zeros((len(vectores), periodos)) for _ in range(3))
+            horizonte = np.zeros(len(vectores))
+            for i, v in enumerate(vectores):
+                n = len(v["flujo_neto"])
+                neto[i, :n] = v["flujo_neto"]
+                beneficios[i, :n] = v["beneficios"]
+                costos[i, :n] = np.abs(v["inversion"]) + np.abs(v["costos_op"])
+                horizonte[i] = n - 1
+            self._matrices = {"flujo_neto": neto, "beneficios": beneficios, "costos": costos, "horizonte": horizonte}
+        return self._matrices
+
+    def evaluar(self, tasas: Sequence[float] = TSD_DEFECTO) -> Dict[float, Dict[str, np.ndarray]]:
+        """
+        Indicadores por TSD: {tasa: {vpn, tir, rbc, cae, pri}}.
+        TIR y PRI no dependen de la tasa y se calculan una sola vez.
+        """
+        m = self.matrices()
+        tir = calcular_tir(m["flujo_neto"])
+        pri = calcular_pri(m["flujo_neto"])
+        return {
+            tasa: {
+                "vpn": calcular_vpn(m["flujo_neto"], tasa),
+                "tir": tir,
+                "rbc": calcular_rbc(m["beneficios"], m["costos"], tasa),
+                "cae": calcular_cae(m["costos"], tasa, horizonte=m["horizonte"]),
+                "pri": pri,
+            }
+            for tasa in tasas
+        }
+
+    def ranking(self, tasas: Sequence[float] = TSD_DEFECTO, criterio: str = "vpn") -> pd.DataFrame:
+        """
+        Tabla de resultados con una columna de indicador y de puesto por TSD.
+        Se ordena por el criterio evaluado a la TSD central de la lista.
+        """
+        resultados = self.evaluar(tasas)
+        df = pd.DataFrame({
+            "Proyecto": [p.nombre for p in self.proyectos],
+            "Entidad": [p.entidad for p in self.proyectos],
+        })
+        primera = resultados[tasas[0]]
+        df["TIR"] = primera["tir"]
+        df["PRI (años)"] = primera["pri"]
+        for tasa, res in resultados.items():
+            etiqueta = f"{tasa*100:g}%"
+            df[f"VPN @ {etiqueta}"] = res["vpn"]
+            df[f"B/C @ {etiqueta}"] = res["rbc"]
+            df[f"CAE @ {etiqueta}"] = res["cae"]
+            # Puesto 1 = mejor; los NaN (ej. TIR sin cambio de signo) quedan al final
+            df[f"Puesto @ {etiqueta}"] = (pd.Series(res[criterio]).rank(ascending=False, method="min", na_option="bottom")
+                                          .astype(int).to_numpy())
+        central = f"{tasas[len(tasas) // 2]*100:g}%"
+        return df.sort_values(f"Puesto @ {central}", kind="stable").reset_index(drop=True)
+
+    # --- Salidas ---
+    def render_content(self, tasas: Sequence[float] = TSD_DEFECTO, criterio: str = "vpn", top: int = 50) -> dict:
+        """Contenido para DocumentFactory/ProjectAssembler (resumen para el comité)."""
+        df = self.ranking(tasas, criterio)
+        central = f"{tasas[len(tasas) // 2]*100:g}%"
+        viables = int((df[f"VPN @ {central}"] > 0).sum())
+
+        tabla_ranking = [
+            {
+                "Puesto": int(row[f"Puesto @ {central}"]),
+                "Proyecto": row["Proyecto"],
+                "Entidad": row["Entidad"],
+                f"VPN @ {central}": f"${row[f'VPN @ {central}']:,.0f}",
+                "TIR": "N/D" if np.isnan(row["TIR"]) else f"{row['TIR']*100:,.1f}%",
+                f"B/C @ {central}": "N/D" if np.isnan(row[f"B/C @ {central}"]) else f"{row[f'B/C @ {central}']:,.2f}",
+            }
+            for _, row in df.head(top).iterrows()
+        ]
+        tabla_sensibilidad = [
+            {"Proyecto": row["Proyecto"], **{f"Puesto @ {t*100:g}%": int(row[f"Puesto @ {t*100:g}%"]) for t in tasas}}
+            for _, row in df.head(top).iterrows()
+        ]
+
+        contenido = [
+            {"tipo": "parrafo", "texto": (f"Se evaluaron {len(df)} proyectos bajo TSD de "
+                                          f"{', '.join(f'{t*100:g}%' for t in tasas)}. "
+                                          f"{viables} proyectos presentan VPN positivo a la TSD de {central}.")},
+            {"tipo": "titulo2", "texto": f"Ranking por {criterio.upper()} (TSD {central})"},
+            {"tipo": "tabla", "titulo": "Ranking del Portafolio", "datos": tabla_ranking},
+            {"tipo": "titulo2", "texto": "Estabilidad del Ranking ante la TSD"},
+            {"tipo": "tabla", "titulo": "Puesto por TSD", "datos": tabla_sensibilidad},
+        ]
+        if len(df) > top:
+            contenido.append({"tipo": "parrafo", "texto": f"Se muestran los primeros {top} proyectos; el detalle completo está en el Excel."})
+
+        return {"titulo": "RESUMEN DEL PORTAFOLIO DE PROYECTOS MGA", "cuerpo": contenido}
+
+    def exportar_excel(self, output_path: str, tasas: Sequence[float] = TSD_DEFECTO, criterio: str = "vpn"):
+        df = self.ranking(tasas, criterio)
+        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+            df.to_excel(writer, sheet_name="Ranking", index=False)
+        print(f"Excel del portafolio guardado en: {output_path}")
+
+    def exportar_docx(self, output_path: str, tasas: Sequence[float] = TSD_DEFECTO, criterio: str = "vpn", top: int = 50):
+        factory = DocumentFactory(output_path)
+        factory.procesar_contenido(self.render_content(tasas, criterio, top))
+        factory.guardar()
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluación y ranking de un portafolio de proyectos MGA")
+    parser.add_argument("rutas", nargs="+", help="Archivos JSON/YAML o carpetas con definiciones de proyectos")
+    parser.add_argument("--tsd", nargs="+", type=float, default=list(TSD_DEFECTO), help="Tasas sociales de descuento (ej. 0.09 0.12 0.15)")
+    parser.add_argument("--criterio", choices=["vpn", "rbc", "tir"], default="vpn", help="Indicador para el ranking")
+    parser.add_argument("--output-dir", default=os.path.join(os.path.dirname(__file__), "..", "salida"))
+    parser.add_argument("--top", type=int, default=50, help="Proyectos a listar en el DOCX")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    proyectos = cargar_definiciones(args.rutas)
+    t_carga = time.perf_counter() - t0
+    if not proyectos:
+        print("⚠️ No se encontraron definiciones de proyectos.")
+        return
+
+    portafolio = Portafolio(proyectos)
+    t1 = time.perf_counter()
+    portafolio.evaluar(args.tsd)
+    t_eval = time.perf_counter() - t1
+    print(f"📊 {len(proyectos)} proyectos cargados en {t_carga:.2f} s y evaluados con {len(args.tsd)} TSD en {t_eval:.3f} s")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    portafolio.exportar_excel(os.path.join(args.output_dir, "Portafolio_MGA.xlsx"), args.tsd, args.criterio)
+    portafolio.exportar_docx(os.path.join(args.output_dir, "Portafolio_MGA.docx"), args.tsd, args.criterio, args.top)
+
+if __name__ == "__main__":
+    main()
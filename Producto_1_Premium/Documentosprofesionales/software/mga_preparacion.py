@@ -1,5 +1,14 @@
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import List, Dict, Optional
+import numpy as np
+
+try:
+    from .mga_consistencia import normalizar_etapa
+except ImportError:
+    from mga_consistencia import normalizar_etapa
+
+# Etiqueta de reporte de cada etapa normalizada
+ETIQUETAS_ETAPA = {"inversion": "Inversión", "operacion": "Operación"}
 
 @dataclass
 class DatosMercado:
@@ -43,6 +52,72 @@ class CadenaValor:
     nombre: str
     items: List[CadenaValorItem]
 
+def _codificar(valores) -> tuple:
+    """Códigos enteros por categoría (en orden de aparición) y la lista de etiquetas."""
+    etiquetas: Dict[str, int] = {}
+    codigos = np.fromiter((etiquetas.setdefault(v, len(etiquetas)) for v in valores), dtype=np.int64)
+    return codigos, list(etiquetas)
+
+class CadenaValorColumnar:
+    """
+    Vista columnar de todas las cadenas de valor: un array por campo (cadena, etapa,
+    tipo de insumo, valor, recurrente) y agregados por grupo con np.bincount.
+    """
+
+    def __init__(self, cadenas: List[CadenaValor]):
+        items = [(cv.nombre, it) for cv in cadenas for it in cv.items]
+        self.n = len(items)
+        self.cadena, self.cadenas = _codificar(nombre for nombre, _ in items)
+        # Se normaliza la etapa para que 'Inversion' e 'Inversión' agrupen juntas
+        self.etapa, self.etapas = _codificar(
+            ETIQUETAS_ETAPA.get(normalizar_etapa(it.etapa), it.etapa.strip()) for _, it in items)
+        self.insumo, self.insumos = _codificar(it.tipo_insumo for _, it in items)
+        self.valor = np.fromiter((it.valor for _, it in items), dtype=float, count=self.n)
+        self.recurrente = np.fromiter(("año" in (it.unidad_tiempo or "") for _, it in items), dtype=bool, count=self.n)
+
+    def _totales(self, codigos: np.ndarray, etiquetas: List[str], mascara: Optional[np.ndarray] = None) -> Dict[str, float]:
+        pesos = self.valor if mascara is None else np.where(mascara, self.valor, 0.0)
+        sumas = np.bincount(codigos, weights=pesos, minlength=len(etiquetas))
+        return {e: float(v) for e, v in zip(etiquetas, sumas)}
+
+    def totales_por_etapa(self, recurrente: Optional[bool] = None) -> Dict[str, float]:
+        mascara = None if recurrente is None else (self.recurrente == recurrente)
+        return self._totales(self.etapa, self.etapas, mascara)
+
+    def totales_por_insumo(self, recurrente: Optional[bool] = None) -> Dict[str, float]:
+        mascara = None if recurrente is None else (self.recurrente == recurrente)
+        return self._totales(self.insumo, self.insumos, mascara)
+
+    def totales_por_cadena(self) -> Dict[str, float]:
+        return self._totales(self.cadena, self.cadenas)
+
+    def totales_etapa_insumo(self, recurrente: Optional[bool] = None) -> np.ndarray:
+        """Matriz (etapas x tipos de insumo) de valores; `recurrente` filtra únicos (False) o '/año' (True)."""
+        combinado = self.etapa * len(self.insumos) + self.insumo
+        pesos = self.valor if recurrente is None else np.where(self.recurrente == recurrente, self.valor, 0.0)
+        sumas = np.bincount(combinado, weights=pesos, minlength=len(self.etapas) * len(self.insumos))
+        return sumas.reshape(len(self.etapas), len(self.insumos))
+
+    def proyectar(self, horizonte: int, anio_inicio_operacion: int = 1, crecimiento: float = 0.0) -> Dict[str, np.ndarray]:
+        """
+        Proyección anual (años 0..horizonte) por etapa. Los ítems únicos de inversión van
+        al año 0 y los de operación al año de inicio de operación; los ítems '/año' se
+        repiten cada año desde ese inicio (inversión recurrente desde el año 0), con
+        crecimiento anual opcional.
+        """
+        anios = np.arange(horizonte + 1)
+        proyeccion = {}
+        for k, etapa in enumerate(self.etapas):
+            en_etapa = self.etapa == k
+            unico = float(self.valor[en_etapa & ~self.recurrente].sum())
+            anual = float(self.valor[en_etapa & self.recurrente].sum())
+            inicio = 0 if etapa == "Inversión" else anio_inicio_operacion
+            serie = np.where(anios >= inicio, anual * (1.0 + crecimiento) ** np.maximum(anios - inicio, 0), 0.0)
+            if inicio <= horizonte:
+                serie[inicio] += unico
+            proyeccion[etapa] = serie
+        return proyeccion
+
 @dataclass
 class Riesgo:
     nivel: str
@@ -75,6 +150,10 @@ class MgaPreparacion:
     def agregar_producto_mercado(self, prod: ProductoMercado):
         self.productos_mercado.append(prod)
 
+    def agregar_proyeccion_mercado(self, proyector, anios, incluir_historico: bool = True):
+        """Agrega los productos proyectados por un ProyectorMercado (mga_mercado)."""
+        self.productos_mercado.extend(proyector.a_productos_mercado(anios, incluir_historico))
+
     def agregar_especificacion(self, espec: EspecificacionTecnica):
         self.especificaciones.append(espec)
 
@@ -90,6 +169,13 @@ class MgaPreparacion:
     def agregar_beneficio(self, ben: Beneficio):
         self.beneficios.append(ben)
 
+    def cadena_valor_columnar(self) -> CadenaValorColumnar:
+        return CadenaValorColumnar(self.cadenas_valor)
+
+    def proyeccion_cadena_valor(self, horizonte: int, anio_inicio_operacion: int = 1, crecimiento: float = 0.0) -> Dict[str, np.ndarray]:
+        """Proyección por etapa para MgaEvaluacion.set_flujos_desde_proyeccion."""
+        return self.cadena_valor_columnar().proyectar(horizonte, anio_inicio_operacion, crecimiento)
+
     def render_content(self) -> dict:
         contenido = []
         
@@ -131,6 +217,28 @@ class MgaPreparacion:
             ]
             contenido.append({"tipo": "tabla", "titulo": f"Cadena: {cv.nombre}", "datos": datos_cv})
 
+        if self.cadenas_valor:
+            col = self.cadena_valor_columnar()
+            unicos = col.totales_por_etapa(recurrente=False)
+            anuales = col.totales_por_etapa(recurrente=True)
+            datos_etapa = [
+                {"Etapa": e, "Valor Único (MM)": f"${unicos[e]:,.0f}", "Valor Anual (MM)": f"${anuales[e]:,.0f}/año"}
+                for e in col.etapas
+            ]
+            contenido.append({"tipo": "tabla", "titulo": "Totales por Etapa", "datos": datos_etapa})
+            # Valores únicos y anuales por separado (sumarlos no tiene sentido)
+            for recurrente, titulo, sufijo in ((False, "Totales por Tipo de Insumo (Valor Único)", ""),
+                                               (True, "Totales por Tipo de Insumo (Valor Anual)", "/año")):
+                if not (col.recurrente == recurrente).any():
+                    continue
+                matriz = col.totales_etapa_insumo(recurrente=recurrente)
+                datos_insumo = [
+                    {"Tipo de Insumo": ins, **{e: f"${matriz[k, j]:,.0f}{sufijo}" for k, e in enumerate(col.etapas)},
+                     "Total": f"${matriz[:, j].sum():,.0f}{sufijo}"}
+                    for j, ins in enumerate(col.insumos) if matriz[:, j].any()
+                ]
+                contenido.append({"tipo": "tabla", "titulo": titulo, "datos": datos_insumo})
+
         # Cap 5: Riesgos
         contenido.append({"tipo": "titulo2", "texto": "Capítulo 5: Riesgos"})
         datos_riesgos = [
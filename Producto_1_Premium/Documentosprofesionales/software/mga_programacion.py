@@ -44,6 +44,7 @@ class MgaProgramacion:
         self.resumen_ejecutivo: List[ResumenEjecutivo] = []
         self.cierre_financiero: Dict[str, str] = {}
         self.firma_responsable: Dict[str, str] = {}
+        self.programador = None # ProgramadorRutaCritica (mga_cronograma), opcional
 
     def agregar_indicador_producto(self, ind: Indicador):
         self.indicadores_producto.append(ind)
@@ -57,6 +58,15 @@ class MgaProgramacion:
     def agregar_actividad_cronograma(self, act: CronogramaActividad):
         self.cronograma.append(act)
 
+    def set_programador(self, programador):
+        """
+        Usa un ProgramadorRutaCritica como fuente del cronograma: calcula la ruta crítica
+        y reemplaza las filas del cronograma por las derivadas de duraciones y dependencias.
+        """
+        programador.calcular()
+        self.programador = programador
+        self.cronograma = programador.a_cronograma()
+
     def agregar_supuesto(self, supuesto: str):
         self.supuestos.append(supuesto)
         
@@ -108,6 +118,12 @@ class MgaProgramacion:
             for c in self.cronograma
         ]
         contenido.append({"tipo": "tabla", "titulo": "Cronograma de Ejecución", "datos": datos_crono})
+
+        if self.programador is not None:
+            criticas = self.programador.ruta_critica()
+            contenido.append({"tipo": "parrafo", "texto": f"Duración total del proyecto: {self.programador.duracion_total:g} meses. "
+                                                          f"Actividades en ruta crítica: {len(criticas)}."})
+            contenido.append({"tipo": "tabla", "titulo": "Programación por Ruta Crítica", "datos": self.programador.tabla_programacion()})
         
         datos_resumen = [{"Item": r.item, "Descripción": r.descripcion} for r in self.resumen_ejecutivo]
         contenido.append({"tipo": "tabla", "titulo": "Resumen Ejecutivo", "datos": datos_resumen})
@@ -0,0 +1,188 @@
+import os
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    from .mga_evaluacion import MgaEvaluacion, calcular_vpn, calcular_tir
+except ImportError:
+    from mga_evaluacion import MgaEvaluacion, calcular_vpn, calcular_tir
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+@dataclass
+class Distribucion:
+    """
+    Distribución de una variable incierta.
+    tipo: 'normal' (media, desv), 'triangular' (min, moda, max), 'uniforme' (min, max),
+          'lognormal' (mu, sigma del log) o 'fija' (valor).
+    Para inversión, costos y beneficios el valor es un factor multiplicativo sobre el
+    flujo base (1.0 = sin cambio). Para la TSD es la tasa misma (ej. 0.12).
+    """
+    tipo: str
+    parametros: Tuple[float, ...]
+
+    def muestrear(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        p = self.parametros
+        if self.tipo == "normal":
+            return rng.normal(p[0], p[1], n)
+        if self.tipo == "triangular":
+            return rng.triangular(p[0], p[1], p[2], n)
+        if self.tipo == "uniforme":
+            return rng.uniform(p[0], p[1], n)
+        if self.tipo == "lognormal":
+            return rng.lognormal(p[0], p[1], n)
+        if self.tipo == "fija":
+            return np.full(n, float(p[0]))
+        raise ValueError(f"Tipo de distribución no soportado: {self.tipo}")
+
+    def percentil(self, q: float, n: int = 20000) -> float:
+        """Percentil (0-100) estimado con una muestra fija (reproducible)."""
+        return float(np.percentile(self.muestrear(np.random.default_rng(0), n), q))
+
+@dataclass
+class ResultadoSimulacion:
+    escenarios: int
+    tsd_base: float
+    vpn: np.ndarray
+    tir: np.ndarray
+    tornado: List[Dict[str, float]] = field(default_factory=list)
+
+    @property
+    def prob_vpn_negativo(self) -> float:
+        return float(np.mean(self.vpn < 0))
+
+    def percentiles(self) -> Dict[int, Tuple[float, float]]:
+        """Percentil -> (VPN, TIR). La TIR ignora escenarios sin cambio de signo."""
+        vpn_p = np.percentile(self.vpn, PERCENTILES)
+        tir_validas = self.tir[~np.isnan(self.tir)]
+        tir_p = np.percentile(tir_validas, PERCENTILES) if tir_validas.size else np.full(len(PERCENTILES), np.nan)
+        return {q: (float(v), float(t)) for q, v, t in zip(PERCENTILES, vpn_p, tir_p)}
+
+    def tablas(self) -> List[dict]:
+        """Bloques `tabla` listos para MgaEvaluacion.render_content."""
+        datos_percentiles = [
+            {"Percentil": f"P{q}", "VPN": f"${v:,.0f}", "TIR": "N/D" if np.isnan(t) else f"{t*100:,.1f}%"}
+            for q, (v, t) in self.percentiles().items()
+        ]
+        datos_riesgo = [{
+            "Escenarios": f"{self.escenarios:,}",
+            "VPN Medio": f"${float(np.mean(self.vpn)):,.0f}",
+            "Desv. Estándar": f"${float(np.std(self.vpn)):,.0f}",
+            "Prob. VPN < 0": f"{self.prob_vpn_negativo*100:.1f}%",
+        }]
+        bloques = [
+            {"tipo": "tabla", "titulo": "Distribución de VPN y TIR (Monte Carlo)", "datos": datos_percentiles},
+            {"tipo": "tabla", "titulo": "Riesgo del VPN", "datos": datos_riesgo},
+        ]
+        if self.tornado:
+            datos_tornado = [
+                {"Variable": t["variable"], "VPN (P10)": f"${t['vpn_bajo']:,.0f}",
+                 "VPN (P90)": f"${t['vpn_alto']:,.0f}", "Rango": f"${t['rango']:,.0f}"}
+                for t in self.tornado
+            ]
+            bloques.append({"tipo": "tabla", "titulo": "Sensibilidad del VPN (Diagrama Tornado)", "datos": datos_tornado})
+        return bloques
+
+def _simular_bloque(args) -> Tuple[np.ndarray, np.ndarray]:
+    """Worker de proceso: evalúa un bloque de escenarios con su propia semilla."""
+    simulador, n, semilla = args
+    return simulador._evaluar_escenarios(simulador._muestrear(np.random.default_rng(semilla), n))
+
+class SimuladorMonteCarlo:
+    """
+    Simulación Monte Carlo y sensibilidad sobre MgaEvaluacion.flujos_detalle.
+    Cada escenario escala los vectores base de inversión, costos y beneficios por un
+    factor y descuenta con su propia TSD; todo se evalúa como operaciones de matriz
+    (escenarios x periodos), en bloques para acotar la memoria.
+    """
+
+    VARIABLES = ("inversion", "costos_op", "beneficios", "tsd")
+    ETIQUETAS = {"inversion": "Inversión", "costos_op": "Costos de Operación",
+                 "beneficios": "Beneficios", "tsd": "Tasa Social de Descuento"}
+
+    def __init__(self, evaluacion: MgaEvaluacion,
+                 inversion: Optional[Distribucion] = None,
+                 costos_op: Optional[Distribucion] = None,
+                 beneficios: Optional[Distribucion] = None,
+                 tsd: Optional[Distribucion] = None,
+                 semilla: Optional[int] = None):
+        base = evaluacion.matriz_flujos()
+        # Costos e inversión en valor absoluto, como en MgaEvaluacion.calcular_indicadores:
+        # da igual si se registraron con signo negativo o como montos positivos
+        self.base = {"inversion": np.abs(base["inversion"]), "costos_op": np.abs(base["costos_op"]),
+                     "beneficios": base["beneficios"]}
+        self.tsd_base = evaluacion.tsd
+        self.distribuciones = {"inversion": inversion, "costos_op": costos_op,
+                               "beneficios": beneficios, "tsd": tsd}
+        self.semilla = semilla
+
+    def _muestrear(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        muestras = {}
+        for var in self.VARIABLES:
+            dist = self.distribuciones[var]
+            neutro = self.tsd_base if var == "tsd" else 1.0
+            muestras[var] = dist.muestrear(rng, n) if dist is not None else np.full(n, neutro)
+        return muestras
+
+    def _flujos(self, muestras: Dict[str, np.ndarray]) -> np.ndarray:
+        return (muestras["beneficios"][:, None] * self.base["beneficios"]
+                - muestras["costos_op"][:, None] * self.base["costos_op"]
+                - muestras["inversion"][:, None] * self.base["inversion"])
+
+    def _evaluar_escenarios(self, muestras: Dict[str, np.ndarray], bloque: int = 20000) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(muestras["tsd"])
+        vpn, tir = np.empty(n), np.empty(n)
+        for i in range(0, n, bloque):
+            parte = {k: v[i:i + bloque] for k, v in muestras.items()}
+            flujos = self._flujos(parte)
+            vpn[i:i + bloque] = calcular_vpn(flujos, parte["tsd"])
+            tir[i:i + bloque] = calcular_tir(flujos)
+        return vpn, tir
+
+    def simular(self, escenarios: int = 100_000, procesos: Optional[int] = None,
+                umbral_paralelo: int = 200_000, con_tornado: bool = True) -> ResultadoSimulacion:
+        """
+        Ejecuta la simulación. Por encima de `umbral_paralelo` escenarios se reparte en
+        `procesos` (por defecto, núcleos disponibles) con semillas independientes.
+        """
+        semillas = np.random.SeedSequence(self.semilla)
+        procesos = procesos or os.cpu_count() or 1
+        if escenarios >= umbral_paralelo and procesos > 1:
+            tamanos = [len(c) for c in np.array_split(np.arange(escenarios), procesos)]
+            tareas = [(self, n, s) for n, s in zip(tamanos, semillas.spawn(procesos))]
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                partes = list(pool.map(_simular_bloque, tareas))
+            vpn = np.concatenate([p[0] for p in partes])
+            tir = np.concatenate([p[1] for p in partes])
+        else:
+            vpn, tir = _simular_bloque((self, escenarios, semillas))
+
+        return ResultadoSimulacion(
+            escenarios=escenarios, tsd_base=self.tsd_base, vpn=vpn, tir=tir,
+            tornado=self.tornado() if con_tornado else []
+        )
+
+    def tornado(self, q_bajo: float = 10, q_alto: float = 90) -> List[Dict[str, float]]:
+        """
+        Sensibilidad una-a-la-vez: cada variable en su P10 y P90 con las demás en su
+        valor base. Ordenado de mayor a menor rango de VPN.
+        """
+        variables = [v for v in self.VARIABLES if self.distribuciones[v] is not None]
+        if not variables:
+            return []
+        # 2 escenarios por variable, evaluados en una sola matriz
+        muestras = {v: np.full(2 * len(variables), self.tsd_base if v == "tsd" else 1.0) for v in self.VARIABLES}
+        for i, var in enumerate(variables):
+            dist = self.distribuciones[var]
+            muestras[var][2 * i] = dist.percentil(q_bajo)
+            muestras[var][2 * i + 1] = dist.percentil(q_alto)
+        vpn = calcular_vpn(self._flujos(muestras), muestras["tsd"])
+
+        resultado = [
+            {"variable": self.ETIQUETAS[var], "vpn_bajo": float(vpn[2 * i]), "vpn_alto": float(vpn[2 * i + 1]),
+             "rango": float(abs(vpn[2 * i + 1] - vpn[2 * i]))}
+            for i, var in enumerate(variables)
+        ]
+        return sorted(resultado, key=lambda t: t["rango"], reverse=True)
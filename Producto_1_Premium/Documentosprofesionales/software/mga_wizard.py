@@ -1,5 +1,8 @@
 import os
 import sys
+import json
+import time
+import argparse
 
 # Ajuste de path para importar módulos hermanos
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -56,8 +59,11 @@ class MGAWizard:
         pob = self.ask("Población Objetivo (ej. 500 Familias)")
         ubic = self.ask("Ubicación Principal (Municipio/Depto)")
         obj_gen = self.ask("Objetivo General del Proyecto")
-        
-        section = {
+        self.data["sections"].append(self.identification_section(prob, pob, ubic, obj_gen))
+
+    @staticmethod
+    def identification_section(prob, pob, ubic, obj_gen):
+        return {
             "title": "Identificación y Objetivos",
             "level": 1,
             "blocks": [
@@ -69,7 +75,6 @@ class MGAWizard:
                 ]}
             ]
         }
-        self.data["sections"].append(section)
 
     def collect_technical(self):
         self.header("PASO 3: ESTUDIO TÉCNICO")
@@ -83,8 +88,11 @@ class MGAWizard:
             if not k: break
             v = self.ask("  > Valor/Detalle (ej. 10 años)")
             items.append({"key": k, "value": v})
-            
-        section = {
+        self.data["sections"].append(self.technical_section(desc, items))
+
+    @staticmethod
+    def technical_section(desc, items):
+        return {
             "title": "Aspectos Técnicos",
             "level": 1,
             "blocks": [
@@ -92,7 +100,6 @@ class MGAWizard:
                 {"type": "kv_list", "kv_content": items}
             ]
         }
-        self.data["sections"].append(section)
 
     def collect_financial(self):
         self.header("PASO 4: PRESUPUESTO")
@@ -106,19 +113,22 @@ class MGAWizard:
             rows.append([concept, val])
         
         if rows:
-            section = {
-                "title": "Presupuesto Estimado",
-                "level": 1,
-                "blocks": [
-                    {"type": "texto", "text_content": "A continuación se detalla la estructura de costos directos del proyecto:"},
-                    {"type": "tabla", "table_content": {
-                        "headers": ["Concepto", "Valor"],
-                        "rows": rows,
-                        "caption": "Tabla 1. Presupuesto General"
-                    }}
-                ]
-            }
-            self.data["sections"].append(section)
+            self.data["sections"].append(self.financial_section(rows))
+
+    @staticmethod
+    def financial_section(rows):
+        return {
+            "title": "Presupuesto Estimado",
+            "level": 1,
+            "blocks": [
+                {"type": "texto", "text_content": "A continuación se detalla la estructura de costos directos del proyecto:"},
+                {"type": "tabla", "table_content": {
+                    "headers": ["Concepto", "Valor"],
+                    "rows": rows,
+                    "caption": "Tabla 1. Presupuesto General"
+                }}
+            ]
+        }
 
     def collect_risks(self):
         self.header("PASO 5: MATRIZ DE RIESGOS")
@@ -132,39 +142,79 @@ class MGAWizard:
             rows.append([r, prob, mit])
             
         if rows:
-            section = {
-                "title": "Análisis de Riesgos",
-                "level": 1,
-                "blocks": [
-                    {"type": "texto", "text_content": "Se presentan los riesgos previsibles y sus estrategias de manejo:"},
-                    {"type": "tabla", "table_content": {
-                        "headers": ["Riesgo", "Probabilidad", "Mitigación"],
-                        "rows": rows,
-                        "caption": "Tabla 2. Matriz de Riesgos"
-                    }}
-                ]
-            }
-            self.data["sections"].append(section)
-
-    def generate(self):
+            self.data["sections"].append(self.risks_section(rows))
+
+    @staticmethod
+    def risks_section(rows):
+        return {
+            "title": "Análisis de Riesgos",
+            "level": 1,
+            "blocks": [
+                {"type": "texto", "text_content": "Se presentan los riesgos previsibles y sus estrategias de manejo:"},
+                {"type": "tabla", "table_content": {
+                    "headers": ["Riesgo", "Probabilidad", "Mitigación"],
+                    "rows": rows,
+                    "caption": "Tabla 2. Matriz de Riesgos"
+                }}
+            ]
+        }
+
+    # --- MODO HEADLESS (REPLAY) ---
+    @classmethod
+    def from_answers(cls, answers: dict):
+        """
+        Construye el wizard desde un dict de respuestas, sin input():
+        {"project_title", "entidad", "identificacion": {problema, poblacion, ubicacion, objetivo},
+         "tecnica": {descripcion, especificaciones: [{key, value}]},
+         "presupuesto": [{concepto, valor}], "riesgos": [{riesgo, probabilidad, mitigacion}]}
+        Genera la misma estructura self.data["sections"] que el modo interactivo.
+        Las secciones ausentes o en null se tratan como vacías.
+        """
+        wizard = cls()
+        wizard.data["project_title"] = str(answers.get("project_title") or "").strip()
+        wizard.data["entidad"] = str(answers.get("entidad") or "").strip()
+
+        ident = answers.get("identificacion") or {}
+        wizard.data["sections"].append(wizard.identification_section(
+            ident.get("problema", ""), ident.get("poblacion", ""), ident.get("ubicacion", ""), ident.get("objetivo", "")
+        ))
+
+        tec = answers.get("tecnica") or {}
+        items = [{"key": i.get("key", ""), "value": i.get("value", "")} for i in tec.get("especificaciones") or [] if i.get("key")]
+        wizard.data["sections"].append(wizard.technical_section(tec.get("descripcion", ""), items))
+
+        rows = [[r.get("concepto", ""), str(r.get("valor", ""))] for r in answers.get("presupuesto") or [] if r.get("concepto")]
+        if rows:
+            wizard.data["sections"].append(wizard.financial_section(rows))
+
+        rows = [[r.get("riesgo", ""), r.get("probabilidad", ""), r.get("mitigacion", "")]
+                for r in answers.get("riesgos") or [] if r.get("riesgo")]
+        if rows:
+            wizard.data["sections"].append(wizard.risks_section(rows))
+        return wizard
+
+    def output_name(self):
+        safe_title = self.data.get('project_title', 'Proyecto').replace(' ', '_')[:30]
+        if not safe_title: safe_title = "Sin_Titulo"
+        return f"{safe_title}_MGA_Wizard.docx"
+
+    def generate(self, output_path=None, template=None):
         print("\n" + "-"*50)
         print("Generando documento final...")
         try:
-            safe_title = self.data.get('project_title', 'Proyecto').replace(' ', '_')[:30]
-            if not safe_title: safe_title = "Sin_Titulo"
+            if output_path is None:
+                output_path = os.path.join(os.path.dirname(__file__), "..", "salida", self.output_name())
             
-            output_name = f"{safe_title}_MGA_Wizard.docx"
-            output_path = os.path.join(os.path.dirname(__file__), "..", "salida", output_name)
-            
-            # Instanciar Builder en modo MGA
-            builder = CITESReportBuilder(output_path, style_mode="MGA")
+            # Instanciar Builder en modo MGA (plantilla precalentada si se provee)
+            builder = CITESReportBuilder(output_path, style_mode="MGA", template=template)
             
             # Construir Portada
             builder.doc.add_heading(self.data['project_title'], 0).alignment = WD_ALIGN_PARAGRAPH.CENTER
             
             p = builder.doc.add_paragraph(self.data.get('entidad', ''))
             p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p.runs[0].bold = True
+            for run in p.runs: # sin entidad el párrafo no tiene runs
+                run.bold = True
             
             builder.doc.add_page_break()
             
@@ -184,15 +234,95 @@ class MGAWizard:
             builder.save()
             print(f"✅ DOCUMENTO CREADO EXITOSAMENTE:")
             print(f"   {output_path}")
+            return output_path
             
         except Exception as e:
             print(f"❌ Error generando documento: {e}")
             import traceback
             traceback.print_exc()
+            return None
+
+def load_answers(path):
+    """Lee respuestas desde JSON o YAML. El archivo puede tener un proyecto o una lista."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML no está instalado. Instalelo con 'pip install pyyaml' o use JSON.")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+def run_replay(paths, output_dir=None):
+    """
+    Genera en un solo proceso todos los proyectos de los archivos de respuestas,
+    reutilizando una plantilla de estilos precalentada. Imprime un reporte de throughput.
+    """
+    output_dir = output_dir or os.path.join(os.path.dirname(__file__), "..", "salida")
+    os.makedirs(output_dir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    # Un archivo ilegible o un proyecto mal formado se cuenta como fallido sin detener el lote
+    projects, bad_files = [], 0
+    for path in paths:
+        try:
+            projects.extend(load_answers(path))
+        except Exception as e:
+            print(f"❌ No se pudo leer {path}: {e}")
+            bad_files += 1
+    template = CITESReportBuilder.build_template(style_mode="MGA")
+    t_load = time.perf_counter() - t0
+
+    generated, failed, used_names = [], 0, set()
+    t1 = time.perf_counter()
+    for answers in projects:
+        try:
+            wizard = MGAWizard.from_answers(answers)
+        except Exception as e:
+            print(f"❌ Respuestas inválidas ({type(e).__name__}: {e}); se omite el proyecto.")
+            failed += 1
+            continue
+        name = wizard.output_name()
+        # Evitar sobrescribir proyectos con el mismo título
+        base, n = name[:-5], 2
+        while name in used_names:
+            name = f"{base}_{n}.docx"
+            n += 1
+        used_names.add(name)
+        path = wizard.generate(os.path.join(output_dir, name), template=template)
+        if path:
+            generated.append(path)
+        else:
+            failed += 1
+    t_render = time.perf_counter() - t1
+
+    print(f"\n{'='*50}")
+    print(" REPORTE DE THROUGHPUT (REPLAY)")
+    print(f"{'='*50}")
+    print(f"Proyectos leídos:     {len(projects)} (de {len(paths)} archivo(s))")
+    print(f"Generados / Fallidos: {len(generated)} / {failed}")
+    if bad_files:
+        print(f"Archivos ilegibles:   {bad_files}")
+    print(f"Carga + plantilla:    {t_load:.3f} s")
+    print(f"Renderizado:          {t_render:.3f} s")
+    if projects and t_render > 0:
+        print(f"Throughput:           {len(projects) / t_render:.1f} proyectos/s ({t_render / len(projects) * 1000:.1f} ms/proyecto)")
+    return generated
 
 if __name__ == "__main__":
-    try:
-        wizard = MGAWizard()
-        wizard.run()
-    except KeyboardInterrupt:
-        print("\n\nOperación cancelada por el usuario.")
+    parser = argparse.ArgumentParser(description="Generador de Proyectos MGA (CLI)")
+    parser.add_argument("--replay", nargs="+", metavar="ARCHIVO",
+                        help="Modo no interactivo: archivos JSON/YAML con las respuestas (un proyecto o una lista)")
+    parser.add_argument("--output-dir", help="Carpeta de salida para el modo replay (por defecto: salida/)")
+    args = parser.parse_args()
+
+    if args.replay:
+        run_replay(args.replay, args.output_dir)
+    else:
+        try:
+            wizard = MGAWizard()
+            wizard.run()
+        except KeyboardInterrupt:
+            print("\n\nOperación cancelada por el usuario.")
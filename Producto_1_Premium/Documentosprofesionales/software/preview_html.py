@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import hashlib
+from datetime import date
+from html import escape
+from typing import Dict, List, Tuple
+
+# Ajuste de path para importar módulos hermanos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.schemas import FullDocumentSchema
+from software.cites_builder import format_numbered_heading, strip_manual_numbering
+from software.financial_engine import BudgetManager
+
+# Estilo visual equivalente a CITESReportBuilder._setup_styles (Arial 11, títulos negros)
+PREVIEW_CSS = """
+<style>
+  .mga-doc { font-family: Arial, sans-serif; font-size: 11pt; color: #000; background: #fff;
+             padding: 24px 48px; max-width: 820px; margin: auto; }
+  .mga-doc h1.portada { text-align: center; font-size: 20pt; }
+  .mga-doc p.portada { text-align: center; }
+  .mga-doc h1 { font-size: 14pt; margin: 12pt 0 6pt; }
+  .mga-doc h2 { font-size: 12pt; margin: 10pt 0 3pt; }
+  .mga-doc h3 { font-size: 11pt; margin: 8pt 0 3pt; }
+  .mga-doc table { border-collapse: collapse; width: 100%; margin: 6pt 0; font-size: 10pt; }
+  .mga-doc th, .mga-doc td { border: 1px solid #000; padding: 2px 6px; text-align: left; }
+  .mga-doc th { font-weight: bold; }
+  .mga-doc .caption { font-style: italic; font-size: 9pt; }
+  .mga-doc blockquote { margin-left: 0.5in; font-style: italic; }
+  .mga-doc hr.page { border: none; border-top: 1px dashed #999; margin: 24px 0; }
+</style>
+"""
+
+
+def _digest(obj) -> str:
+    raw = json.dumps(obj, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _html_table(headers, rows, caption=None) -> str:
+    parts = ["<table><tr>"]
+    parts.extend(f"<th>{escape(str(h))}</th>" for h in headers)
+    parts.append("</tr>")
+    cols = len(headers)
+    for row in rows:
+        # Mismo relleno de celdas que CITESReportBuilder.create_table
+        safe_row = list(row) + [''] * (cols - len(row))
+        parts.append("<tr>" + "".join(f"<td>{escape(str(c))}</td>" for c in safe_row[:cols]) + "</tr>")
+    parts.append("</table>")
+    if caption:
+        parts.append(f'<p class="caption">{escape(caption)}</p>')
+    return "".join(parts)
+
+
+def _html_kv(key, value) -> str:
+    return f"<p><b>{escape(str(key))}:</b> {escape(str(value))}</p>"
+
+
+class HTMLPreviewRenderer:
+    """
+    Vista previa HTML liviana del documento MGA (sin python-docx).
+
+    Usa la misma numeración que CITESReportBuilder.add_numbered_heading. El documento
+    se divide en secciones; cada una se cachea por (contenido, estado de contadores al
+    inicio), de modo que entre reruns solo se re-renderizan las secciones que cambiaron.
+    """
+
+    def __init__(self, max_cache: int = 512):
+        self._cache: Dict[Tuple, str] = {}
+        self.max_cache = max_cache
+        self.last_rerendered: List[str] = []
+
+    def _cached(self, key: Tuple, name: str, builder) -> str:
+        html = self._cache.get(key)
+        if html is None:
+            html = builder()
+            if len(self._cache) >= self.max_cache:
+                self._cache.clear()
+            self._cache[key] = html
+            self.last_rerendered.append(name)
+        return html
+
+    @staticmethod
+    def _wrap(body: str) -> str:
+        return f'{PREVIEW_CSS}<div class="mga-doc">{body}</div>'
+
+    # --- project_data del wizard (misma estructura que generate_document) ---
+    def render_project(self, project_data: dict) -> str:
+        self.last_rerendered = []
+        counters = {"h1": 0, "h2": 0, "h3": 0}
+        sections = project_data.get("sections", {})
+        parts = []
+
+        hoy = str(date.today())
+
+        def portada():
+            return (f'<h1 class="portada">{escape(project_data.get("title", ""))}</h1>'
+                    f'<p class="portada"><b>{escape(project_data.get("entity", ""))}</b></p>'
+                    f'<p class="portada">Fecha: {hoy}</p>'
+                    '<hr class="page">')
+        meta = (project_data.get("title", ""), project_data.get("entity", ""), hoy)
+        parts.append(self._cached(("portada", meta), "portada", portada))
+
+        for name, title, renderer in self._project_sections(sections):
+            start = tuple(counters.values())
+            heading = format_numbered_heading(counters, title, 1)
+            key = (name, start, _digest(sections.get(name)))
+            parts.append(self._cached(key, name, lambda: f"<h1>{escape(heading)}</h1>" + renderer()))
+
+        return self._wrap("".join(parts))
+
+    @staticmethod
+    def _project_sections(sections: dict):
+        """Secciones presentes, en el orden y con los títulos del DOCX del wizard."""
+        sec_id = sections.get("identificacion", {}) or {}
+
+        def identificacion():
+            return (f"<p>Problema Central: {escape(str(sec_id.get('problema', '')))}</p>"
+                    f"<p>Objetivo General: {escape(str(sec_id.get('objetivo', '')))}</p>"
+                    + _html_kv("Población Objetivo", sec_id.get('poblacion', ''))
+                    + _html_kv("Ubicación", sec_id.get('ubicacion', '')))
+        yield "identificacion", "Identificación y Objetivos", identificacion
+
+        sec_tec = sections.get("tecnica", {}) or {}
+
+        def tecnica():
+            html = f"<p>{escape(str(sec_tec.get('descripcion', '')))}</p>"
+            specs = sec_tec.get('especificaciones', [])
+            if specs:
+                rows = [[item.get("Característica", ""), item.get("Detalle", "")] for item in specs]
+                html += _html_table(["Característica", "Detalle"], rows, "Especificaciones Técnicas")
+            return html
+        yield "tecnica", "Aspectos Técnicos", tecnica
+
+        def tabla_registros(records, caption):
+            headers = list(records[0].keys())
+            rows = [list(item.values()) for item in records]
+            return _html_table(headers, rows, caption)
+
+        cronograma = sections.get("cronograma") or []
+        if cronograma:
+            yield "cronograma", "Cronograma de Ejecución", lambda: tabla_registros(cronograma, "Cronograma General")
+
+        presupuesto = sections.get("presupuesto") or []
+        if presupuesto:
+            def resumen():
+                # Misma tabla resumen que el DOCX (el detalle va en el anexo Excel)
+                try:
+                    summary_table = BudgetManager(presupuesto).get_summary_table_for_doc()
+                except Exception:
+                    return "<p>Ver detalle en anexo Excel.</p>"
+                return tabla_registros(summary_table, "Tabla Resumen de Costos (Ver Anexo Excel)") if summary_table else ""
+            yield "presupuesto", "Presupuesto Resumido", resumen
+
+        riesgos = sections.get("riesgos") or []
+        if riesgos:
+            yield "riesgos", "Matriz de Riesgos", lambda: tabla_registros(riesgos, "Matriz de Riesgos")
+
+    # --- FullDocumentSchema (misma lógica que build_from_schema) ---
+    def render_schema(self, schema: FullDocumentSchema) -> str:
+        self.last_rerendered = []
+        counters = {"h1": 0, "h2": 0, "h3": 0}
+        parts = []
+
+        meta = schema.metadata
+        parts.append(self._cached(
+            ("portada", meta.title, meta.institution, meta.date), "portada",
+            lambda: (f'<h1 class="portada">{escape(meta.title.upper())}</h1>'
+                     f'<p class="portada">{escape(meta.institution)} - {escape(meta.date)}</p>'
+                     '<hr class="page">')
+        ))
+
+        # Secciones: cada titulo1 abre una nueva
+        chunks: List[list] = [[]]
+        for block in schema.content:
+            if block.role == "titulo1" and chunks[-1]:
+                chunks.append([])
+            chunks[-1].append(block)
+
+        for idx, chunk in enumerate(chunks):
+            if not chunk:
+                continue
+            start = tuple(counters.values())
+            # Los contadores deben avanzar aunque la sección venga de la caché
+            local = dict(counters)
+            headings = []
+            for block in chunk:
+                if block.role in ("titulo1", "titulo2"):
+                    level = 1 if block.role == "titulo1" else 2
+                    headings.append(format_numbered_heading(local, strip_manual_numbering(block.content, level), level))
+            key = ("schema", start, _digest([b.model_dump() for b in chunk]))
+            parts.append(self._cached(key, f"seccion_{idx}", lambda: self._render_blocks(chunk, iter(headings))))
+            counters.update(local)
+
+        return self._wrap("".join(parts))
+
+    @staticmethod
+    def _render_blocks(blocks, headings) -> str:
+        parts = []
+        in_list = False
+        for block in blocks:
+            if block.role != "lista_item" and in_list:
+                parts.append("</ul>")
+                in_list = False
+
+            if block.role == "titulo1":
+                parts.append(f"<h1>{escape(next(headings))}</h1>")
+            elif block.role == "titulo2":
+                parts.append(f"<h2>{escape(next(headings))}</h2>")
+            elif block.role == "tabla":
+                table = block.content
+                parts.append(_html_table(table.headers, [row.cells for row in table.rows]))
+            elif block.role == "lista_item":
+                if not in_list:
+                    parts.append("<ul>")
+                    in_list = True
+                parts.append(f"<li>{escape(block.content)}</li>")
+            elif block.role == "cita_larga":
+                parts.append(f"<blockquote>{escape(block.content)}</blockquote>")
+            elif block.role == "cuerpo":
+                # Misma heurística Key-Value que build_from_schema
+                text = str(block.content)
+                if ":" in text and len(text.split(":")[0]) < 30:
+                    key, value = text.split(":", 1)
+                    parts.append(_html_kv(key, value.strip()))
+                else:
+                    parts.append(f"<p>{escape(text)}</p>")
+            else:
+                parts.append(f"<p>{escape(str(block.content))}</p>")
+        if in_list:
+            parts.append("</ul>")
+        return "".join(parts)
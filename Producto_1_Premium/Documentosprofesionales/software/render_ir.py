@@ -0,0 +1,51 @@
+import sys
+import os
+import time
+import argparse
+
+# Ajuste de path para importar módulos hermanos
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.document_ir import load_ir, IRVersionError, IR_SUFFIX
+from software.cites_builder import run_cites_pipeline
+from software.renderer import run_pipeline as run_apa_pipeline
+
+# Estilos de salida disponibles: mismo IR, distinto builder
+ESTILOS = {
+    "cites": run_cites_pipeline,
+    "apa": run_apa_pipeline,
+}
+
+def render(ir_path: str, output_path: str, estilo: str = "cites", validar: bool = False):
+    """Renderiza un IR (.ir.json) a DOCX sin volver a parsear la fuente ni llamar al modelo."""
+    if estilo not in ESTILOS:
+        raise ValueError(f"Estilo no soportado: {estilo} (opciones: {', '.join(ESTILOS)})")
+    data = load_ir(ir_path, validar=validar)
+    ESTILOS[estilo](data, output_path)
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderiza un IR de documento (.ir.json) directamente a DOCX")
+    parser.add_argument("ir", help="Ruta del IR generado por local_engine o por el extractor")
+    parser.add_argument("--output", "-o", help="Ruta del DOCX de salida (por defecto junto al IR)")
+    parser.add_argument("--estilo", choices=sorted(ESTILOS), default="cites", help="Builder de salida")
+    parser.add_argument("--validar", action="store_true", help="Re-validar el IR con Pydantic (IR editados a mano)")
+    args = parser.parse_args()
+
+    ir_path = os.path.abspath(args.ir)
+    if not os.path.exists(ir_path):
+        print(f"❌ No se encuentra el IR: {ir_path}")
+        sys.exit(1)
+    base = ir_path[:-len(IR_SUFFIX)] if ir_path.endswith(IR_SUFFIX) else os.path.splitext(ir_path)[0]
+    output_path = os.path.abspath(args.output) if args.output else f"{base}_{args.estilo.upper()}.docx"
+
+    t0 = time.perf_counter()
+    try:
+        render(ir_path, output_path, args.estilo, args.validar)
+    except IRVersionError as e:
+        print(f"❌ {e} Regenere el IR desde su fuente.")
+        sys.exit(1)
+    print(f"✅ Renderizado en {time.perf_counter() - t0:.2f} s: {output_path}")
+
+if __name__ == "__main__":
+    main()
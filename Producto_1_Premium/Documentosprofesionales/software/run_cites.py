@@ -1,3 +1,4 @@
+import math
 from apa.apa_citas import ApaCitas, Cita, Autor
 from mga_identificacion import MgaIdentificacion, Problema, Poblacion, Objetivo, Alternativa, Participante
 from mga_preparacion import MgaPreparacion, DatosMercado, ProductoMercado, EspecificacionTecnica, Ubicacion, CadenaValor, CadenaValorItem, Riesgo, Beneficio
@@ -177,15 +178,19 @@ def generar_proyecto_cites():
     mod_eval.agregar_flujo_detalle(3, -7000, -2980, 2100000, 2090020)
     mod_eval.agregar_flujo_detalle(4, -7000, -2980, 2975000, 2965020)
     
-    # Indicadores
-    mod_eval.agregar_indicador("VPN (Financiero)", "$52,450 Millones", "Positivo - Genera valor")
-    mod_eval.agregar_indicador("TIR (Financiera)", "28.5%", "Superior a TSD (12%) - Rentable")
-    mod_eval.agregar_indicador("Relación B/C", "2.19:1", "Mayor a 1 - Beneficios > Costos")
+    # Indicadores (VPN, TIR, B/C, CAE y PRI financieros se calculan desde los flujos)
     mod_eval.agregar_indicador("VPN Económico", "$142,850 Millones", "Positivo - Alto valor social")
     mod_eval.agregar_indicador("TIR Económica", "42.3%", "Muy rentable socialmente")
     mod_eval.agregar_indicador("Relación B/C Económica", "4.24:1", "Beneficios sociales superan costos ampliamente")
     
-    mod_eval.set_analisis("El proyecto CITES presenta indicadores financieros y económicos favorables que demuestran su viabilidad. El VPN positivo de $52,450 millones indica valor sobre el costo de oportunidad. La TIR del 28.5% supera la TSD del 12%. Los indicadores económicos (VPN Eco $142,850M) reflejan el alto impacto social.")
+    # El análisis cita los mismos valores calculados que muestra la tabla de indicadores
+    indicadores = mod_eval.calcular_indicadores()
+    tir = indicadores['tir']
+    if math.isnan(tir):
+        texto_tir = "TIR no definida: el flujo neto no cambia de signo en el horizonte."
+    else:
+        texto_tir = f"La TIR del {tir*100:,.1f}% {'supera' if tir > mod_eval.tsd else 'no supera'} la TSD del {mod_eval.tsd*100:g}%."
+    mod_eval.set_analisis(f"El proyecto CITES presenta indicadores financieros y económicos favorables que demuestran su viabilidad. El VPN positivo de ${indicadores['vpn']:,.0f} millones indica valor sobre el costo de oportunidad. {texto_tir} Los indicadores económicos (VPN Eco $142,850M) reflejan el alto impacto social.")
     
     mod_eval.set_decision("VIABLE - El proyecto CITES es viable técnicamente, económicamente, financieramente y socialmente. Se recomienda su aprobación para ingreso al BPIN.")
     
@@ -245,13 +250,13 @@ def generar_proyecto_cites():
     mod_prog.agregar_item_resumen("Población Objetivo", "5,000,000 habitantes")
     mod_prog.agregar_item_resumen("Inversión Total", "$44,000 millones COP")
     mod_prog.agregar_item_resumen("Horizonte Ev.", "10 años")
-    mod_prog.agregar_item_resumen("VPN", "$52,450 millones")
-    mod_prog.agregar_item_resumen("TIR", "28.5%")
+    mod_prog.agregar_item_resumen("VPN", f"${indicadores['vpn']:,.0f} millones")
+    mod_prog.agregar_item_resumen("TIR", "TIR no definida" if math.isnan(tir) else f"{tir*100:,.1f}%")
 
     mod_prog.set_firma("_________________________", "______________________", "Director Ejecutivo CITES", "Por definir", "Febrero 2026")
 
     # --- ENSAMBLE ---
-    assembler = ProjectAssembler("Documento_Tecnico_CITES_Completo.docx")
+    assembler = ProjectAssembler("Documento_Tecnico_CITES_Completo.docx", verificar_consistencia=True)
     assembler.registrar_modulo(mod_id)
     assembler.registrar_modulo(mod_prep)
     assembler.registrar_modulo(mod_eval)
@@ -0,0 +1,114 @@
+import pandas as pd
+from typing import Iterable, List, Optional, Tuple
+
+# Columna interna con el id estable de cada fila (no se muestra al usuario)
+ROW_ID = "_rid"
+
+
+class PagedTableStore:
+    """
+    Tabla del wizard guardada del lado del servidor para edición paginada.
+
+    El navegador solo recibe la ventana visible (`view`); las ediciones del
+    `st.data_editor` llegan como delta (edited/added/deleted rows por posición
+    dentro de la ventana) y se aplican aquí por id de fila. Los totales se
+    calculan siempre sobre la tabla completa.
+    """
+
+    def __init__(self, df: pd.DataFrame, search_columns: Iterable[str] = ("Ítem", "Fase", "Actividad", "Riesgo")):
+        data = df.reset_index(drop=True).copy()
+        if ROW_ID in data.columns:
+            data = data.drop(columns=[ROW_ID])
+        data.index = pd.RangeIndex(len(data), name=ROW_ID)
+        self._df = data
+        self._next_id = len(data)
+        self.search_columns = [c for c in search_columns if c in data.columns]
+        self.version = 0  # Aumenta con cada cambio; sirve para renovar la key del editor
+        self._blob: Optional[pd.Series] = None
+
+    def __len__(self):
+        return len(self._df)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Tabla completa sin la columna de id."""
+        return self._df.reset_index(drop=True)
+
+    # --- Búsqueda / Ventana ---
+    def _search_blob(self) -> pd.Series:
+        # Texto de búsqueda precalculado (minúsculas) por fila; se invalida al editar
+        if self._blob is None:
+            if self.search_columns:
+                blob = self._df[self.search_columns[0]].astype(str)
+                for col in self.search_columns[1:]:
+                    blob = blob + " ␟ " + self._df[col].astype(str)
+                self._blob = blob.str.lower()
+            else:
+                self._blob = pd.Series("", index=self._df.index)
+        return self._blob
+
+    def filter_ids(self, query: str = "") -> pd.Index:
+        if not query:
+            return self._df.index
+        mask = self._search_blob().str.contains(query.strip().lower(), regex=False)
+        return self._df.index[mask.to_numpy()]
+
+    def view(self, query: str = "", page: int = 0, page_size: int = 50) -> Tuple[pd.DataFrame, int, int]:
+        """
+        Retorna (ventana, coincidencias, páginas). La ventana conserva los ids de fila
+        en el índice para poder mapear las ediciones de vuelta.
+        """
+        ids = self.filter_ids(query)
+        matches = len(ids)
+        pages = max(1, -(-matches // page_size))
+        page = min(max(page, 0), pages - 1)
+        window_ids = ids[page * page_size:(page + 1) * page_size]
+        return self._df.loc[window_ids], matches, pages
+
+    # --- Ediciones ---
+    def apply_delta(self, window_ids: List[int], delta: dict) -> bool:
+        """
+        Aplica el delta del data_editor ({'edited_rows', 'added_rows', 'deleted_rows'})
+        calculado sobre la ventana `window_ids`. Retorna True si hubo cambios.
+        """
+        changed = False
+        for pos, changes in (delta.get("edited_rows") or {}).items():
+            rid = window_ids[int(pos)]
+            for col, value in changes.items():
+                if col == ROW_ID:
+                    continue
+                if col not in self._df.columns:
+                    self._df[col] = None
+                self._df.at[rid, col] = value
+                changed = True
+
+        added = [row for row in (delta.get("added_rows") or []) if row]
+        if added:
+            new = pd.DataFrame(added).drop(columns=[ROW_ID], errors="ignore")
+            new.index = pd.RangeIndex(self._next_id, self._next_id + len(new), name=ROW_ID)
+            self._next_id += len(new)
+            self._df = pd.concat([self._df, new])
+            changed = True
+
+        deleted = [window_ids[int(pos)] for pos in (delta.get("deleted_rows") or [])]
+        if deleted:
+            self._df = self._df.drop(index=deleted)
+            changed = True
+
+        if changed:
+            self._blob = None
+            self.version += 1
+        return changed
+
+    # --- Agregados sobre la tabla completa ---
+    def numeric(self, column: str) -> pd.Series:
+        if column not in self._df.columns:
+            return pd.Series(0.0, index=self._df.index)
+        return pd.to_numeric(self._df[column], errors="coerce").fillna(0.0)
+
+    def total(self, column: str, weight: Optional[str] = None) -> float:
+        """Suma de una columna, opcionalmente ponderada (ej. Cantidad x Valor Unitario)."""
+        values = self.numeric(column)
+        if weight:
+            values = values * self.numeric(weight)
+        return float(values.sum())
@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import io
 import os
 import sys
 from datetime import date
@@ -8,6 +9,11 @@ from datetime import date
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from software.cites_builder import CITESReportBuilder
+from software.autosave_store import ProjectAutosaveStore, EDITOR_FRAMES, new_project_id
+from software.preview_html import HTMLPreviewRenderer
+from software.table_store import PagedTableStore
+from software.catalogo_store import CatalogoStore
+import streamlit.components.v1 as components
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 # Configuración de Página
@@ -29,6 +35,8 @@ def init_session():
         }
     if 'current_step' not in st.session_state:
         st.session_state.current_step = 1
+    if 'editor_frames' not in st.session_state:
+        st.session_state.editor_frames = {}
 
 def next_step():
     st.session_state.current_step += 1
@@ -36,6 +44,177 @@ def next_step():
 def prev_step():
     st.session_state.current_step -= 1
 
+# --- AUTOGUARDADO / REANUDACIÓN ---
+@st.cache_resource
+def get_autosave_store():
+    """Un único store por proceso: conserva los hashes por sección entre reruns."""
+    return ProjectAutosaveStore()
+
+def resume_project(project_id):
+    """Carga project_data y los DataFrames de edición de un proyecto guardado."""
+    project_data, frames = get_autosave_store().load(project_id)
+    st.session_state.project_data = project_data
+    for name in EDITOR_FRAMES:
+        st.session_state.pop(name, None)
+        st.session_state.pop(f"{name}_store", None) # store paginado del proyecto anterior
+    for name, df in frames.items():
+        st.session_state[name] = df
+    st.session_state.editor_frames = dict(frames)
+    st.session_state.pop('export_result', None) # la exportación anterior era de otro proyecto
+    st.session_state.project_id = project_id
+    st.query_params["proyecto"] = project_id
+
+def init_autosave():
+    """Asigna un id de proyecto (persistido en la URL) o reanuda el existente."""
+    if 'project_id' in st.session_state:
+        return
+    project_id = st.query_params.get("proyecto")
+    if project_id and get_autosave_store().exists(project_id):
+        resume_project(project_id)
+    else:
+        st.session_state.project_id = new_project_id()
+        st.query_params["proyecto"] = st.session_state.project_id
+
+def autosave_project(force=False):
+    get_autosave_store().autosave(
+        st.session_state.project_id,
+        st.session_state.project_data,
+        st.session_state.editor_frames,
+        force=force
+    )
+
+def render_sidebar_autosave():
+    st.sidebar.caption(f"Proyecto: `{st.session_state.project_id}` (autoguardado)")
+    saved = [p for p in get_autosave_store().list_projects() if p["project_id"] != st.session_state.project_id]
+    if saved:
+        labels = {p["project_id"]: f"{p['title'] or 'Sin título'} ({p['project_id']})" for p in saved}
+        selected = st.sidebar.selectbox("Proyectos guardados", list(labels), format_func=labels.get)
+        if st.sidebar.button("📂 Reanudar Proyecto"):
+            autosave_project(force=True)
+            resume_project(selected)
+            st.rerun()
+
+# --- VISTA PREVIA ---
+def render_preview(height=600):
+    """Vista previa HTML del documento; solo re-renderiza las secciones modificadas."""
+    if 'preview_renderer' not in st.session_state:
+        st.session_state.preview_renderer = HTMLPreviewRenderer()
+    html = st.session_state.preview_renderer.render_project(st.session_state.project_data)
+    components.html(html, height=height, scrolling=True)
+
+# --- EDICIÓN PAGINADA (TABLAS GRANDES) ---
+PAGED_THRESHOLD = 200  # Filas a partir de las cuales se activa el modo paginado por defecto
+
+def sync_table_section(frame_key, section_key, full_df):
+    st.session_state.editor_frames[frame_key] = full_df
+    st.session_state.project_data['sections'][section_key] = full_df.to_dict('records')
+
+def apply_paged_edits(frame_key, section_key, editor_key, window_ids):
+    """Callback del data_editor paginado: aplica el delta de la ventana a la tabla completa."""
+    store = st.session_state[f"{frame_key}_store"]
+    if store.apply_delta(window_ids, st.session_state[editor_key]):
+        full_df = store.frame
+        st.session_state[frame_key] = full_df
+        sync_table_section(frame_key, section_key, full_df)
+
+def render_table_editor(frame_key, section_key, **editor_kwargs):
+    """
+    Tablas pequeñas: data_editor directo. Tablas grandes: solo se envía al navegador
+    la ventana visible de un PagedTableStore, con búsqueda por Ítem/Fase.
+    Retorna siempre la tabla completa.
+    """
+    store_key = f"{frame_key}_store"
+    source = st.session_state.editor_frames.get(frame_key, st.session_state[frame_key])
+    paged = st.toggle("Modo paginado (tablas grandes)", value=len(source) > PAGED_THRESHOLD, key=f"{frame_key}_paged")
+
+    if not paged:
+        if store_key in st.session_state:
+            st.session_state[frame_key] = st.session_state.pop(store_key).frame
+        edited_df = st.data_editor(st.session_state[frame_key], num_rows="dynamic", use_container_width=True, **editor_kwargs)
+        sync_table_section(frame_key, section_key, edited_df)
+        return edited_df
+
+    if store_key not in st.session_state:
+        st.session_state[store_key] = PagedTableStore(source)
+        sync_table_section(frame_key, section_key, st.session_state[store_key].frame)
+    store = st.session_state[store_key]
+
+    col_q, col_size, col_page = st.columns([3, 1, 1])
+    with col_q:
+        query = st.text_input("🔍 Buscar por Ítem / Fase / Actividad", key=f"{frame_key}_query")
+    with col_size:
+        page_size = st.selectbox("Filas por página", [25, 50, 100, 250], index=1, key=f"{frame_key}_page_size")
+    pages = max(1, -(-len(store.filter_ids(query)) // page_size))
+    page_key = f"{frame_key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with col_page:
+        page = st.number_input("Página", min_value=1, max_value=pages, value=1, key=page_key) - 1
+
+    window, matches, pages = store.view(query, page, page_size)
+    editor_key = f"{frame_key}_editor_v{store.version}"
+    st.data_editor(window, key=editor_key, num_rows="dynamic", use_container_width=True, hide_index=True,
+                   on_change=apply_paged_edits, args=(frame_key, section_key, editor_key, list(window.index)),
+                   **editor_kwargs)
+    st.caption(f"{matches:,} filas coinciden · {len(store):,} filas en total · página {page + 1} de {pages}")
+    return store.frame
+
+# --- CATÁLOGO DE INSUMOS (AUTOCOMPLETAR / NORMALIZACIÓN) ---
+@st.cache_resource
+def get_catalog_store():
+    """Catálogo SQLite compartido por todas las sesiones (índices de búsqueda en memoria)."""
+    return CatalogoStore()
+
+def replace_table(frame_key, section_key, df):
+    """Reemplaza la tabla completa (descarta el store paginado para que se reconstruya)."""
+    st.session_state.pop(f"{frame_key}_store", None)
+    st.session_state[frame_key] = df
+    sync_table_section(frame_key, section_key, df)
+
+def render_catalog_tools(frame_key, section_key):
+    catalog = get_catalog_store()
+    with st.expander("📚 Catálogo de Insumos"):
+        uploaded = st.file_uploader("Importar catálogo (CSV: codigo, descripcion, unidad, precio, tipo)", type=["csv"])
+        if uploaded is not None and st.button("Importar Catálogo"):
+            count = catalog.importar_csv(io.StringIO(uploaded.getvalue().decode("utf-8-sig")))
+            st.success(f"✅ {count:,} insumos importados.")
+
+        total_items = len(catalog)
+        if not total_items:
+            st.caption("El catálogo está vacío. Importe un CSV para activar el autocompletado.")
+            return
+        st.caption(f"{total_items:,} insumos en el catálogo.")
+
+        current = st.session_state.editor_frames.get(frame_key, st.session_state[frame_key])
+        query = st.text_input("🔎 Buscar insumo", key=f"{frame_key}_catalog_query")
+        if query:
+            matches = catalog.buscar(query, limite=8)
+            if matches:
+                options = {f"{m.descripcion} · {m.unidad} · ${m.precio:,.0f} ({m.codigo})": m for m in matches}
+                choice = st.selectbox("Coincidencias", list(options), key=f"{frame_key}_catalog_choice")
+                qty = st.number_input("Cantidad", min_value=0.0, value=1.0, key=f"{frame_key}_catalog_qty")
+                if st.button("➕ Agregar al Presupuesto"):
+                    m = options[choice]
+                    row = pd.DataFrame([{"Ítem": m.descripcion, "Unidad": m.unidad, "Cantidad": qty, "Valor Unitario": m.precio}])
+                    replace_table(frame_key, section_key, pd.concat([current, row], ignore_index=True))
+                    st.rerun()
+            else:
+                st.caption("Sin coincidencias.")
+
+        umbral = st.slider("Similitud mínima para normalizar", 0.3, 0.95, 0.6, 0.05, key=f"{frame_key}_catalog_threshold")
+        if st.button("🧹 Normalizar Ítems con el Catálogo"):
+            rows, changes = catalog.normalizar_filas(current.to_dict('records'), "Ítem", umbral)
+            if changes:
+                replace_table(frame_key, section_key, pd.DataFrame(rows))
+                st.session_state[f"{frame_key}_catalog_changes"] = changes
+                st.rerun()
+            else:
+                st.info("No se encontraron ítems para normalizar.")
+        changes = st.session_state.get(f"{frame_key}_catalog_changes")
+        if changes:
+            st.success(f"✅ {len(changes):,} ítems normalizados.")
+            st.dataframe(pd.DataFrame(changes), use_container_width=True, hide_index=True)
+
 # --- STEPS RENDERERS ---
 
 def render_step_1_metadata():
@@ -105,6 +284,7 @@ def render_step_3_technical():
             st.session_state.specs_df = pd.DataFrame(columns=["Característica", "Detalle"])
 
     edited_df = st.data_editor(st.session_state.specs_df, num_rows="dynamic", use_container_width=True)
+    st.session_state.editor_frames['specs_df'] = edited_df
     sec['especificaciones'] = edited_df.to_dict('records')
 
     col_back, col_next = st.columns([1, 5])
@@ -134,8 +314,7 @@ def render_step_4_schedule():
                 {"Fase": "Ejecución", "Actividad": "Obra Civil", "Duración (Meses)": "6", "Responsable": "Contratista"},
             ])
 
-    edited_df = st.data_editor(st.session_state.cronograma_df, num_rows="dynamic", use_container_width=True)
-    st.session_state.project_data['sections']['cronograma'] = edited_df.to_dict('records')
+    render_table_editor('cronograma_df', 'cronograma')
 
     col_back, col_next = st.columns([1, 5])
     with col_back:
@@ -200,12 +379,11 @@ def render_step_6_risks():
                 {"Riesgo": "Financieros", "Probabilidad": "Baja", "Impacto": "Alto", "Mitigación": "Aseguramiento de recursos"},
             ])
 
-    edited_df = st.data_editor(st.session_state.riesgos_df, num_rows="dynamic", use_container_width=True, 
-                               column_config={
-                                   "Probabilidad": st.column_config.SelectboxColumn(options=["Alta", "Media", "Baja"]),
-                                   "Impacto": st.column_config.SelectboxColumn(options=["Alto", "Medio", "Bajo"])
-                               })
-    st.session_state.project_data['sections']['riesgos'] = edited_df.to_dict('records')
+    render_table_editor('riesgos_df', 'riesgos',
+                        column_config={
+                            "Probabilidad": st.column_config.SelectboxColumn(options=["Alta", "Media", "Baja"]),
+                            "Impacto": st.column_config.SelectboxColumn(options=["Alto", "Medio", "Bajo"])
+                        })
 
     col_back, col_next = st.columns([1, 5])
     with col_back:
@@ -213,10 +391,28 @@ def render_step_6_risks():
             prev_step()
             st.rerun()
     with col_next:
-         if st.button("Finalizar y Generar 🚀", type="primary"):
+         if st.button("Revisar y Exportar 🚀", type="primary"):
             next_step()
             st.rerun()
 
+def render_step_7_export():
+    st.header("7. Vista Previa y Exportación")
+    st.markdown("Revise el documento. Los archivos DOCX/XLSX solo se generan al exportar.")
+    render_preview(height=800)
+
+    col_back, col_next = st.columns([1, 5])
+    with col_back:
+        if st.button("⬅️ Atrás", key="back_export"):
+            st.session_state.pop('export_result', None)
+            prev_step()
+            st.rerun()
+    with col_next:
+        if st.button("📄 Exportar Documentos", type="primary"):
+            generate_document()
+    # El resultado queda en session_state: las descargas y botones posteriores sobreviven a los reruns
+    if 'export_result' in st.session_state:
+        render_export_result()
+
 def generate_document():
     st.header("⏳ Generando Documento...")
     try:
@@ -312,8 +508,39 @@ def generate_document():
             st.rerun()
 
 
-from software.ai_engine import analyze_unstructured_text
+from software.ai_jobs import AIJobManager, COMPLETADO, CANCELADO, ERROR
 from software.financial_engine import BudgetManager
+import time
+
+# Sección IA -> DataFrame de edición que debe reconstruirse al recibirla
+AI_SECTION_FRAMES = {"tecnica": "specs_df", "cronograma": "cronograma_df",
+                     "presupuesto": "presupuesto_df", "riesgos": "riesgos_df"}
+AI_SECTION_LABELS = {"title": "Título", "entity": "Entidad", "identificacion": "Identificación",
+                     "tecnica": "Técnica", "cronograma": "Cronograma", "presupuesto": "Presupuesto",
+                     "riesgos": "Riesgos"}
+
+@st.cache_resource
+def get_ai_job_manager():
+    """Ejecutor compartido: las llamadas IA corren fuera del hilo del script."""
+    return AIJobManager()
+
+def apply_ai_sections(job):
+    """Vuelca en project_data las secciones IA que aún no se habían aplicado."""
+    applied = st.session_state.setdefault('ai_applied', set())
+    for key, value in job.snapshot().items():
+        if key in applied:
+            continue
+        if key in ("title", "entity"):
+            st.session_state.project_data[key] = value
+        else:
+            st.session_state.project_data['sections'][key] = value
+            frame = AI_SECTION_FRAMES.get(key)
+            if frame:
+                st.session_state.pop(frame, None)
+                st.session_state.pop(f"{frame}_store", None) # como replace_table: el store se reconstruye
+                st.session_state.editor_frames.pop(frame, None)
+        applied.add(key)
+    return applied
 
 def render_step_ai_brain():
     st.header("🧠 Cerebro Artificial (Google Antigravity)")
@@ -327,21 +554,41 @@ def render_step_ai_brain():
     
     user_text = st.text_area("Pegue su información aquí:", height=300, placeholder="Ejemplo: Quiero hacer un parque en el barrio Los Pinos, cuesta como 500 millones, se demora 6 meses...")
     
-    if st.button("✨ Estructurar Proyecto Automáticamente", type="primary"):
-        with st.spinner("Analizando y estructurando información..."):
-            try:
-                # Llamada al cerebro
-                structured_data = analyze_unstructured_text(user_text, api_key=api_key_input)
-                
-                if structured_data:
-                    st.session_state.project_data = structured_data
-                    st.success("¡Proyecto Estructurado! Revise la información en los siguientes pasos.")
-                    st.session_state.current_step = 1 # Ir a inicio para revisar
-                    st.rerun()
-                else:
-                    st.error("No se pudo estructurar la información. Intente nuevamente.")
-            except Exception as e:
-                st.error(f"Error en el proceso de IA: {e}")
+    manager = get_ai_job_manager()
+    job = manager.get(st.session_state.get('ai_job_id', ''))
+
+    if st.button("✨ Estructurar Proyecto Automáticamente", type="primary", disabled=job is not None and not job.done):
+        # Mismo texto ya en curso o resuelto -> se reutiliza el trabajo (sin nueva llamada)
+        new_job = manager.submit(user_text, api_key=api_key_input)
+        if job is None or new_job.fingerprint != job.fingerprint:
+            st.session_state.ai_applied = set()
+        job = new_job
+        st.session_state.ai_job_id = job.fingerprint
+
+    if job is None:
+        return
+
+    applied = apply_ai_sections(job)
+    st.progress(job.progress)
+    st.caption(" · ".join(f"{'✅' if k in applied else '⏳'} {label}" for k, label in AI_SECTION_LABELS.items()))
+
+    if not job.done:
+        if st.button("⛔ Cancelar"):
+            job.cancel()
+            st.rerun()
+        with st.spinner("Analizando y estructurando información (puede seguir revisando las secciones listas)..."):
+            time.sleep(0.5)
+        autosave_project()
+        st.rerun()
+    elif job.status == COMPLETADO:
+        st.success("¡Proyecto Estructurado! Revise la información en los siguientes pasos.")
+        if st.button("Revisar Proyecto ➡️"):
+            st.session_state.current_step = 1 # Ir a inicio para revisar
+            st.rerun()
+    elif job.status == CANCELADO:
+        st.warning("Estructuración cancelada. Se conservaron las secciones recibidas.")
+    elif job.status == ERROR:
+        st.error(f"Error en el proceso de IA: {job.error}")
 
 def render_step_5_budget():
     st.header("5. Presupuesto Detallado (Motor Financiero)")
@@ -357,11 +604,12 @@ def render_step_5_budget():
                 {"Ítem": "Materiales", "Unidad": "Global", "Cantidad": 1, "Valor Unitario": 10000000},
             ])
 
-    # Editor de Datos
-    edited_df = st.data_editor(st.session_state.presupuesto_df, num_rows="dynamic", use_container_width=True)
-    st.session_state.project_data['sections']['presupuesto'] = edited_df.to_dict('records') # Guardar estado raw
+    render_catalog_tools('presupuesto_df', 'presupuesto')
+
+    # Editor de Datos (paginado en tablas grandes; retorna siempre la tabla completa)
+    edited_df = render_table_editor('presupuesto_df', 'presupuesto')
 
-    # --- CÁLCULO EN TIEMPO REAL USANDO BUDGET MANAGER ---
+    # --- CÁLCULO EN TIEMPO REAL USANDO BUDGET MANAGER (sobre la tabla completa) ---
     bm = BudgetManager(edited_df)
     total = bm.calculate_totals()
     
@@ -462,45 +710,60 @@ def generate_document():
                 builder.add_table({"headers": headers, "rows": rows, "caption": "Matriz de Riesgos"})
         
         builder.save()
-        
-        st.success("✅ ¡Paquete de Proyecto Generado!")
+
+        st.session_state.export_result = {"docx_path": docx_path, "docx_name": docx_name,
+                                          "xlsx_path": xlsx_path, "xlsx_name": xlsx_name}
         st.balloons()
-        
-        col_d1, col_d2 = st.columns(2)
-        
-        with open(docx_path, "rb") as f_docx:
-            col_d1.download_button(
-                label="📄 Descargar Informe (.docx)",
-                data=f_docx,
-                file_name=docx_name,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
-            
-        with open(xlsx_path, "rb") as f_xlsx:
-            col_d2.download_button(
-                label="📊 Descargar Cálculos (.xlsx)",
-                data=f_xlsx,
-                file_name=xlsx_name,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            
-        if st.button("🔄 Crear Nuevo Proyecto"):
-            st.session_state.clear()
-            st.rerun()
-            
+
     except Exception as e:
-        st.error(f"❌ Error Generando Documentos: {e}")
-        st.code(e)
         import traceback
-        st.code(traceback.format_exc())
+        st.session_state.export_result = {"error": str(e), "traceback": traceback.format_exc()}
+
+def render_export_result():
+    """Resultado de la última exportación (o su error), con descargas y acciones posteriores."""
+    result = st.session_state.export_result
+    if "error" in result:
+        st.error(f"❌ Error Generando Documentos: {result['error']}")
+        st.code(result['traceback'])
         if st.button("⬅️ Regresar"):
+            st.session_state.pop('export_result', None)
             prev_step()
             st.rerun()
+        return
+
+    st.success("✅ ¡Paquete de Proyecto Generado!")
+
+    col_d1, col_d2 = st.columns(2)
+
+    with open(result["docx_path"], "rb") as f_docx:
+        col_d1.download_button(
+            label="📄 Descargar Informe (.docx)",
+            data=f_docx,
+            file_name=result["docx_name"],
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+
+    with open(result["xlsx_path"], "rb") as f_xlsx:
+        col_d2.download_button(
+            label="📊 Descargar Cálculos (.xlsx)",
+            data=f_xlsx,
+            file_name=result["xlsx_name"],
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+    if st.button("🔄 Crear Nuevo Proyecto"):
+        autosave_project(force=True)
+        st.session_state.clear()
+        st.query_params.clear()
+        st.rerun()
 
+def main():
     init_session()
+    init_autosave()
     
     # Sidebar
     st.sidebar.title("Navegación")
+    render_sidebar_autosave()
     
     # Modo Directo en Sidebar
     if st.sidebar.button("🧠 MODO INTELIGENTE"):
@@ -508,7 +771,8 @@ def generate_document():
         st.rerun()
 
     # Progress Bar
-    steps = ["Cerebro IA", "Inicio", "Identificación", "Técnica", "Cronograma", "Presupuesto", "Riesgos", "Generar"]
+    steps = ["Cerebro IA", "Inicio", "Identificación", "Técnica", "Cronograma", "Presupuesto", "Riesgos", "Exportar"]
+    live_preview = st.sidebar.toggle("👁️ Vista previa en vivo", value=False)
     # Ajuste de índice para progress bar (step 0 es index 0, step 1 es index 1...)
     curr = st.session_state.current_step
     
@@ -537,7 +801,14 @@ def generate_document():
         elif curr == 6:
             render_step_6_risks()
         elif curr == 7:
-            generate_document()
+            render_step_7_export()
+
+        if live_preview and 1 <= curr <= 6:
+            with st.expander("👁️ Vista Previa del Documento", expanded=True):
+                render_preview()
+
+    # Autoguardado al final de cada rerun (solo escribe secciones modificadas)
+    autosave_project()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Ajuste de path para importar los paquetes software/ y backend/ (igual que los scripts)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,25 @@
+import pytest
+
+from software.mga_consistencia import parsear_monto
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("1,5 millones", 1.5),
+    ("2.980,50", 2980.5),
+    ("$1.234.567,89", 1234567.89),
+])
+def test_parsear_monto_formato_colombiano(texto, esperado):
+    assert parsear_monto(texto) == pytest.approx(esperado)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("44,000 millones COP", 44000.0),
+    ("$2.980", 2980.0),
+    ("1,234,567.89", 1234567.89),
+])
+def test_parsear_monto_separador_de_miles(texto, esperado):
+    assert parsear_monto(texto) == pytest.approx(esperado)
+
+
+def test_parsear_monto_sin_numero():
+    assert parsear_monto("Por definir") is None
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from software.mga_evaluacion import calcular_pri, calcular_tir
+
+
+def test_pri_interpolado():
+    assert calcular_pri([-100, 50, 60])[0] == pytest.approx(1 + 50 / 60)
+
+
+def test_pri_sin_inversion_es_cero():
+    assert calcular_pri([10, -5, 3])[0] == 0.0
+
+
+def test_pri_sin_recuperacion_es_nan():
+    assert np.isnan(calcular_pri([-100, 10, 10])[0])
+
+
+def test_tir_flujo_en_ceros_es_nan():
+    assert np.isnan(calcular_tir([0, 0, 0])[0])
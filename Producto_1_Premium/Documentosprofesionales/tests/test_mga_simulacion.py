@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from software.mga_evaluacion import MgaEvaluacion
+from software.mga_simulacion import Distribucion, SimuladorMonteCarlo
+
+
+def _evaluacion(signo_costos: float) -> MgaEvaluacion:
+    """Mismo proyecto con costos e inversión registrados en negativo (-1) o como montos positivos (+1)."""
+    ev = MgaEvaluacion(tasa_social_descuento=0.12)
+    for periodo, inversion, costos, beneficios in ((0, 1000, 0, 0), (1, 100, 50, 600), (2, 0, 50, 700), (3, 0, 50, 800)):
+        neto = beneficios - costos - inversion
+        ev.agregar_flujo_detalle(periodo, signo_costos * inversion, signo_costos * costos, beneficios, neto)
+    return ev
+
+
+@pytest.mark.parametrize("signo_costos", [-1.0, 1.0])
+def test_escenario_sin_varianza_coincide_con_indicadores(signo_costos):
+    ev = _evaluacion(signo_costos)
+    fija = Distribucion("fija", (1.0,))
+    sim = SimuladorMonteCarlo(ev, inversion=fija, costos_op=fija, beneficios=fija,
+                              tsd=Distribucion("fija", (ev.tsd,)), semilla=1)
+    resultado = sim.simular(escenarios=50, procesos=1, con_tornado=False)
+    indicadores = ev.calcular_indicadores()
+    np.testing.assert_allclose(resultado.vpn, indicadores["vpn"])
+    np.testing.assert_allclose(resultado.tir, indicadores["tir"])